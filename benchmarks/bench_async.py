@@ -0,0 +1,80 @@
+"""
+    Range pipeline run by worker threads (`do_range_pipeline`) versus async
+    `Pipeline.run` on single event loop, against stub API with latency and
+    failing requests. Also reports how long a heartbeat task on the loop was
+    stalled while async pipeline was running.
+    
+    Run from repository root: `python -m benchmarks.bench_async`.
+"""
+import argparse
+import contextlib
+import tempfile
+import asyncio
+import time
+import io
+import os
+
+import project.utils
+from project import Pipeline
+from project.exctract.async_extractor import AsyncNeoWsExtractor
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import count_rows, create_sqlite_engine
+
+BACKOFF_BASE = 0.05
+
+async def heartbeat(interval: float, stalls: list[float]):
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - started - interval)
+
+async def run_async(pipeline: Pipeline, engine, options) -> tuple[list, list[float]]:
+    stalls = []
+    beat = asyncio.create_task(heartbeat(0.01, stalls))
+    async with AsyncNeoWsExtractor('DEMO_KEY', url=pipeline.extractor.url,
+                                   max_connections=options.workers) as extractor:
+        extractor.scheduler.backoff_base = BACKOFF_BASE
+        results = await pipeline.run(engine, options.start, options.end,
+                                     extractor=extractor, max_windows=options.windows)
+    beat.cancel()
+    return results, stalls
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-12-31')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--windows', type=int, default=16,
+                        help='Windows in flight of async pipeline.')
+    parser.add_argument('--per-day', type=int, default=50)
+    parser.add_argument('--api-latency', type=float, default=0.2)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    options = parser.parse_args()
+    
+    with StubNeoWsServer(latency=options.api_latency, per_day=options.per_day,
+                         error_rate=options.error_rate) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        
+        for name in ('threads', 'async'):
+            engine = create_sqlite_engine(os.path.join(directory, f'{name}.sqlite3'))
+            pipeline = Pipeline('DEMO_KEY', max_workers=options.workers, rollup=True)
+            pipeline.extractor.url = stub.feed_url
+            pipeline.extractor.scheduler.backoff_base = BACKOFF_BASE
+            requests = stub.requests
+            
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                if name == 'threads':
+                    results = pipeline.do_range_pipeline(engine, options.start, options.end)
+                else:
+                    results, stalls = asyncio.run(run_async(pipeline, engine, options))
+            elapsed = time.perf_counter() - started
+            
+            print(f'{name:<7} windows={sum(result.ok for result in results)}/{len(results)} '
+                  f'rows={count_rows(engine):<7} requests={stub.requests - requests:<5} '
+                  f'time={elapsed:7.2f}s')
+            if name == 'async':
+                print(f'{"":<7} loop stalled max={max(stalls, default=0) * 1000:.1f}ms '
+                      f'mean={sum(stalls) / max(len(stalls), 1) * 1000:.2f}ms')
+            engine.dispose()
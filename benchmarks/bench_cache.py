@@ -0,0 +1,69 @@
+"""
+    Disk usage and time of pretty-printed json files vs compressed feed cache.
+    
+    Run from repository root: `python -m benchmarks.bench_cache`.
+"""
+import argparse
+import tempfile
+import time
+import json
+import os
+
+import project.utils
+from project.utils import save_to_json, create_filename, split_date_range
+from project.parser.stream import iter_feed_records
+from project.exctract.cache import FeedCache, zstandard
+from benchmarks.synthetic import make_feed
+
+ENDPOINT = 'https://api.nasa.gov/neo/rest/v1/feed?'
+
+def bench_json_files(directory: str, bodies: dict) -> tuple[int, float, float]:
+    project.utils.JSON_FILE_PATH = directory
+    
+    started = time.perf_counter()
+    paths = [save_to_json(create_filename(*window), json.loads(body))[1]
+             for window, body in bodies.items()]
+    written = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for path in paths:
+        sum(1 for _ in iter_feed_records(path))
+    read = time.perf_counter() - started
+    
+    return sum(os.path.getsize(path) for path in paths), written, read
+
+def bench_cache(directory: str, bodies: dict, compression: str) -> tuple[int, float, float]:
+    cache = FeedCache(directory, compression=compression)
+    
+    started = time.perf_counter()
+    entries = [cache.put(ENDPOINT, *window, body) for window, body in bodies.items()]
+    written = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for entry in entries:
+        with cache.open(entry) as blob:
+            sum(1 for _ in iter_feed_records(blob))
+    read = time.perf_counter() - started
+    
+    return sum(entry.size for entry in entries), written, read
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-06-30')
+    parser.add_argument('--per-day', type=int, default=15)
+    options = parser.parse_args()
+    
+    # Raw bodies as returned by API, compact json
+    bodies = {window: json.dumps(make_feed(*window, options.per_day)).encode()
+              for window in split_date_range(options.start, options.end)}
+    print(f'windows={len(bodies)} raw={sum(map(len, bodies.values())) / 2 ** 20:.2f} MiB')
+    
+    with tempfile.TemporaryDirectory() as directory:
+        results = {'pretty json': bench_json_files(os.path.join(directory, 'json'), bodies),
+                   'cache gzip': bench_cache(os.path.join(directory, 'gzip'), bodies, 'gzip')}
+        if zstandard is not None:
+            results['cache zstd'] = bench_cache(os.path.join(directory, 'zstd'), bodies, 'zstd')
+        
+        for name, (size, written, read) in results.items():
+            print(f'{name:<12} disk={size / 2 ** 20:8.2f} MiB write={written:7.3f}s read+parse={read:7.3f}s')
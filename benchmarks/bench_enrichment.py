@@ -0,0 +1,64 @@
+"""
+    Lookup requests and time of enriching every window of a range, looking
+    up each asteroid of every window as separate script did, versus through
+    lookup cache, cold and then warm from its disk tier.
+    
+    Run from repository root: `python -m benchmarks.bench_enrichment`.
+"""
+import argparse
+import contextlib
+import tempfile
+import time
+import io
+import os
+
+import project.utils
+from project import Pipeline
+from project.exctract.enrichment import LookupCache, NeoWsLookupExtractor
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import count_rows, create_sqlite_engine
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-03-31')
+    parser.add_argument('--per-day', type=int, default=40)
+    parser.add_argument('--population', type=int, default=1500,
+                        help='Distinct asteroids approaching within the range.')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--api-latency', type=float, default=0.02)
+    parser.add_argument('--requests-per-second', type=float, default=200)
+    options = parser.parse_args()
+    
+    with StubNeoWsServer(latency=options.api_latency, per_day=options.per_day,
+                         population=options.population) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        cache_path = os.path.join(directory, 'lookups.sqlite3')
+        
+        # No memory entries and no disk tier looks up every asteroid of every window
+        runs = (('uncached', lambda: LookupCache(path=None, max_entries=0)),
+                ('cold', lambda: LookupCache(cache_path)),
+                ('warm', lambda: LookupCache(cache_path)))
+        
+        for name, make_cache in runs:
+            engine = create_sqlite_engine(os.path.join(directory, f'{name}.sqlite3'))
+            enricher = NeoWsLookupExtractor('DEMO_KEY', url=stub.lookup_url,
+                                            max_workers=options.workers, cache=make_cache(),
+                                            requests_per_second=options.requests_per_second)
+            pipeline = Pipeline('DEMO_KEY', max_workers=options.workers, enricher=enricher)
+            pipeline.extractor.url = stub.feed_url
+            
+            lookups = sum(stub.lookups.values())
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                pipeline.do_range_pipeline(engine, options.start, options.end)
+            elapsed = time.perf_counter() - started
+            
+            stats = enricher.cache.stats()
+            print(f'{name:<9} lookups={sum(stub.lookups.values()) - lookups:<6} '
+                  f'hit_rate={stats["hit_rate"]:6.1%} memory_hits={stats["memory_hits"]:<6} '
+                  f'disk_hits={stats["disk_hits"]:<6} orbits={count_rows(engine, "asteroid_orbits"):<6} '
+                  f'time={elapsed:6.2f}s')
+            enricher.cache.close()
+            engine.dispose()
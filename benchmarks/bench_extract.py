@@ -0,0 +1,38 @@
+"""
+    Throughput of sequential vs concurrent range extraction against local stub API.
+    
+    Run from repository root: `python -m benchmarks.bench_extract`.
+"""
+import argparse
+import tempfile
+import time
+
+import project.utils
+from project.exctract.extractors import NeoWsExtractor
+from benchmarks.stub_api import StubNeoWsServer
+
+def run(start_date: str, end_date: str, workers: list[int], latency: float, per_day: int):
+    with StubNeoWsServer(latency=latency, per_day=per_day) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        
+        for max_workers in workers:
+            extractor = NeoWsExtractor('DEMO_KEY', url=stub.feed_url, max_workers=max_workers)
+            started = time.perf_counter()
+            results = extractor.extract_range(start_date, end_date)
+            elapsed = time.perf_counter() - started
+            
+            failed = sum(not result.ok for result in results)
+            print(f'workers={max_workers:<3} windows={len(results):<4} failed={failed:<3} '
+                  f'time={elapsed:7.3f}s windows/s={len(results) / elapsed:8.2f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-12-31')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated API latency in seconds.')
+    parser.add_argument('--per-day', type=int, default=15)
+    options = parser.parse_args()
+    
+    run(options.start, options.end, options.workers, options.latency, options.per_day)
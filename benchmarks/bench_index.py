@@ -0,0 +1,96 @@
+"""
+    Answering "hazardous approaches within N km" and "k closest approaches"
+    questions by scanning `asteroids_details`, by parsing saved feed files
+    again, and by close approach index, freshly built and loaded through mmap.
+    
+    Run from repository root: `python -m benchmarks.bench_index`.
+"""
+import argparse
+import tempfile
+import json
+import time
+import os
+
+import sqlalchemy
+
+import project.utils
+from project.parser.parser import AsteroidRowParser
+from project.database.loader import get_loader
+from project.query.index import ApproachIndex
+from project.utils import create_filename, find_feed_files, iter_file_rows, split_date_range
+from benchmarks.stub_db import create_sqlite_engine
+from benchmarks.synthetic import make_feed
+
+WITHIN = ('SELECT asteroid_id, close_approach_date, miss_distance_km FROM asteroids_details '
+          'WHERE isHazardous AND miss_distance_km <= :distance '
+          'AND close_approach_date BETWEEN :date_from AND :date_to ORDER BY miss_distance_km')
+CLOSEST = ('SELECT asteroid_id, close_approach_date, miss_distance_km FROM asteroids_details '
+           'ORDER BY miss_distance_km LIMIT :k')
+
+def timed(function, repeat: int) -> tuple[float, object]:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-12-31')
+    parser.add_argument('--per-day', type=int, default=300)
+    parser.add_argument('--distance', type=float, default=5_000_000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    params = {'distance': options.distance, 'date_from': '2023-03-01',
+              'date_to': '2023-08-31', 'k': options.k}
+    
+    with tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        engine = create_sqlite_engine(os.path.join(directory, 'neows.sqlite3'))
+        rows = []
+        for start_date, end_date in split_date_range(options.start, options.end):
+            feed = make_feed(start_date, end_date, options.per_day)
+            with open(os.path.join(directory, create_filename(start_date, end_date)), 'w') as file:
+                json.dump(feed, file)
+            for record_set in feed['near_earth_objects'].values():
+                rows.extend(AsteroidRowParser().parse_many(record_set))
+        with engine.connect() as connection:
+            get_loader('executemany').load(connection, rows)
+        paths = find_feed_files()
+        print(f'approaches={len(rows)} files={len(paths)}')
+        
+        def scan(query: str):
+            with engine.connect() as connection:
+                return connection.execute(sqlalchemy.text(query), params).fetchall()
+        
+        def reparse_within():
+            return sorted((row for path in paths for row in iter_file_rows(path)
+                           if row[5] and row[7] <= params['distance']
+                           and params['date_from'] <= row[6] <= params['date_to']),
+                          key=lambda row: row[7])
+        
+        build, index = timed(lambda: ApproachIndex.from_files(paths), 1)
+        size = index.save(os.path.join(directory, 'index.bin'))
+        load, mapped = timed(lambda: ApproachIndex.load(os.path.join(directory, 'index.bin')), 1)
+        print(f'index build={build:.2f}s size={size / 2 ** 20:.1f} MiB load={load * 1000:.2f}ms')
+        
+        runs = (
+            ('within', 'table scan', lambda: scan(WITHIN)),
+            ('within', 're-parse', reparse_within),
+            ('within', 'index', lambda: index.within(params['distance'], params['date_from'],
+                                                     params['date_to'], hazardous=True)),
+            ('within', 'mmap index', lambda: mapped.within(params['distance'], params['date_from'],
+                                                           params['date_to'], hazardous=True)),
+            ('closest', 'table scan', lambda: scan(CLOSEST)),
+            ('closest', 'index', lambda: index.closest(params['k'])),
+            ('closest', 'mmap index', lambda: mapped.closest(params['k']))
+        )
+        for query, name, function in runs:
+            seconds, result = timed(function, 1 if name == 're-parse' else options.repeat)
+            print(f'{query:<8} {name:<11} results={len(result):<6} time={seconds * 1000:10.3f}ms')
+        
+        mapped.close()
+        engine.dispose()
@@ -0,0 +1,61 @@
+"""
+    Rows per second of bulk load strategies.
+    
+    Runs against temporary SQLite database by default, pass `--url` of MySQL
+    database (with `asteroids_details` table) to include `LOAD DATA LOCAL INFILE`.
+    Run from repository root: `python -m benchmarks.bench_loader`.
+"""
+import argparse
+import tempfile
+import os
+
+import sqlalchemy
+
+from project.database.loader import LOADERS, get_loader
+from project.database.partitions import create_asteroids_details
+from project.parser.parser import AsteroidRowParser
+from benchmarks.synthetic import make_feed
+
+def make_rows(days: int, per_day: int) -> list[tuple]:
+    feed = make_feed('2024-01-01', f'2024-01-{days:02d}', per_day)
+    parser = AsteroidRowParser()
+    return [row for record_set in feed['near_earth_objects'].values()
+            for row in parser.parse_many(record_set)]
+
+def run(engine: sqlalchemy.Engine, rows: list[tuple], strategies: list[str], batch_size: int):
+    with engine.connect() as connection:
+        create_asteroids_details(connection)
+        connection.commit()
+        
+        for strategy in strategies:
+            loader = get_loader(strategy, batch_size=batch_size)
+            try:
+                report = loader.load(connection, rows)
+            except NotImplementedError as e:
+                print(f'{strategy:<12} skipped: {e}')
+                continue
+            finally:
+                connection.rollback()
+                connection.exec_driver_sql('DELETE FROM asteroids_details')
+                connection.commit()
+            
+            print(f'{strategy:<12} rows={report.rows:<8} batches={report.batches:<5} '
+                  f'time={report.seconds:7.3f}s rows/s={report.rows_per_second:12,.0f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', help='SQLAlchemy url of database to load into.')
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--per-day', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--strategies', nargs='+', default=list(LOADERS))
+    options = parser.parse_args()
+    
+    rows = make_rows(options.days, options.per_day)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        url = options.url or f'sqlite:///{os.path.join(directory, "bench.sqlite3")}'
+        engine = sqlalchemy.create_engine(url, connect_args={'local_infile': True}
+                                          if url.startswith('mysql') else {})
+        run(engine, rows, options.strategies, options.batch_size)
+        engine.dispose()
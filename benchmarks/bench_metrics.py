@@ -0,0 +1,45 @@
+"""
+    Overhead of instrumentation on streaming rows from feed file
+    with metrics disabled and enabled.
+    
+    Run from repository root: `python -m benchmarks.bench_metrics`.
+"""
+import argparse
+import tempfile
+import time
+import gc
+import os
+
+from project.metrics import metrics
+from project.utils import iter_file_rows
+from benchmarks.synthetic import write_feed_file
+
+def measure(path: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        for _ in iter_file_rows(path):
+            pass
+        best = min(best, time.perf_counter() - started)
+    return best
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--megabytes', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'feed.json')
+        records = write_feed_file(path, options.megabytes * 2 ** 20)
+        print(f'records={records}')
+        
+        metrics.enabled = False
+        disabled = measure(path, options.repeat)
+        metrics.enabled = True
+        enabled = measure(path, options.repeat)
+        
+        print(f'disabled time={disabled:.3f}s')
+        print(f'enabled  time={enabled:.3f}s overhead={(enabled / disabled - 1) * 100:+.1f}%')
+        print(metrics.to_prometheus())
@@ -0,0 +1,51 @@
+"""
+    Speedup of parsing archive of saved feed files across process pool,
+    and size of packed batches sent back from workers vs lists of dicts.
+    
+    Run from repository root: `python -m benchmarks.bench_multiprocess`.
+"""
+import argparse
+import tempfile
+import pickle
+import time
+import json
+import os
+
+import project.utils
+from project.utils import create_filename, find_feed_files, split_date_range, process_file
+from project.parser.bulk import iter_packed_files, pack_file
+from benchmarks.synthetic import make_feed
+
+def write_archive(directory: str, start_date: str, end_date: str, per_day: int) -> None:
+    for window in split_date_range(start_date, end_date):
+        with open(os.path.join(directory, create_filename(*window)), mode='w') as json_file:
+            json.dump(make_feed(*window, per_day), json_file, indent=4)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2022-01-01')
+    parser.add_argument('--end', default='2023-12-31')
+    parser.add_argument('--per-day', type=int, default=100)
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    options = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        write_archive(directory, options.start, options.end, options.per_day)
+        paths = find_feed_files()
+        
+        packed = pack_file(paths[0])
+        mappings = list(process_file(paths[0]))
+        print(f'files={len(paths)} rows/file={len(packed)} '
+              f'pickled packed={len(pickle.dumps(packed)) / len(packed):.0f} B/row '
+              f'dicts={len(pickle.dumps(mappings)) / len(mappings):.0f} B/row')
+        
+        baseline = None
+        for processes in options.processes:
+            started = time.perf_counter()
+            rows = sum(len(batch) for batch in iter_packed_files(paths, processes))
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f'processes={processes:<3} rows={rows:<8} time={elapsed:7.2f}s '
+                  f'speedup={baseline / elapsed:5.2f}x')
@@ -0,0 +1,95 @@
+"""
+    Records per second and allocated bytes of ORM based `AsteroidParser`
+    vs plain tuple `AsteroidRowParser`, which validates and coerces records,
+    also with share of broken records sent to quarantine.
+    
+    `AsteroidParser` is skipped when its model cannot be built.
+    Run from repository root: `python -m benchmarks.bench_parser`.
+"""
+import argparse
+import tracemalloc
+import tempfile
+import random
+import copy
+import time
+import gc
+import os
+
+from project.parser.parser import AsteroidParser, AsteroidRowParser
+from project.parser.validation import Quarantine
+from benchmarks.synthetic import make_feed
+
+def orm_parse(records: list[dict]) -> list:
+    parser = AsteroidParser([])
+    parsed = []
+    for record in records:
+        parser.records = record
+        parsed.extend([parsed_record for parsed_record in parser])
+    return parsed
+
+def row_parse(records: list[dict]) -> list:
+    return AsteroidRowParser().parse_many(records)
+
+def break_records(records: list[dict], rate: float) -> list[dict]:
+    """
+        Return copy of records with `rate` of them missing or having malformed field.
+    """
+    rng = random.Random(0)
+    broken = []
+    for record in records:
+        if rng.random() < rate:
+            record = copy.deepcopy(record)
+            damage = rng.randrange(3)
+            if damage == 0:
+                record['close_approach_data'] = []
+            elif damage == 1:
+                record['estimated_diameter']['kilometers']['estimated_diameter_max'] = 'n/a'
+            else:
+                del record['is_potentially_hazardous_asteroid']
+        broken.append(record)
+    return broken
+
+def measure(name: str, function, records: list[dict], repeat: int):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function(records)
+        best = min(best, time.perf_counter() - started)
+    
+    gc.collect()
+    tracemalloc.start()
+    parsed = function(records)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del parsed
+    
+    print(f'{name:<18} records/s={len(records) / best:12,.0f} '
+          f'retained={allocated / len(records):8.0f} B/record '
+          f'peak={peak / len(records):8.0f} B/record')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--per-day', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--broken-rate', type=float, default=0.01)
+    options = parser.parse_args()
+    
+    feed = make_feed('2024-01-01', f'2024-01-{options.days:02d}', options.per_day)
+    records = [record for record_set in feed['near_earth_objects'].values()
+               for record in record_set]
+    print(f'records={len(records)}')
+    
+    measure('AsteroidRowParser', row_parse, records, options.repeat)
+    with tempfile.TemporaryDirectory() as directory:
+        quarantine = Quarantine(os.path.join(directory, 'quarantine.jsonl'))
+        broken = break_records(records, options.broken_rate)
+        measure(f'{options.broken_rate:.0%} broken',
+                lambda records: AsteroidRowParser(quarantine=quarantine).parse_many(records),
+                broken, options.repeat)
+        quarantine.close()
+    try:
+        measure('AsteroidParser', orm_parse, records, options.repeat)
+    except Exception as e:
+        print(f'AsteroidParser     skipped, model is not available: {e}')
@@ -0,0 +1,52 @@
+"""
+    Time and API requests needed to finish interrupted backfill, re-running
+    whole range versus resuming from run ledger.
+    
+    Run from repository root: `python -m benchmarks.bench_resume`.
+"""
+import argparse
+import contextlib
+import tempfile
+import time
+import io
+import os
+
+import project.utils
+from project import Pipeline
+from project.pipeline.ledger import RunLedger
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import count_rows, create_sqlite_engine
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-06-30')
+    parser.add_argument('--interrupted-at', default='2023-04-15')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--per-day', type=int, default=100)
+    parser.add_argument('--api-latency', type=float, default=0.2)
+    options = parser.parse_args()
+    
+    with StubNeoWsServer(latency=options.api_latency, per_day=options.per_day) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        
+        for name, resume in (('rerun', False), ('resume', True)):
+            engine = create_sqlite_engine(os.path.join(directory, f'{name}.sqlite3'))
+            ledger = RunLedger(os.path.join(directory, f'{name}-ledger.sqlite3'))
+            pipeline = Pipeline('DEMO_KEY', max_workers=options.workers, ledger=ledger)
+            pipeline.extractor.url = stub.feed_url
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                # First run stops part way through the range
+                pipeline.do_range_pipeline(engine, options.start, options.interrupted_at)
+                
+                requests = stub.requests
+                started = time.perf_counter()
+                pipeline.do_range_pipeline(engine, options.start, options.end, resume=resume)
+                elapsed = time.perf_counter() - started
+            
+            print(f'{name:<7} rows={count_rows(engine):<8} '
+                  f'requests={stub.requests - requests:<5} time={elapsed:7.2f}s')
+            ledger.close()
+            engine.dispose()
@@ -0,0 +1,74 @@
+"""
+    Dashboard query time of aggregating `asteroids_details` per day versus
+    reading precomputed `asteroids_daily`, and cost of keeping it up to date.
+    
+    Run from repository root: `python -m benchmarks.bench_rollup`.
+"""
+import argparse
+import tempfile
+import time
+import os
+
+from project.database.loader import get_loader
+from project.database.rollups import read_rollup, rebuild_daily_rollup, refresh_daily_rollup
+from project.parser.parser import AsteroidRowParser
+from project.utils import add_days_to_date, split_date_range
+from benchmarks.synthetic import make_feed
+from benchmarks.stub_db import create_sqlite_engine
+
+AGGREGATE_FACT_TABLE = """\
+SELECT DATE(close_approach_date), COUNT(*), SUM(isHazardous), MIN(miss_distance_km), \
+MAX(estimated_diameter_km_max) FROM asteroids_details \
+WHERE close_approach_date >= ? AND close_approach_date < ? \
+GROUP BY DATE(close_approach_date)"""
+
+def best_of(function, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--per-day', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    
+    start_date = '2023-01-01'
+    end_date = add_days_to_date(start_date, options.days - 1)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(os.path.join(directory, 'bench.sqlite3'))
+        loader = get_loader()
+        row_parser = AsteroidRowParser()
+        
+        with engine.connect() as connection:
+            for window in split_date_range(start_date, end_date):
+                feed = make_feed(*window, per_day=options.per_day)
+                loader.load(connection, [row for record_set in feed['near_earth_objects'].values()
+                                         for row in row_parser.parse_many(record_set)])
+        
+        rebuild = best_of(lambda: rebuild_daily_rollup(engine, start_date, end_date), 1)
+        
+        with engine.connect() as connection:
+            window = split_date_range(start_date, end_date)[-1]
+            
+            def refresh_window():
+                refresh_daily_rollup(connection, *window)
+                connection.commit()
+            
+            refresh = best_of(refresh_window, options.repeat)
+            fact = best_of(lambda: connection.exec_driver_sql(
+                AGGREGATE_FACT_TABLE, (start_date, add_days_to_date(end_date, 1))).fetchall(),
+                options.repeat)
+        
+        rollup = best_of(lambda: read_rollup(engine, start_date, end_date), options.repeat)
+        
+        print(f'rows={options.days * options.per_day}')
+        print(f'aggregate fact table  {fact * 1000:9.2f} ms')
+        print(f'read daily rollup     {rollup * 1000:9.2f} ms ({fact / rollup:.0f}x)')
+        print(f'refresh one window    {refresh * 1000:9.2f} ms')
+        print(f'rebuild whole range   {rebuild * 1000:9.2f} ms')
@@ -0,0 +1,49 @@
+"""
+    Range extraction against stub API with small quota and transient 503 errors.
+    
+    Shows how scheduler paces requests, retries failures and reports quota left.
+    Run from repository root: `python -m benchmarks.bench_scheduler`.
+"""
+import argparse
+import tempfile
+import time
+
+import project.utils
+from project.exctract.extractors import NeoWsExtractor
+from benchmarks.stub_api import StubNeoWsServer
+
+def run(start_date: str, end_date: str, workers: int, quota: int,
+        quota_window: float, error_rate: float, rate: float):
+    with StubNeoWsServer(quota=quota, quota_window=quota_window, error_rate=error_rate) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        
+        extractor = NeoWsExtractor('DEMO_KEY', url=stub.feed_url, max_workers=workers,
+                                   requests_per_second=rate)
+        extractor.scheduler.reserve = max(1, quota // 4)
+        extractor.scheduler.quota_window = quota_window
+        
+        started = time.perf_counter()
+        results = extractor.extract_range(start_date, end_date)
+        elapsed = time.perf_counter() - started
+        
+        failed = [result for result in results if not result.ok]
+        print(f'windows={len(results)} failed={len(failed)} time={elapsed:.3f}s')
+        print(f'requests={extractor.scheduler.requests} retries={extractor.scheduler.retries} '
+              f'throttled_by_server={stub.throttled} quota_remaining={extractor.quota_remaining}')
+        for result in failed:
+            print(result)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-06-30')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--quota', type=int, default=20, help='Requests allowed per quota window.')
+    parser.add_argument('--quota-window', type=float, default=2.0, help='Quota window in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    parser.add_argument('--rate', type=float, default=50, help='Client requests per second.')
+    options = parser.parse_args()
+    
+    run(options.start, options.end, options.workers, options.quota,
+        options.quota_window, options.error_rate, options.rate)
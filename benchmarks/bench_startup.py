@@ -0,0 +1,74 @@
+"""
+    CLI startup time for commands which do not need database.
+    
+    Every command runs in fresh interpreter with database pointed to
+    unroutable address; any socket connection attempted during startup
+    is reported as failure. Run from repository root: `python -m benchmarks.bench_startup`.
+"""
+import subprocess
+import argparse
+import json
+import time
+import sys
+import os
+
+GUARD = """
+import sys, runpy
+def audit(event, args):
+    if event == 'socket.connect':
+        sys.stderr.write(f'CONNECT {args[1]}\\n')
+sys.addaudithook(audit)
+"""
+
+COMMANDS = {
+    'import project': 'import project',
+    'import parser': 'import project.parser.parser',
+    'import model': 'import project.model',
+    'main.py --help': "sys.argv = ['main.py', '--help']; runpy.run_path('main.py', run_name='__main__')",
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(command: str, repeat: int) -> tuple[float, list[str]]:
+    """
+        Run command `repeat` times and return best time and attempted connections.
+        Raises RuntimeError with stderr of command when it fails.
+    """
+    environment = dict(
+        os.environ,
+        DYNACONF_API_KEY='DEMO_KEY',
+        DYNACONF_DATABASE=('@json ' + json.dumps({
+            'host': '10.255.255.1', 'port': 3306, 'user': 'neows',
+            'password': 'neows', 'database': 'neows'
+        }))
+    )
+    best, connects = float('inf'), []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', GUARD + command], cwd=ROOT,
+                                env=environment, capture_output=True, text=True)
+        best = min(best, time.perf_counter() - started)
+        if result.returncode != 0:
+            raise RuntimeError(f'exited with {result.returncode}\n{result.stderr.strip()}')
+        connects = [line for line in result.stderr.splitlines() if line.startswith('CONNECT')]
+    return best, connects
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    
+    failed = False
+    for name, command in COMMANDS.items():
+        try:
+            elapsed, connects = run(command, options.repeat)
+        except RuntimeError as e:
+            # Crashed command must not pass as fast startup
+            print(f'{name:<16} FAILED {e}')
+            failed = True
+            continue
+        failed |= bool(connects)
+        print(f'{name:<16} time={elapsed * 1000:8.1f} ms '
+              f'{"CONNECTED " + ", ".join(connects) if connects else "no network"}')
+    
+    sys.exit(1 if failed else 0)
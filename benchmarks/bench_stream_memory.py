@@ -0,0 +1,48 @@
+"""
+    Peak memory and time of whole-file `json.load` vs streaming feed reader.
+    
+    Run from repository root: `python -m benchmarks.bench_stream_memory --size-mb 300`.
+"""
+import argparse
+import tempfile
+import tracemalloc
+import time
+import gc
+import os
+
+from project.utils import read_json_file
+from project.parser.stream import iter_feed_records
+from benchmarks.synthetic import write_feed_file
+
+def load_whole(path: str) -> int:
+    data = read_json_file(path)
+    datasets = data.get('near_earth_objects', {})
+    dates, details = list(datasets.keys()), list(datasets.values())
+    return sum(len(record_set) for record_set in details)
+
+def load_streaming(path: str) -> int:
+    return sum(1 for _ in iter_feed_records(path))
+
+def measure(name: str, function, path: str):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = function(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{name:<10} records={count:<8} time={elapsed:7.2f}s peak={peak / 2 ** 20:9.1f} MiB')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=300)
+    parser.add_argument('--per-day', type=int, default=50)
+    options = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'NeoWs_json_synthetic.json')
+        records = write_feed_file(path, options.size_mb * 2 ** 20, options.per_day)
+        print(f'file={os.path.getsize(path) / 2 ** 20:.1f} MiB records={records}')
+        
+        measure('streaming', load_streaming, path)
+        measure('json.load', load_whole, path)
@@ -0,0 +1,60 @@
+"""
+    End-to-end backfill time of sequential, range and streaming pipeline
+    against stub API with latency and SQLite stand-in with per-batch latency.
+    
+    Run from repository root: `python -m benchmarks.bench_streaming`.
+"""
+import argparse
+import contextlib
+import tempfile
+import time
+import io
+import os
+
+import project.utils
+from project import Pipeline
+from project.database.loader import get_loader
+from project.utils import split_date_range
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import LatencyLoader, count_rows, create_sqlite_engine
+
+def sequential(pipeline: Pipeline, engine, start_date: str, end_date: str):
+    for window in split_date_range(start_date, end_date):
+        pipeline.do_pipeline(engine, *window)
+
+def range_pipeline(pipeline: Pipeline, engine, start_date: str, end_date: str):
+    pipeline.do_range_pipeline(engine, start_date, end_date)
+
+def streaming(pipeline: Pipeline, engine, start_date: str, end_date: str):
+    pipeline.do_streaming_pipeline(engine, start_date, end_date)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2023-06-30')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--per-day', type=int, default=200)
+    parser.add_argument('--api-latency', type=float, default=0.2)
+    parser.add_argument('--db-latency', type=float, default=0.05)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    options = parser.parse_args()
+    
+    with StubNeoWsServer(latency=options.api_latency, per_day=options.per_day) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        
+        for name, run in (('sequential', sequential), ('range', range_pipeline),
+                          ('streaming', streaming)):
+            engine = create_sqlite_engine(os.path.join(directory, f'{name}.sqlite3'))
+            loader = LatencyLoader(get_loader(batch_size=options.batch_size), options.db_latency)
+            pipeline = Pipeline('DEMO_KEY', max_workers=options.workers, loader=loader)
+            pipeline.extractor.url = stub.feed_url
+            
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run(pipeline, engine, options.start, options.end)
+            elapsed = time.perf_counter() - started
+            
+            rows = count_rows(engine)
+            print(f'{name:<11} rows={rows:<8} time={elapsed:7.2f}s rows/s={rows / elapsed:10,.0f}')
+            engine.dispose()
@@ -0,0 +1,80 @@
+"""
+    Rows written by sync daemon polling sliding range of stub API, first
+    into empty database and then after stub changed small part of its
+    asteroids, versus rows written by loading the whole range again.
+    Checks synced table matches full reload of the mutated feed.
+    
+    Run from repository root: `python -m benchmarks.bench_sync`.
+"""
+from datetime import datetime
+import argparse
+import contextlib
+import tempfile
+import time
+import io
+import os
+
+import project.utils
+from project import Pipeline
+from project.pipeline.sync import FingerprintStore, SyncDaemon
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import count_rows, create_sqlite_engine
+
+COMPARED = ('SELECT asteroid_id, close_approach_date, miss_distance_km '
+            'FROM asteroids_details ORDER BY asteroid_id, close_approach_date')
+ROLLUP = ('SELECT day, approaches, hazardous, min_miss_distance_km, max_diameter_km '
+          'FROM asteroids_daily ORDER BY day')
+
+def table(engine, query: str = COMPARED) -> list:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(query).fetchall()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--today', default='2023-06-15')
+    parser.add_argument('--days-back', type=int, default=30)
+    parser.add_argument('--days-ahead', type=int, default=30)
+    parser.add_argument('--per-day', type=int, default=100)
+    parser.add_argument('--change-rate', type=float, default=0.02,
+                        help='Share of asteroids updated between polls, quarter as many '
+                             'are removed and added.')
+    parser.add_argument('--workers', type=int, default=8)
+    options = parser.parse_args()
+    today = datetime.strptime(options.today, '%Y-%m-%d')
+    
+    with StubNeoWsServer(per_day=options.per_day) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        engine = create_sqlite_engine(os.path.join(directory, 'sync.sqlite3'))
+        pipeline = Pipeline('DEMO_KEY', max_workers=options.workers, rollup=True)
+        pipeline.extractor.url = stub.feed_url
+        daemon = SyncDaemon(pipeline, engine,
+                            FingerprintStore(os.path.join(directory, 'fingerprints.sqlite3')),
+                            days_back=options.days_back, days_ahead=options.days_ahead)
+        
+        for name in ('initial', 'unchanged', 'mutated'):
+            if name == 'mutated':
+                changes = stub.mutate(options.change_rate)
+                print(f'{"":<9} stub changes: {changes}')
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = daemon.poll(today)
+            written = report.changed
+            print(f'{name:<9} written={written:<6} of {report.inserted + report.updated + report.unchanged:<6} '
+                  f'inserted={report.inserted:<6} updated={report.updated:<5} '
+                  f'deleted={report.deleted:<5} time={report.seconds:6.2f}s')
+        
+        # Full reload of the same range writes every row again
+        reloaded = create_sqlite_engine(os.path.join(directory, 'reload.sqlite3'))
+        start_date, end_date = daemon.sliding_range(today)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline.do_range_pipeline(reloaded, start_date, end_date)
+        print(f'{"reload":<9} written={count_rows(reloaded):<6} '
+              f'time={time.perf_counter() - started:6.2f}s')
+        
+        same = table(engine) == table(reloaded)
+        same_rollup = table(engine, ROLLUP) == table(reloaded, ROLLUP)
+        print(f'synced table matches reload: {same}, rollup: {same_rollup}')
+        daemon.store.close()
+        engine.dispose()
+        reloaded.dispose()
@@ -0,0 +1,209 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from datetime import datetime, timedelta
+from threading import Thread, Lock
+
+from project.utils import add_days_to_date
+from benchmarks.synthetic import make_asteroid, make_day, make_neo
+
+import hashlib
+import random
+import json
+import time
+
+class StubNeoWsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+    
+    def send_json(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.server.stub.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        
+        allowed, headers = stub.take_quota()
+        time.sleep(stub.latency)
+        
+        if not allowed:
+            return self.send_json(429, {'error': {'code': 'OVER_RATE_LIMIT'}}, headers)
+        if stub.error_rate and stub.random.random() < stub.error_rate:
+            return self.send_json(503, {'error': 'Service Unavailable'}, headers)
+        
+        if url.path == '/neo/rest/v1/feed':
+            start_date = query['start_date']
+            end_date = query.get('end_date') or add_days_to_date(start_date)
+            return self.send_json(200, stub.feed(start_date, end_date), headers)
+        
+        if url.path.startswith(stub.lookup_path):
+            asteroid_id = url.path[len(stub.lookup_path):]
+            if not asteroid_id.isdigit():
+                return self.send_json(404, {'error': f'Unknown asteroid {asteroid_id}'})
+            stub.count_lookup(asteroid_id)
+            return self.send_json(200, make_neo(asteroid_id), headers)
+        
+        self.send_json(404, {'error': f'Unknown endpoint {url.path}'})
+
+class StubNeoWsServer:
+    """
+        Local stand-in for NeoWs API, serving synthetic feeds on a free port.
+        
+        Use as context manager, point extractor to `feed_url`
+        and lookup extractor to `lookup_url`.
+        
+        :param quota: requests allowed per `quota_window` seconds,
+                      further requests get 429 until the window resets.
+        :param error_rate: fraction of requests answered with 503.
+        :param population: number of distinct asteroids of feeds, see `make_day`.
+        
+        Served days can be changed between requests by `mutate`.
+    """
+    lookup_path = '/neo/rest/v1/neo/'
+    
+    def __init__(self, latency: float = 0.0, per_day: int = 15, approaches: int = 1,
+                 quota: int | None = None, quota_window: float = 3600,
+                 error_rate: float = 0.0, seed: int = 0, population: int | None = None):
+        self.latency = latency
+        self.per_day = per_day
+        self.approaches = approaches
+        self.quota = quota
+        self.quota_window = quota_window
+        self.error_rate = error_rate
+        self.population = population
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+        self.lookups: dict[str, int] = {}
+        self._window_started = time.monotonic()
+        self._used = 0
+        self._lock = Lock()
+        self._days: dict[str, list[dict]] = {}
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), StubNeoWsHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    @property
+    def feed_url(self) -> str:
+        return f'{self.base_url}/neo/rest/v1/feed'
+    
+    @property
+    def lookup_url(self) -> str:
+        return f'{self.base_url}{self.lookup_path}'
+    
+    def count_lookup(self, asteroid_id: str):
+        with self._lock:
+            self.lookups[asteroid_id] = self.lookups.get(asteroid_id, 0) + 1
+    
+    def day(self, date: str) -> list[dict]:
+        """
+            Generated asteroids of single day, kept so repeated requests
+            cost only serving and mutations stay in place.
+        """
+        with self._lock:
+            if date not in self._days:
+                self._days[date] = make_day(date, self.per_day, self.approaches,
+                                            population=self.population)
+            return self._days[date]
+    
+    def feed(self, start_date: str, end_date: str) -> dict:
+        """
+            Feed payload of window, see `make_feed`.
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        near_earth_objects = {}
+        while start <= end:
+            date = start.strftime('%Y-%m-%d')
+            near_earth_objects[date] = self.day(date)
+            start += timedelta(days=1)
+        
+        return {'links': {},
+                'element_count': sum(len(day) for day in near_earth_objects.values()),
+                'near_earth_objects': near_earth_objects}
+    
+    def mutate(self, rate: float) -> dict[str, int]:
+        """
+            Change already served days as NASA does between polls, every
+            asteroid has `rate` chance to get new miss distance and `rate / 4`
+            chance to be removed, `rate / 4` of day size new asteroids are added.
+            
+            :return: number of updated, removed and added asteroids.
+        """
+        changes = {'updated': 0, 'removed': 0, 'added': 0}
+        with self._lock:
+            for date, asteroids in self._days.items():
+                kept = []
+                for asteroid in asteroids:
+                    draw = self.random.random()
+                    if draw < rate / 4:
+                        changes['removed'] += 1
+                        continue
+                    if draw < rate + rate / 4:
+                        asteroid = json.loads(json.dumps(asteroid))
+                        miss_distance = asteroid['close_approach_data'][0]['miss_distance']
+                        miss_distance['kilometers'] = f'{self.random.uniform(1e5, 7.5e7):.9f}'
+                        changes['updated'] += 1
+                    kept.append(asteroid)
+                
+                for _ in range(int(len(asteroids) * rate / 4 + self.random.random())):
+                    kept.append(make_asteroid(self.random, date, self.approaches))
+                    changes['added'] += 1
+                asteroids[:] = kept
+        return changes
+    
+    def take_quota(self) -> tuple[bool, dict]:
+        """
+            Count request against quota, return if it is allowed and rate limit headers.
+        """
+        with self._lock:
+            self.requests += 1
+            if self.quota is None:
+                return True, {}
+            
+            if time.monotonic() - self._window_started >= self.quota_window:
+                self._window_started, self._used = time.monotonic(), 0
+            
+            allowed = self._used < self.quota
+            if allowed:
+                self._used += 1
+            else:
+                self.throttled += 1
+            
+            headers = {'X-RateLimit-Limit': self.quota,
+                       'X-RateLimit-Remaining': self.quota - self._used}
+            if not allowed:
+                headers['Retry-After'] = max(1, int(self.quota_window - (time.monotonic() - self._window_started)))
+            return allowed, headers
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
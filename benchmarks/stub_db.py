@@ -0,0 +1,50 @@
+import time
+import os
+
+import sqlalchemy
+
+import constants.queries as const
+from project.database.loader import BulkLoader
+from project.database.partitions import create_asteroids_details
+
+def create_sqlite_engine(path: str | None = None) -> sqlalchemy.Engine:
+    """
+        Function returns SQLite stand-in of MySQL database with `asteroids_details`
+        fan-out, rollup and orbit tables created.
+        
+        :param path: database file, None for in-memory database shared by all threads.
+    """
+    if path is None:
+        engine = sqlalchemy.create_engine('sqlite://', poolclass=sqlalchemy.pool.StaticPool,
+                                          connect_args={'check_same_thread': False})
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        engine = sqlalchemy.create_engine(f'sqlite:///{path}')
+    
+    with engine.connect() as connection:
+        create_asteroids_details(connection)
+        connection.exec_driver_sql(const.CREATE_ASTEROIDS_TABLE)
+        connection.exec_driver_sql(const.CREATE_ASTEROID_APPROACHES_TABLE)
+        connection.exec_driver_sql(const.CREATE_ASTEROIDS_DAILY_TABLE)
+        connection.exec_driver_sql(const.CREATE_ASTEROID_ORBITS_TABLE)
+        connection.commit()
+    return engine
+
+def count_rows(engine: sqlalchemy.Engine, table: str = 'asteroids_details') -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f'SELECT COUNT(*) FROM {table}').scalar()
+
+class LatencyLoader(BulkLoader):
+    """
+        Wraps loader and adds fixed latency to every batch, as round trips
+        to remote database would.
+    """
+    def __init__(self, loader: BulkLoader, latency: float = 0.05):
+        super().__init__(loader.table, loader.columns, loader.batch_size)
+        self.loader = loader
+        self.latency = latency
+        self.strategy = f'{loader.strategy}+latency'
+    
+    def load_batch(self, connection, table, batch):
+        time.sleep(self.latency)
+        self.loader.load_batch(connection, table, batch)
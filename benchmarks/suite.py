@@ -0,0 +1,256 @@
+"""
+    Benchmark suite timing every stage of the pipeline separately and the
+    whole `Pipeline.do_pipeline`, against stub API and SQLite stand-in.
+    
+    Results are printed and written as JSON with `--output`, pass earlier
+    results with `--compare` to print relative change of every stage.
+    Run from repository root: `python -m benchmarks.suite`.
+"""
+from datetime import datetime
+from statistics import median
+
+import contextlib
+import subprocess
+import argparse
+import platform
+import tempfile
+import json
+import time
+import gc
+import io
+import os
+
+import project.utils
+from project import NeoWsExtractor, Pipeline
+from project.database.loader import FanoutLoader, get_loader, load_staged
+from project.metrics import metrics
+from project.parser.parser import AsteroidFanoutParser, AsteroidParser, AsteroidRowParser
+from project.utils import add_days_to_date, process_file, read_json_file, split_date_range
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import LatencyLoader, count_rows, create_sqlite_engine
+
+class StageResult:
+    """
+        Timings of repeated runs of single stage over `items` units of work.
+    """
+    def __init__(self, stage: str, items: int, unit: str, timings: list[float],
+                 breakdown: dict | None = None):
+        self.stage = stage
+        self.items = items
+        self.unit = unit
+        self.timings = timings
+        self.breakdown = breakdown
+    
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+    
+    @property
+    def per_second(self) -> float:
+        return self.items / self.best if self.best else 0.0
+    
+    def as_dict(self) -> dict:
+        result = {'stage': self.stage,
+                  'items': self.items,
+                  'unit': self.unit,
+                  'repeat': len(self.timings),
+                  'min': self.best,
+                  'median': median(self.timings),
+                  'mean': sum(self.timings) / len(self.timings),
+                  'per_second': self.per_second}
+        if self.breakdown is not None:
+            result['breakdown'] = self.breakdown
+        return result
+    
+    def __repr__(self):
+        return (f"{self.stage:<22} {self.unit}={self.items:<8} "
+                f"min={self.best:8.3f}s median={median(self.timings):8.3f}s "
+                f"{self.unit}/s={self.per_second:12,.0f}")
+
+def time_stage(stage: str, function, items: int, unit: str, repeat: int,
+               setup=None) -> StageResult:
+    """
+        Function runs `function` `repeat` times, calling `setup` untimed before each run.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        timings.append(time.perf_counter() - started)
+    return StageResult(stage, items, unit, timings)
+
+def orm_parse(record_sets: list[list[dict]]):
+    parser = AsteroidParser([])
+    for record_set in record_sets:
+        for record in record_set:
+            parser.records = record
+            list(parser)
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(options) -> list[StageResult]:
+    start_date = '2024-01-01'
+    end_date = add_days_to_date(start_date, options.days - 1)
+    windows = split_date_range(start_date, end_date)
+    results = []
+    
+    with StubNeoWsServer(latency=options.api_latency, per_day=options.per_day,
+                         approaches=options.approaches) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        project.utils.JSON_FILE_PATH = directory
+        extractor = NeoWsExtractor('DEMO_KEY')
+        extractor.url = stub.feed_url
+        
+        def extract():
+            for window in windows:
+                extractor.extract(*window)
+        
+        results.append(time_stage('extract', extract, len(windows), 'windows', options.repeat))
+        
+        filenames = sorted(os.listdir(directory))
+        paths = [os.path.join(directory, filename) for filename in filenames]
+        record_sets = [record_set for path in paths
+                       for record_set in read_json_file(path)['near_earth_objects'].values()]
+        records = sum(len(record_set) for record_set in record_sets)
+        
+        def read():
+            for path in paths:
+                read_json_file(path)
+        
+        def row_parse():
+            parser = AsteroidRowParser()
+            for record_set in record_sets:
+                parser.parse_many(record_set)
+        
+        def process():
+            for filename in filenames:
+                for _ in process_file(filename):
+                    pass
+        
+        results.append(time_stage('read_json_file', read, records, 'records', options.repeat))
+        results.append(time_stage('AsteroidRowParser', row_parse, records, 'records', options.repeat))
+        try:
+            results.append(time_stage('AsteroidParser', lambda: orm_parse(record_sets),
+                                      records, 'records', options.repeat))
+        except Exception as e:
+            print(f'AsteroidParser skipped, model is not available: {e}')
+        results.append(time_stage('process_file', process, records, 'records', options.repeat))
+        
+        rows = [row for record_set in record_sets
+                for row in AsteroidRowParser().parse_many(record_set)]
+        engine = create_sqlite_engine(os.path.join(directory, 'bench.sqlite3'))
+        
+        with engine.connect() as connection:
+            def clear():
+                connection.exec_driver_sql('DELETE FROM asteroids_details')
+                connection.commit()
+            
+            for strategy in ('executemany', 'mappings'):
+                loader = LatencyLoader(get_loader(strategy, batch_size=options.batch_size),
+                                       options.db_latency)
+                results.append(time_stage(f'load:{strategy}',
+                                          lambda: loader.load(connection, rows),
+                                          len(rows), 'rows', options.repeat, clear))
+            
+            loader = LatencyLoader(get_loader(batch_size=options.batch_size), options.db_latency)
+            results.append(time_stage('load:staged', lambda: load_staged(connection, loader, rows),
+                                      len(rows), 'rows', options.repeat, clear))
+            clear()
+            
+            fanout_parser = AsteroidFanoutParser()
+            fanout_records = [fanout_parser.parse(record)
+                              for record_set in record_sets for record in record_set]
+            fanout_loader = FanoutLoader(batch_size=options.batch_size)
+            
+            def clear_fanout():
+                connection.exec_driver_sql('DELETE FROM asteroids')
+                connection.exec_driver_sql('DELETE FROM asteroid_approaches')
+                connection.commit()
+                fanout_loader.known_ids = None
+            
+            approaches = sum(len(approaches) for _, approaches in fanout_records)
+            results.append(time_stage('load:fanout',
+                                      lambda: fanout_loader.load(connection, fanout_records),
+                                      approaches, 'rows', options.repeat, clear_fanout))
+        
+        pipeline = Pipeline('DEMO_KEY', loader=LatencyLoader(get_loader(batch_size=options.batch_size),
+                                                             options.db_latency))
+        pipeline.extractor.url = stub.feed_url
+        
+        def do_pipeline():
+            for window in windows:
+                pipeline.do_pipeline(engine, *window)
+        
+        def reset():
+            with engine.connect() as connection:
+                connection.exec_driver_sql('DELETE FROM asteroids_details')
+                connection.commit()
+            metrics.reset()
+        
+        # Stage breakdown of the last run comes from pipeline instrumentation
+        metrics.enabled = True
+        result = time_stage('Pipeline.do_pipeline', do_pipeline, len(rows), 'rows',
+                            options.repeat, reset)
+        metrics.enabled = False
+        result.breakdown = {name: histogram['sum']
+                            for name, histogram in metrics.summary()['histograms'].items()
+                            if name.startswith('stage_seconds')}
+        results.append(result)
+        
+        if count_rows(engine) != len(rows):
+            print(f'Warning: pipeline loaded {count_rows(engine)} of {len(rows)} rows')
+        engine.dispose()
+    
+    return results
+
+def compare(results: list[StageResult], baseline_path: str):
+    with open(baseline_path) as baseline_file:
+        baseline = {result['stage']: result for result in json.load(baseline_file)['results']}
+    
+    print(f'\nCompared to {baseline_path}:')
+    for result in results:
+        if result.stage not in baseline:
+            continue
+        before = baseline[result.stage]['min']
+        print(f'{result.stage:<22} {before:8.3f}s -> {result.best:8.3f}s '
+              f'({(result.best / before - 1) * 100:+6.1f}%)')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--per-day', type=int, default=200)
+    parser.add_argument('--approaches', type=int, default=1)
+    parser.add_argument('--api-latency', type=float, default=0.0)
+    parser.add_argument('--db-latency', type=float, default=0.0)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    parser.add_argument('--compare', help='JSON results of earlier run to compare with.')
+    options = parser.parse_args()
+    
+    results = run_suite(options)
+    for result in results:
+        print(result)
+    
+    if options.output:
+        payload = {'meta': {'created': datetime.now().isoformat(timespec='seconds'),
+                            'revision': git_revision(),
+                            'python': platform.python_version(),
+                            'platform': platform.platform(),
+                            'parameters': vars(options)},
+                   'results': [result.as_dict() for result in results]}
+        with open(options.output, 'w') as output_file:
+            json.dump(payload, output_file, indent=2)
+        print(f'Results written to {options.output}')
+    
+    if options.compare:
+        compare(results, options.compare)
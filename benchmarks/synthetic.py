@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+
+import random
+import json
+
+def make_close_approach(rng: random.Random, date: str) -> dict:
+    """
+        Function returns synthetic `close_approach_data` entry.
+    """
+    velocity = rng.uniform(1, 40)
+    distance = rng.uniform(1e5, 7.5e7)
+    return {
+        'close_approach_date': date,
+        'close_approach_date_full': f'{date} {rng.randrange(24):02d}:{rng.randrange(60):02d}',
+        'epoch_date_close_approach': int(datetime.strptime(date, '%Y-%m-%d').timestamp() * 1000),
+        'relative_velocity': {
+            'kilometers_per_second': f'{velocity:.10f}',
+            'kilometers_per_hour': f'{velocity * 3600:.10f}',
+            'miles_per_hour': f'{velocity * 2236.94:.10f}'
+        },
+        'miss_distance': {
+            'astronomical': f'{distance / 1.496e8:.10f}',
+            'lunar': f'{distance / 384400:.10f}',
+            'kilometers': f'{distance:.9f}',
+            'miles': f'{distance * 0.621371:.10f}'
+        },
+        'orbiting_body': rng.choice(['Earth', 'Earth', 'Earth', 'Mars', 'Venus'])
+    }
+
+def make_asteroid(rng: random.Random, date: str, approaches: int = 1,
+                  asteroid_id: int | None = None) -> dict:
+    """
+        Function returns synthetic asteroid record shaped like NeoWs feed entry.
+    """
+    asteroid_id = str(asteroid_id or rng.randrange(2000000, 54999999))
+    diameter_min = rng.uniform(0.001, 2.0)
+    approach_dates = [date] + [
+        (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=rng.randrange(-20000, 20000)))
+        .strftime('%Y-%m-%d')
+        for _ in range(approaches - 1)
+    ]
+    return {
+        'links': {'self': f'http://api.nasa.gov/neo/rest/v1/neo/{asteroid_id}?api_key=DEMO_KEY'},
+        'id': asteroid_id,
+        'neo_reference_id': asteroid_id,
+        'name': f'({rng.randrange(1990, 2024)} {rng.choice("ABCDEFGHJK")}{rng.choice("ABCDEFGHJK")}{rng.randrange(1, 99)})',
+        'nasa_jpl_url': f'https://ssd.jpl.nasa.gov/tools/sbdb_lookup.html#/?sstr={asteroid_id}',
+        'absolute_magnitude_h': round(rng.uniform(14, 32), 2),
+        'estimated_diameter': {
+            unit: {
+                'estimated_diameter_min': diameter_min * factor,
+                'estimated_diameter_max': diameter_min * factor * 2.2360679775
+            }
+            for unit, factor in (('kilometers', 1), ('meters', 1000),
+                                 ('miles', 0.621371), ('feet', 3280.84))
+        },
+        'is_potentially_hazardous_asteroid': rng.random() < 0.1,
+        'close_approach_data': [make_close_approach(rng, day) for day in approach_dates],
+        'is_sentry_object': False
+    }
+
+def make_day(date: str, per_day: int, approaches: int = 1, seed: int = 0,
+             population: int | None = None) -> list[dict]:
+    """
+        Function returns asteroids approaching on given date, ids are unique within the day.
+        
+        :param population: number of distinct asteroids to draw ids from,
+                           so the same asteroids recur across days.
+    """
+    rng = random.Random(f'{seed}-{date}')
+    ids = range(2000000, 2000000 + population) if population else range(2000000, 54999999)
+    return [make_asteroid(rng, date, approaches, asteroid_id)
+            for asteroid_id in rng.sample(ids, per_day)]
+
+def make_feed(start_date: str, end_date: str, per_day: int = 15,
+              approaches: int = 1, seed: int = 0, population: int | None = None) -> dict:
+    """
+        Function returns synthetic `/neo/rest/v1/feed` payload for given window.
+        The same window and seed always produce the same payload.
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    
+    near_earth_objects = {}
+    while start <= end:
+        date = start.strftime('%Y-%m-%d')
+        near_earth_objects[date] = make_day(date, per_day, approaches, seed, population)
+        start += timedelta(days=1)
+    
+    return {
+        'links': {'self': f'http://api.nasa.gov/neo/rest/v1/feed?start_date={start_date}&end_date={end_date}'},
+        'element_count': per_day * len(near_earth_objects),
+        'near_earth_objects': near_earth_objects
+    }
+
+def make_neo(asteroid_id: int | str, seed: int = 0) -> dict:
+    """
+        Function returns synthetic `/neo/rest/v1/neo/{id}` payload, asteroid
+        record with its `orbital_data`. The same id always gives the same payload.
+    """
+    rng = random.Random(f'{seed}-neo-{asteroid_id}')
+    neo = make_asteroid(rng, '2000-01-01', approaches=3, asteroid_id=int(asteroid_id))
+    semi_major_axis = rng.uniform(0.6, 4.0)
+    eccentricity = rng.uniform(0.01, 0.9)
+    first_observed = datetime(1990, 1, 1) + timedelta(days=rng.randrange(10000))
+    neo['orbital_data'] = {
+        'orbit_id': str(rng.randrange(1, 900)),
+        'orbit_determination_date': (first_observed + timedelta(days=rng.randrange(3000, 9000)))
+                                    .strftime('%Y-%m-%d %H:%M:%S'),
+        'first_observation_date': first_observed.strftime('%Y-%m-%d'),
+        'last_observation_date': (first_observed + timedelta(days=rng.randrange(1, 3000)))
+                                 .strftime('%Y-%m-%d'),
+        'data_arc_in_days': rng.randrange(1, 3000),
+        'observations_used': rng.randrange(5, 2000),
+        'orbit_uncertainty': str(rng.randrange(10)),
+        'minimum_orbit_intersection': f'{rng.uniform(0, 0.5):.7f}',
+        'jupiter_tisserand_invariant': f'{rng.uniform(2, 7):.3f}',
+        'epoch_osculation': '2460600.5',
+        'eccentricity': f'{eccentricity:.16f}',
+        'semi_major_axis': f'{semi_major_axis:.16f}',
+        'inclination': f'{rng.uniform(0, 60):.16f}',
+        'ascending_node_longitude': f'{rng.uniform(0, 360):.16f}',
+        'orbital_period': f'{365.25 * semi_major_axis ** 1.5:.16f}',
+        'perihelion_distance': f'{semi_major_axis * (1 - eccentricity):.16f}',
+        'perihelion_argument': f'{rng.uniform(0, 360):.16f}',
+        'aphelion_distance': f'{semi_major_axis * (1 + eccentricity):.16f}',
+        'perihelion_time': f'{rng.uniform(2459000, 2462000):.10f}',
+        'mean_anomaly': f'{rng.uniform(0, 360):.16f}',
+        'mean_motion': f'{0.9856 / semi_major_axis ** 1.5:.16f}',
+        'equinox': 'J2000',
+        'orbit_class': {
+            'orbit_class_type': rng.choice(['APO', 'AMO', 'ATE', 'IEO']),
+            'orbit_class_description': 'Near-Earth asteroid orbits',
+            'orbit_class_range': 'a (semi-major axis) > 1.0 AU; q (perihelion) < 1.017 AU'
+        }
+    }
+    return neo
+
+def write_feed_file(path: str, target_bytes: int, per_day: int = 15,
+                    approaches: int = 1, start_date: str = '2000-01-01', seed: int = 0) -> int:
+    """
+        Function writes pretty-printed feed file of roughly `target_bytes` size,
+        one day at a time so the whole payload is never held in memory.
+        
+        :return: number of asteroid records written.
+    """
+    day = datetime.strptime(start_date, '%Y-%m-%d')
+    written = 0
+    
+    with open(path, mode='w') as json_file:
+        json_file.write('{\n    "links": {},\n    "near_earth_objects": {')
+        separator = '\n'
+        while json_file.tell() < target_bytes:
+            date = day.strftime('%Y-%m-%d')
+            records = make_day(date, per_day, approaches, seed)
+            json_file.write(f'{separator}        "{date}": ')
+            json_file.write(json.dumps(records, indent=4))
+            separator = ',\n'
+            written += per_day
+            day += timedelta(days=1)
+        json_file.write(f'\n    }},\n    "element_count": {written}\n}}\n')
+    
+    return written
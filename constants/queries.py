@@ -1,7 +1,11 @@
 CREATE_NEOWS_DATABASE = """CREATE DATABASE IF NOT EXISTS neows"""
 
-CREATE_ASTEROIDS_OBSERVATIONS_TABLE = """\
+# MySQL keys of partitioned table have to include partitioning column,
+# hence primary key (id, close_approach_date)
+CREATE_ASTEROIDS_OBSERVATIONS_TABLE = {
+    'mysql': """\
 CREATE TABLE IF NOT EXISTS asteroids_details (\
+id BIGINT NOT NULL AUTO_INCREMENT,\
 asteroid_id INTEGER NOT NULL,\
 neo_reference_id INTEGER NOT NULL,\
 absolute_magnitude DOUBLE NOT NULL,\
@@ -10,10 +14,337 @@ estimated_diameter_km_min DOUBLE NOT NULL,\
 isHazardous BOOL NOT NULL,\
 close_approach_date DATETIME NOT NULL,\
 miss_distance_km DOUBLE NOT NULL,\
-uploaded_date DATETIME NOT NULL\
+uploaded_date DATETIME NOT NULL,\
+PRIMARY KEY (id, close_approach_date),\
+CONSTRAINT uq_asteroid_approach UNIQUE (asteroid_id, close_approach_date),\
+INDEX ix_asteroids_details_date (close_approach_date),\
+INDEX ix_asteroids_details_asteroid (asteroid_id),\
+INDEX ix_asteroids_details_hazardous (isHazardous, close_approach_date)\
+)
+""",
+    'sqlite': """\
+CREATE TABLE IF NOT EXISTS asteroids_details (\
+id INTEGER PRIMARY KEY,\
+asteroid_id INTEGER NOT NULL,\
+neo_reference_id INTEGER NOT NULL,\
+absolute_magnitude DOUBLE NOT NULL,\
+estimated_diameter_km_max DOUBLE NOT NULL,\
+estimated_diameter_km_min DOUBLE NOT NULL,\
+isHazardous BOOL NOT NULL,\
+close_approach_date DATETIME NOT NULL,\
+miss_distance_km DOUBLE NOT NULL,\
+uploaded_date DATETIME NOT NULL,\
+CONSTRAINT uq_asteroid_approach UNIQUE (asteroid_id, close_approach_date)\
 )
 """
+}
+
+# SQLite can not declare indexes inline, MySQL has them in table definition
+CREATE_ASTEROIDS_DETAILS_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS ix_asteroids_details_date ON asteroids_details (close_approach_date)""",
+    """CREATE INDEX IF NOT EXISTS ix_asteroids_details_asteroid ON asteroids_details (asteroid_id)""",
+    """\
+CREATE INDEX IF NOT EXISTS ix_asteroids_details_hazardous \
+ON asteroids_details (isHazardous, close_approach_date)"""
+]
+
+# Appended to MySQL table definition, one partition per approach month
+PARTITION_ASTEROIDS_BY_MONTH = """\
+PARTITION BY RANGE (TO_DAYS(close_approach_date)) ({partitions})"""
+
+ASTEROIDS_MONTH_PARTITION = """\
+PARTITION {name} VALUES LESS THAN (TO_DAYS('{bound}'))"""
+
+ASTEROIDS_FUTURE_PARTITION = """PARTITION p_future VALUES LESS THAN MAXVALUE"""
+
+SELECT_ASTEROIDS_PARTITIONS = """\
+SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM INFORMATION_SCHEMA.PARTITIONS \
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'asteroids_details' \
+AND PARTITION_NAME IS NOT NULL \
+ORDER BY PARTITION_ORDINAL_POSITION"""
+
+SPLIT_ASTEROIDS_FUTURE_PARTITION = """\
+ALTER TABLE asteroids_details REORGANIZE PARTITION p_future INTO ({partitions})"""
+
+TRUNCATE_ASTEROIDS_PARTITIONS = """\
+ALTER TABLE asteroids_details TRUNCATE PARTITION {partitions}"""
+
+DROP_ASTEROIDS_PARTITIONS = """\
+ALTER TABLE asteroids_details DROP PARTITION {partitions}"""
+
+DELETE_ASTEROIDS_DATE_RANGE = """\
+DELETE FROM asteroids_details \
+WHERE close_approach_date >= :date_from AND close_approach_date < :date_to"""
+
+# Rows which disappeared from feed, deleted one by one by sync daemon
+DELETE_ASTEROIDS_BY_KEY = """\
+DELETE FROM asteroids_details \
+WHERE asteroid_id = :asteroid_id AND close_approach_date = :close_approach_date"""
+
+# Table created before partitioning is copied into partitioned `asteroids_details_new`,
+# keeping the most recently uploaded row of every (asteroid_id, close_approach_date),
+# then both are swapped by single atomic rename, so failed rebuild leaves table as it was
+DROP_ASTEROIDS_NEW = """DROP TABLE IF EXISTS asteroids_details_new"""
+
+COPY_ASTEROIDS_TO_NEW = """\
+INSERT IGNORE INTO asteroids_details_new (asteroid_id, neo_reference_id, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, \
+close_approach_date, miss_distance_km, uploaded_date) \
+SELECT asteroid_id, neo_reference_id, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, \
+close_approach_date, miss_distance_km, uploaded_date \
+FROM asteroids_details ORDER BY uploaded_date DESC"""
+
+SWAP_ASTEROIDS_NEW = """\
+RENAME TABLE asteroids_details TO asteroids_details_old, \
+asteroids_details_new TO asteroids_details"""
+
+DROP_ASTEROIDS_OLD = """DROP TABLE asteroids_details_old"""
+
+# Rows of `asteroids_details_old` left by interrupted rebuild are moved back,
+# rows already in `asteroids_details` win
+RESTORE_ASTEROIDS_FROM_OLD = """\
+INSERT IGNORE INTO asteroids_details (asteroid_id, neo_reference_id, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, \
+close_approach_date, miss_distance_km, uploaded_date) \
+SELECT asteroid_id, neo_reference_id, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, \
+close_approach_date, miss_distance_km, uploaded_date \
+FROM asteroids_details_old ORDER BY uploaded_date DESC"""
 
 TRUNCATE_ASTEROIDS_OBSERVATIONS_TABLE = """
 TRUNCATE TABLE asteroids_details
-"""
\ No newline at end of file
+"""
+
+CREATE_ASTEROIDS_STAGING_TABLE = """\
+CREATE TEMPORARY TABLE asteroids_details_temp AS \
+SELECT asteroid_id, neo_reference_id, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, \
+close_approach_date, miss_distance_km, uploaded_date \
+FROM asteroids_details LIMIT 0
+"""
+
+# Without TEMPORARY keyword MySQL would implicitly commit
+DROP_ASTEROIDS_STAGING_TABLE = {
+    'mysql': """DROP TEMPORARY TABLE IF EXISTS asteroids_details_temp""",
+    'sqlite': """DROP TABLE IF EXISTS temp.asteroids_details_temp"""
+}
+
+_MERGE_STAGED_ASTEROIDS_SELECT = """\
+INSERT INTO asteroids_details (asteroid_id, neo_reference_id, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, \
+close_approach_date, miss_distance_km, uploaded_date) \
+SELECT asteroid_id, neo_reference_id, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, \
+close_approach_date, miss_distance_km, uploaded_date \
+FROM asteroids_details_temp \
+"""
+
+# Upsert of staging table into target, keyed on (asteroid_id, close_approach_date)
+MERGE_STAGED_ASTEROIDS = {
+    'mysql': _MERGE_STAGED_ASTEROIDS_SELECT + """\
+ON DUPLICATE KEY UPDATE \
+neo_reference_id = VALUES(neo_reference_id), \
+absolute_magnitude = VALUES(absolute_magnitude), \
+estimated_diameter_km_max = VALUES(estimated_diameter_km_max), \
+estimated_diameter_km_min = VALUES(estimated_diameter_km_min), \
+isHazardous = VALUES(isHazardous), \
+miss_distance_km = VALUES(miss_distance_km), \
+uploaded_date = VALUES(uploaded_date)""",
+    'sqlite': _MERGE_STAGED_ASTEROIDS_SELECT + """\
+WHERE true \
+ON CONFLICT (asteroid_id, close_approach_date) DO UPDATE SET \
+neo_reference_id = excluded.neo_reference_id, \
+absolute_magnitude = excluded.absolute_magnitude, \
+estimated_diameter_km_max = excluded.estimated_diameter_km_max, \
+estimated_diameter_km_min = excluded.estimated_diameter_km_min, \
+isHazardous = excluded.isHazardous, \
+miss_distance_km = excluded.miss_distance_km, \
+uploaded_date = excluded.uploaded_date"""
+}
+
+# Asteroid dimension of close approach fan-out, one row per asteroid
+CREATE_ASTEROIDS_TABLE = """\
+CREATE TABLE IF NOT EXISTS asteroids (\
+asteroid_id INTEGER NOT NULL PRIMARY KEY,\
+neo_reference_id INTEGER NOT NULL,\
+name VARCHAR(64) NOT NULL,\
+absolute_magnitude DOUBLE NOT NULL,\
+estimated_diameter_km_max DOUBLE NOT NULL,\
+estimated_diameter_km_min DOUBLE NOT NULL,\
+isHazardous BOOL NOT NULL,\
+is_sentry_object BOOL NOT NULL,\
+uploaded_date DATETIME NOT NULL\
+)
+"""
+
+# Every close approach of every asteroid
+CREATE_ASTEROID_APPROACHES_TABLE = """\
+CREATE TABLE IF NOT EXISTS asteroid_approaches (\
+asteroid_id INTEGER NOT NULL,\
+close_approach_date DATETIME NOT NULL,\
+close_approach_epoch BIGINT,\
+relative_velocity_kps DOUBLE NOT NULL,\
+miss_distance_km DOUBLE NOT NULL,\
+orbiting_body VARCHAR(16) NOT NULL,\
+uploaded_date DATETIME NOT NULL,\
+CONSTRAINT uq_approach UNIQUE (asteroid_id, close_approach_date, orbiting_body)\
+)
+"""
+
+SELECT_ASTEROID_IDS = """SELECT asteroid_id FROM asteroids"""
+
+# Asteroids already in dimension keep their row
+INSERT_ASTEROIDS = {
+    'mysql': """\
+INSERT INTO asteroids (asteroid_id, neo_reference_id, name, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, is_sentry_object, \
+uploaded_date) \
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) \
+ON DUPLICATE KEY UPDATE asteroid_id = asteroid_id""",
+    'sqlite': """\
+INSERT INTO asteroids (asteroid_id, neo_reference_id, name, absolute_magnitude, \
+estimated_diameter_km_max, estimated_diameter_km_min, isHazardous, is_sentry_object, \
+uploaded_date) \
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) \
+ON CONFLICT (asteroid_id) DO NOTHING"""
+}
+
+# Upsert keyed on (asteroid_id, close_approach_date, orbiting_body)
+UPSERT_ASTEROID_APPROACHES = {
+    'mysql': """\
+INSERT INTO asteroid_approaches (asteroid_id, close_approach_date, close_approach_epoch, \
+relative_velocity_kps, miss_distance_km, orbiting_body, uploaded_date) \
+VALUES (%s, %s, %s, %s, %s, %s, %s) \
+ON DUPLICATE KEY UPDATE \
+close_approach_epoch = VALUES(close_approach_epoch), \
+relative_velocity_kps = VALUES(relative_velocity_kps), \
+miss_distance_km = VALUES(miss_distance_km), \
+uploaded_date = VALUES(uploaded_date)""",
+    'sqlite': """\
+INSERT INTO asteroid_approaches (asteroid_id, close_approach_date, close_approach_epoch, \
+relative_velocity_kps, miss_distance_km, orbiting_body, uploaded_date) \
+VALUES (?, ?, ?, ?, ?, ?, ?) \
+ON CONFLICT (asteroid_id, close_approach_date, orbiting_body) DO UPDATE SET \
+close_approach_epoch = excluded.close_approach_epoch, \
+relative_velocity_kps = excluded.relative_velocity_kps, \
+miss_distance_km = excluded.miss_distance_km, \
+uploaded_date = excluded.uploaded_date"""
+}
+
+# Orbital data of asteroids from lookup endpoint, one row per asteroid
+CREATE_ASTEROID_ORBITS_TABLE = """\
+CREATE TABLE IF NOT EXISTS asteroid_orbits (\
+asteroid_id INTEGER NOT NULL PRIMARY KEY,\
+orbit_id VARCHAR(16) NOT NULL,\
+orbit_class_type VARCHAR(8),\
+orbit_determination_date DATETIME NOT NULL,\
+first_observation_date DATE NOT NULL,\
+last_observation_date DATE NOT NULL,\
+observations_used INTEGER,\
+orbit_uncertainty VARCHAR(4),\
+minimum_orbit_intersection DOUBLE,\
+eccentricity DOUBLE NOT NULL,\
+semi_major_axis DOUBLE NOT NULL,\
+inclination DOUBLE NOT NULL,\
+ascending_node_longitude DOUBLE NOT NULL,\
+perihelion_distance DOUBLE NOT NULL,\
+aphelion_distance DOUBLE NOT NULL,\
+orbital_period DOUBLE NOT NULL,\
+mean_anomaly DOUBLE NOT NULL,\
+uploaded_date DATETIME NOT NULL\
+)
+"""
+
+# Upsert keyed on asteroid_id, newer orbit determination replaces older
+UPSERT_ASTEROID_ORBITS = {
+    'mysql': """\
+INSERT INTO asteroid_orbits (asteroid_id, orbit_id, orbit_class_type, orbit_determination_date, \
+first_observation_date, last_observation_date, observations_used, orbit_uncertainty, \
+minimum_orbit_intersection, eccentricity, semi_major_axis, inclination, ascending_node_longitude, \
+perihelion_distance, aphelion_distance, orbital_period, mean_anomaly, uploaded_date) \
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) \
+ON DUPLICATE KEY UPDATE \
+orbit_id = VALUES(orbit_id), \
+orbit_class_type = VALUES(orbit_class_type), \
+orbit_determination_date = VALUES(orbit_determination_date), \
+first_observation_date = VALUES(first_observation_date), \
+last_observation_date = VALUES(last_observation_date), \
+observations_used = VALUES(observations_used), \
+orbit_uncertainty = VALUES(orbit_uncertainty), \
+minimum_orbit_intersection = VALUES(minimum_orbit_intersection), \
+eccentricity = VALUES(eccentricity), \
+semi_major_axis = VALUES(semi_major_axis), \
+inclination = VALUES(inclination), \
+ascending_node_longitude = VALUES(ascending_node_longitude), \
+perihelion_distance = VALUES(perihelion_distance), \
+aphelion_distance = VALUES(aphelion_distance), \
+orbital_period = VALUES(orbital_period), \
+mean_anomaly = VALUES(mean_anomaly), \
+uploaded_date = VALUES(uploaded_date)""",
+    'sqlite': """\
+INSERT INTO asteroid_orbits (asteroid_id, orbit_id, orbit_class_type, orbit_determination_date, \
+first_observation_date, last_observation_date, observations_used, orbit_uncertainty, \
+minimum_orbit_intersection, eccentricity, semi_major_axis, inclination, ascending_node_longitude, \
+perihelion_distance, aphelion_distance, orbital_period, mean_anomaly, uploaded_date) \
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) \
+ON CONFLICT (asteroid_id) DO UPDATE SET \
+orbit_id = excluded.orbit_id, \
+orbit_class_type = excluded.orbit_class_type, \
+orbit_determination_date = excluded.orbit_determination_date, \
+first_observation_date = excluded.first_observation_date, \
+last_observation_date = excluded.last_observation_date, \
+observations_used = excluded.observations_used, \
+orbit_uncertainty = excluded.orbit_uncertainty, \
+minimum_orbit_intersection = excluded.minimum_orbit_intersection, \
+eccentricity = excluded.eccentricity, \
+semi_major_axis = excluded.semi_major_axis, \
+inclination = excluded.inclination, \
+ascending_node_longitude = excluded.ascending_node_longitude, \
+perihelion_distance = excluded.perihelion_distance, \
+aphelion_distance = excluded.aphelion_distance, \
+orbital_period = excluded.orbital_period, \
+mean_anomaly = excluded.mean_anomaly, \
+uploaded_date = excluded.uploaded_date"""
+}
+
+# Daily aggregates of `asteroids_details` read by dashboards
+CREATE_ASTEROIDS_DAILY_TABLE = """\
+CREATE TABLE IF NOT EXISTS asteroids_daily (\
+day DATE NOT NULL PRIMARY KEY,\
+approaches INTEGER NOT NULL,\
+hazardous INTEGER NOT NULL,\
+min_miss_distance_km DOUBLE NOT NULL,\
+max_diameter_km DOUBLE NOT NULL,\
+updated_at DATETIME NOT NULL\
+)
+"""
+
+DELETE_ASTEROIDS_DAILY_RANGE = """\
+DELETE FROM asteroids_daily WHERE day >= :date_from AND day < :date_to"""
+
+# Recomputes days of range from rows approaching that day only,
+# served by index on close_approach_date
+INSERT_ASTEROIDS_DAILY_RANGE = """\
+INSERT INTO asteroids_daily (day, approaches, hazardous, min_miss_distance_km, \
+max_diameter_km, updated_at) \
+SELECT DATE(close_approach_date), COUNT(*), SUM(isHazardous), MIN(miss_distance_km), \
+MAX(estimated_diameter_km_max), CURRENT_TIMESTAMP \
+FROM asteroids_details \
+WHERE close_approach_date >= :date_from AND close_approach_date < :date_to \
+GROUP BY DATE(close_approach_date)"""
+
+SELECT_ASTEROIDS_DAILY = """\
+SELECT day, approaches, hazardous, min_miss_distance_km, max_diameter_km \
+FROM asteroids_daily WHERE day >= :date_from AND day < :date_to ORDER BY day"""
+
+SELECT_ASTEROIDS_WEEKLY = {
+    'mysql': """\
+SELECT MIN(day), SUM(approaches), SUM(hazardous), MIN(min_miss_distance_km), MAX(max_diameter_km) \
+FROM asteroids_daily WHERE day >= :date_from AND day < :date_to \
+GROUP BY YEARWEEK(day, 3) ORDER BY MIN(day)""",
+    'sqlite': """\
+SELECT MIN(day), SUM(approaches), SUM(hazardous), MIN(min_miss_distance_km), MAX(max_diameter_km) \
+FROM asteroids_daily WHERE day >= :date_from AND day < :date_to \
+GROUP BY strftime('%Y-%W', day) ORDER BY MIN(day)"""
+}
@@ -1,72 +1,166 @@
+from datetime import datetime, timedelta
+
+import os
+
 import sqlalchemy
 import sqlalchemy.exc
-from sqlalchemy.orm import sessionmaker
-import pymysql as db
 
 from config import settings
 
 from project import NeoWsExtractor, Pipeline
+from project.exctract.cache import FeedCache
+from project.exctract.enrichment import LookupCache, NeoWsLookupExtractor
+from project.export.exporter import ColumnarExporter
+from project.pipeline.ledger import RunLedger
+from project.pipeline.sync import SYNC_STATE_PATH, FingerprintStore
+from project.parser.validation import QUARANTINE_PATH, quarantine
+from project.query.index import INDEX_COLUMNS, INDEX_PATH, ApproachIndex, describe_sources
+from project.metrics import metrics
 from project.arguments import parse_arguments
 from project.utils import logger
 from project.utils import (
-    get_mysql_engine,
-    process_file
+    FEED_FILE_WINDOW,
+    LOAD_BATCH_SIZE,
+    add_days_to_date,
+    find_feed_files,
+    split_date_range
 )
 
 from project.database import (
+    BulkLoader,
     database_exists,
+    dispose_engines,
+    get_engine,
+    get_loader,
     table_exists,
-    create_database
+    create_asteroids_details,
+    create_database,
+    create_fanout_tables,
+    create_orbits_table,
+    create_rollup_table,
+    drop_partitions_before,
+    ensure_partitions,
+    get_partitions,
+    partition_asteroids_table,
+    rebuild_daily_rollup,
+    restore_asteroids_old,
+    ASTEROIDS_OLD_TABLE
 )
 
-import constants.queries as const
-
 API_KEY = settings['API_KEY']
+LOADER_SETTINGS = settings.get('loader', {})
+LOAD_STRATEGY = LOADER_SETTINGS.get('strategy', 'executemany')
+LOAD_STAGED = LOADER_SETTINGS.get('staged', True)
+PARTITION_SETTINGS = dict(settings.get('partitions', {}))
+ROLLUP_ENABLED = settings.get('rollup', {}).get('enabled', False)
+
+def get_configured_engine(server: bool = False) -> sqlalchemy.Engine:
+    """
+        Function returns process wide engine with pool configured in `[pool]`
+        section of settings, without database selected when `server` is set.
+    """
+    options = dict(settings.get('pool', {}))
+    # `LOAD DATA LOCAL INFILE` has to be allowed by client
+    if LOAD_STRATEGY == 'infile':
+        options['connect_args'] = {'local_infile': True}
+    
+    connection_config = dict(settings.database)
+    if server:
+        connection_config['database'] = None
+    
+    return get_engine(**connection_config, **options)
+
+def get_configured_cache() -> FeedCache | None:
+    """
+        Function returns feed cache configured in `[cache]` section of settings,
+        None unless enabled there or by `--cache` flag.
+    """
+    cache_settings = dict(settings.get('cache', {}))
+    if not (cache_settings.pop('enabled', False) or args.cache):
+        return None
+    return FeedCache(**cache_settings)
+
+def get_configured_ledger() -> RunLedger:
+    """
+        Function returns run ledger stored in path from `[ledger]` section of settings.
+    """
+    return RunLedger(**settings.get('ledger', {}))
+
+def get_configured_exporter() -> ColumnarExporter | None:
+    """
+        Function returns columnar exporter configured in `[export]` section of settings,
+        None unless enabled there or by `--export`/`--export-only` flags.
+    """
+    export_settings = dict(settings.get('export', {}))
+    if not (export_settings.pop('enabled', False) or args.export or args.export_only):
+        return None
+    return ColumnarExporter(**export_settings)
 
-def get_session(engine: sqlalchemy.Engine):
+def get_configured_enricher() -> NeoWsLookupExtractor | None:
     """
-        Function which returns session with binded engine
+        Function returns asteroid lookup extractor with cache configured in
+        `[enrichment]` section of settings, None unless enabled there or by `--enrich` flag.
     """
-    return sessionmaker(bind=engine)
+    enrichment_settings = dict(settings.get('enrichment', {}))
+    if not (enrichment_settings.pop('enabled', False) or args.enrich):
+        return None
+    return NeoWsLookupExtractor(API_KEY, max_workers=args.workers,
+                                cache=LookupCache(**enrichment_settings))
 
-SessionFactory = get_session(get_mysql_engine(**settings.database))
+def get_configured_loader() -> BulkLoader:
+    """
+        Function returns loader configured in `[loader]` section of settings.
+    """
+    return get_loader(LOAD_STRATEGY,
+                      batch_size=LOADER_SETTINGS.get('batch_size', LOAD_BATCH_SIZE))
 
                     
 def create_asteroids_table() -> bool:
     """
         Function creates asteroid table in a given database parameters.
     """
-    engine: sqlalchemy.Engine = get_mysql_engine(**settings.database)
+    engine = get_configured_engine()
     table_name = 'asteroids_details'
     db_name = settings.database['database']
     try:
         # Firstly create database
-        with db.connect(**settings.database) as connection:
-            if not database_exists(connection, db_name):
-                create_database(settings.database)
-            else:
-                logger.info(f'Database `{db_name}` already exists. Skip creating.')
+        server_engine = get_configured_engine(server=True)
+        if not database_exists(server_engine, db_name):
+            create_database(server_engine)
+        else:
+            logger.info(f'Database `{db_name}` already exists. Skip creating.')
+        
+        create_fanout_tables(engine)
+        create_rollup_table(engine)
+        create_orbits_table(engine)
         
         if not table_exists(engine, table_name):
             with engine.connect() as connection:
                 with connection.begin() as trans:
-                    # Then create table `asteroid_details`
-                    connection.execute(sqlalchemy.text(
-                                        const.CREATE_ASTEROIDS_OBSERVATIONS_TABLE)
-                                        )
+                    # Then create table `asteroid_details`, partitioned by approach month
+                    create_asteroids_details(connection, **PARTITION_SETTINGS)
                     trans.commit()
                     logger.info(f'Table `{table_name}` created succesfully.')
-                    return True
+            if table_exists(engine, ASTEROIDS_OLD_TABLE):
+                restore_asteroids_old(engine)
+            return True
         else:
             logger.info(f'Table `{table_name}` already exists. Skip creating.')
+            if table_exists(engine, ASTEROIDS_OLD_TABLE):
+                # Rows of interrupted rebuild are moved back before checking partitions
+                restore_asteroids_old(engine)
+            if not get_partitions(engine):
+                # Rebuild deduplicates rows and adds unique index as well
+                partition_asteroids_table(engine, **PARTITION_SETTINGS)
+            else:
+                months_ahead = PARTITION_SETTINGS.get('months_ahead', 24)
+                ensure_partitions(engine, datetime.now() + timedelta(days=31 * months_ahead))
                 
     except sqlalchemy.exc.SQLAlchemyError as e:
         print(f"Database error: {e}")
         if 'trans' in locals():
             trans.rollback()
         return False
-    finally:
-        engine.dispose()
 
 def simple_extract():
     """
@@ -74,10 +168,16 @@ def simple_extract():
     """
     try:
         start_date, end_date = args.extract.split(' ') if len(args.extract.split(' ')) > 1 else (args.extract, None)
-        extractor = NeoWsExtractor(API_KEY)
-        extraction_result = extractor.extract(start_date, end_date)
+        extractor = NeoWsExtractor(API_KEY, max_workers=args.workers,
+                                   cache=get_configured_cache())
+        
+        if end_date and len(split_date_range(start_date, end_date)) > 1:
+            for window_result in extractor.extract_range(start_date, end_date):
+                print(window_result)
+        else:
+            extraction_result = extractor.extract(start_date, end_date)
+            print(extraction_result)
         logger.info('Data extraction completed successfully.')
-        print(extraction_result)
     except Exception as e:
         logger.error(f'Error during extraction: {e}')
     
@@ -85,50 +185,256 @@ def simple_read_file():
     """
     Function to read and process a file, inserting its content into the database.
     """
+    file_path = args.read_file
+    dates = FEED_FILE_WINDOW.search(os.path.basename(file_path))
+
     try:
-        from project.model import TargetData
-    except ImportError:
-        return
+        pipeline = Pipeline(API_KEY, loader=get_configured_loader(), staged=LOAD_STAGED,
+                            rollup=ROLLUP_ENABLED, fanout=args.fanout,
+                            enricher=get_configured_enricher())
+        # Loads fan-out tables instead of `asteroids_details` with `--fanout`
+        pipeline.load_window(get_configured_engine(),
+                             *(dates.groups() if dates else (file_path, file_path)), file_path)
+    except sqlalchemy.exc.SQLAlchemyError as error:
+        print(f'Error during data insertion: {error}')
+    except ValueError as error:
+        logger.error(f'Invalid pipeline options: {error}')
+            
+def get_approach_index() -> ApproachIndex:
+    """
+        Function returns close approach index from path in `[index]` section
+        of settings, built again from saved feed files and feed cache when
+        any of them was added, changed or removed since it was built.
+    """
+    path = settings.get('index', {}).get('path', INDEX_PATH)
+    paths = find_feed_files()
+    cache = get_configured_cache()
+    sources = describe_sources([*paths, *(entry.path for entry in cache.entries())]
+                               if cache is not None else paths)
+    if args.rebuild_index or ApproachIndex.read_sources(path) != sources:
+        index = ApproachIndex.from_files(paths, cache)
+        size = index.save(path)
+        logger.info(f'Close approach index of {len(index.sources)} files saved to {path} ({size} bytes).')
+    return ApproachIndex.load(path)
 
-    file_path = args.read_file
-    records = process_file(file_path)
-
-    if records:
-        try:
-            with SessionFactory() as session:
-                session.bulk_insert_mappings(TargetData, records)
-                session.commit()
-                print('Data inserted successfully')
-        except sqlalchemy.exc.SQLAlchemyError as error:
-            print(f'Error during data insertion: {error}')
-            session.rollback()
-        finally:
-            session.close()
+def query_index():
+    """
+    Function to answer close approach questions from index of saved feed files.
+    """
+    kind, *params = args.query.split(' ')
+    hazardous = True if args.hazardous else None
+    try:
+        index = get_approach_index()
+        if kind == 'within':
+            rows = index.within(float(params[0]), *params[1:3], hazardous=hazardous)
+        elif kind == 'closest':
+            rows = index.closest(int(params[0]), *params[1:3], hazardous=hazardous)
+        elif kind == 'between':
+            rows = index.between(*params[:2], hazardous=hazardous)
+        elif kind == 'hazardous':
+            print(f'Hazardous approaches: {index.hazardous_count(*params[:2])}')
+            return
+        else:
+            logger.error(f'Unknown query `{kind}`, use within, closest, between or hazardous.')
+            return
+    except (ValueError, IndexError, OSError) as e:
+        logger.error(f'Query failed: {e}')
+        return
+    
+    print(' '.join(f'{column:>25}' for column in INDEX_COLUMNS))
+    for row in rows:
+        print(' '.join(f'{value!s:>25}' for value in row))
+    print(f'{len(rows)} approaches, {index}')
             
+def get_configured_pipeline() -> Pipeline:
+    return Pipeline(API_KEY, max_workers=args.workers,
+                    loader=get_configured_loader(), staged=LOAD_STAGED,
+                    cache=get_configured_cache(), ledger=get_configured_ledger(),
+                    fanout=args.fanout, rollup=ROLLUP_ENABLED,
+                    exporter=get_configured_exporter(), load_database=not args.export_only,
+                    enricher=get_configured_enricher())
+
 def do_pipeline():
-    pipeline = Pipeline(API_KEY)
     try:
+        pipeline = get_configured_pipeline()
         start_date, end_date = (args.pipeline.split(' ')
                             if len(args.pipeline.split(' ')) > 1
                             else (args.pipeline, None))
         
-        pipeline.do_pipeline(SessionFactory, start_date, end_date)
+        if args.stream:
+            pipeline.do_streaming_pipeline(get_configured_engine(), start_date,
+                                           end_date or add_days_to_date(start_date),
+                                           resume=args.resume)
+        elif args.resume or (end_date and len(split_date_range(start_date, end_date)) > 1):
+            pipeline.do_range_pipeline(get_configured_engine(), start_date,
+                                       end_date or add_days_to_date(start_date),
+                                       resume=args.resume)
+        else:
+            pipeline.do_pipeline(get_configured_engine(), start_date, end_date)
         logger.info('Pipeline execution completed successfully.')
+    except ValueError as e:
+        logger.error(f'Invalid pipeline options: {e}')
     except Exception as e:
         logger.error(f'Pipeline execution failed: {e}')
         
+def do_backfill():
+    """
+    Function to run pipeline only over days between --from and --to missing from run ledger.
+    """
+    if not (args.date_from and args.date_to):
+        logger.error('Backfill needs both --from and --to dates.')
+        return
+    
+    try:
+        pipeline = get_configured_pipeline()
+        if args.stream:
+            pipeline.do_streaming_pipeline(get_configured_engine(), args.date_from,
+                                           args.date_to, resume=True)
+        else:
+            pipeline.do_range_pipeline(get_configured_engine(), args.date_from,
+                                       args.date_to, resume=True)
+        logger.info('Backfill completed successfully.')
+    except ValueError as e:
+        logger.error(f'Invalid pipeline options: {e}')
+    except Exception as e:
+        logger.error(f'Backfill failed: {e}')
+        
+def reload_range():
+    """
+    Function to delete and load again the given range, cheaply when it covers whole months.
+    """
+    try:
+        start_date, end_date = args.reload.split(' ')
+    except ValueError:
+        logger.error('Reload needs start and end date splitted with blank space.')
+        return
+    
+    try:
+        pipeline = get_configured_pipeline()
+        pipeline.reload(get_configured_engine(), start_date, end_date)
+        logger.info(f'Reload of {start_date} - {end_date} completed successfully.')
+    except ValueError as e:
+        logger.error(f'Invalid pipeline options: {e}')
+    except Exception as e:
+        logger.error(f'Reload failed: {e}')
+
+def run_sync():
+    """
+    Function to keep recent and upcoming days in sync with NeoWs until interrupted.
+    """
+    sync_settings = dict(settings.get('sync', {}))
+    store = FingerprintStore(sync_settings.pop('path', SYNC_STATE_PATH))
+    
+    try:
+        pipeline = get_configured_pipeline()
+        pipeline.sync(get_configured_engine(), polls=args.sync_polls, store=store,
+                      **sync_settings)
+    except KeyboardInterrupt:
+        logger.info('Sync stopped.')
+    except ValueError as e:
+        logger.error(f'Invalid sync options: {e}')
+    except Exception as e:
+        logger.error(f'Sync failed: {e}')
+    finally:
+        store.close()
+
+def purge_before():
+    """
+    Function to remove approaches older than given date.
+    """
+    try:
+        dropped = drop_partitions_before(get_configured_engine(), args.purge_before)
+        print(f'Purged approaches before {args.purge_before}, dropped partitions: {dropped or "none"}')
+        get_configured_ledger().forget('0001-01-01', args.purge_before)
+        if ROLLUP_ENABLED:
+            rebuild_daily_rollup(get_configured_engine(), '0001-01-01', args.purge_before)
+    except sqlalchemy.exc.SQLAlchemyError as e:
+        logger.error(f'Purge failed: {e}')
+        
+def rebuild_rollup():
+    """
+    Function to recompute daily rollup of the given range from `asteroids_details`.
+    """
+    try:
+        start_date, end_date = args.rollup.split(' ')
+    except ValueError:
+        logger.error('Rollup needs start and end date splitted with blank space.')
+        return
+    
+    try:
+        rebuild_daily_rollup(get_configured_engine(), start_date, end_date)
+        print(f'Daily rollup of {start_date} - {end_date} rebuilt.')
+    except sqlalchemy.exc.SQLAlchemyError as e:
+        logger.error(f'Rollup rebuild failed: {e}')
+        
+def reprocess_files():
+    """
+    Function to parse saved feed files on all cores and load them into the database.
+    """
+    paths = find_feed_files(args.reprocess, args.date_from, args.date_to)
+    if not paths:
+        logger.warning(f'No files matching `{args.reprocess}` found.')
+        return
+    
+    try:
+        pipeline = Pipeline(API_KEY, loader=get_configured_loader(), staged=LOAD_STAGED,
+                            rollup=ROLLUP_ENABLED, exporter=get_configured_exporter(),
+                            load_database=not args.export_only, fanout=args.fanout,
+                            enricher=get_configured_enricher())
+        pipeline.reprocess(get_configured_engine(), paths, args.processes)
+        logger.info(f'Reprocessing of {len(paths)} files completed successfully.')
+    except ValueError as e:
+        logger.error(f'Invalid pipeline options: {e}')
+    except Exception as e:
+        logger.error(f'Reprocessing failed: {e}')
+        
 def main(args) -> None:
+    if args.metrics or args.metrics_port:
+        metrics.enabled = True
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    quarantine.path = settings.get('quarantine', {}).get('path', QUARANTINE_PATH)
+    
     if args.extract:
         simple_extract()
 
     if args.read_file:
         simple_read_file()
 
+    if args.query:
+        query_index()
+
     if args.create:
         create_asteroids_table()
                 
     if args.pipeline:
         do_pipeline()
+    
+    if args.reload:
+        reload_range()
+    
+    if args.purge_before:
+        purge_before()
+    
+    if args.rollup:
+        rebuild_rollup()
+    
+    if args.sync:
+        run_sync()
+    
+    if args.reprocess:
+        reprocess_files()
+    elif (args.date_from or args.date_to) and not args.pipeline:
+        do_backfill()
+    
+    dispose_engines()
+    quarantine.close()
+    if quarantine.count:
+        logger.warning(f'{quarantine.count} records rejected, see {quarantine.path}')
+    
+    if args.metrics:
+        metrics.write(args.metrics)
+        logger.info(f'Metrics written to {args.metrics}')
                 
 if __name__ == '__main__':
     args = parse_arguments()
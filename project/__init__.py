@@ -1,2 +1,3 @@
 from project.pipeline.pipeline import *
-from project.exctract.extractors import *
\ No newline at end of file
+from project.exctract.extractors import *
+from project.exctract.enrichment import *
\ No newline at end of file
@@ -17,6 +17,25 @@ def parse_arguments(*args):
         help="Specify the file path to read asteroid data from."
     )
     
+    parser.add_argument(
+        '-q', '--query',
+        type=str,
+        help='Query close approach index of saved feed files: \'within <km> [from to]\', '
+             '\'closest <k> [from to]\', \'between <from> <to>\' or \'hazardous [from to]\'.'
+    )
+    
+    parser.add_argument(
+        '--hazardous',
+        action='store_true',
+        help='Restrict --query to potentially hazardous asteroids.'
+    )
+    
+    parser.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help='Build close approach index again before --query, even if no feed file changed.'
+    )
+    
     parser.add_argument(
         '-e', '--extract',
         type=str,
@@ -29,4 +48,128 @@ def parse_arguments(*args):
         help='Specify the start and end extraction dates (\'Splitted with blank space\')'
     )
     
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=4,
+        help='Number of concurrent requests when extracting ranges longer than 7 days.'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Keep raw responses in compressed feed cache and skip downloading cached windows.'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Run pipeline stages concurrently, streaming windows from extraction to loading.'
+    )
+    
+    parser.add_argument(
+        '--reprocess',
+        type=str,
+        nargs='?',
+        const='NeoWs_json_*.json',
+        help='Parse and load saved feed files matching glob pattern in data folder.'
+    )
+    
+    parser.add_argument(
+        '--from',
+        dest='date_from',
+        type=str,
+        help='Only windows ending on or after this date (yyyy-mm-dd), '
+             'without --reprocess backfills days missing from run ledger.'
+    )
+    
+    parser.add_argument(
+        '--to',
+        dest='date_to',
+        type=str,
+        help='Only windows starting on or before this date (yyyy-mm-dd), '
+             'without --reprocess backfills days missing from run ledger.'
+    )
+    
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=None,
+        help='Number of worker processes for --reprocess, defaults to number of cores.'
+    )
+    
+    parser.add_argument(
+        '--fanout',
+        action='store_true',
+        help='Load every close approach into `asteroid_approaches` and asteroids into `asteroids`.'
+    )
+    
+    parser.add_argument(
+        '--export',
+        action='store_true',
+        help='Also write every loaded window to date partitioned Parquet files (requires pyarrow).'
+    )
+    
+    parser.add_argument(
+        '--export-only',
+        action='store_true',
+        help='Write windows to Parquet files instead of loading them into the database.'
+    )
+    
+    parser.add_argument(
+        '--enrich',
+        action='store_true',
+        help='Look up orbital data of every loaded asteroid into `asteroid_orbits`, through lookup cache.'
+    )
+    
+    parser.add_argument(
+        '--sync',
+        action='store_true',
+        help='Keep re-polling recent and upcoming days configured in `[sync]` settings, '
+             'pushing only inserted, changed and removed approaches.'
+    )
+    
+    parser.add_argument(
+        '--sync-polls',
+        type=int,
+        help='Stop syncing after this many polls, runs until interrupted otherwise.'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip pipeline windows which run ledger records as loaded.'
+    )
+    
+    parser.add_argument(
+        '--reload',
+        type=str,
+        help='Delete and load again the start and end dates (\'Splitted with blank space\'), '
+             'truncating partitions of whole months.'
+    )
+    
+    parser.add_argument(
+        '--purge-before',
+        type=str,
+        help='Remove approaches before this date (yyyy-mm-dd), dropping partitions of whole months.'
+    )
+    
+    parser.add_argument(
+        '--rollup',
+        type=str,
+        help='Rebuild daily rollup of the start and end dates (\'Splitted with blank space\').'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        help='Write run metrics to file, Prometheus text when it ends with .prom, JSON otherwise.'
+    )
+    
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help='Serve Prometheus metrics on /metrics at this port while running.'
+    )
+    
     return parser.parse_args()
\ No newline at end of file
@@ -1 +1,5 @@
-from project.database.db_utils import *
\ No newline at end of file
+from project.database.db_utils import *
+from project.database.engine import *
+from project.database.loader import *
+from project.database.partitions import *
+from project.database.rollups import *
\ No newline at end of file
@@ -1,33 +1,31 @@
-import pymysql as db
 import sqlalchemy
 import constants.queries as const
 
 from project.utils import logger
 
-def create_database(conn_config: dict):
+def create_database(engine: sqlalchemy.Engine):
+    """Function creates database, engine has to be server level one."""
+    
     try:
-        connection = db.connect(**conn_config)
-        with connection.cursor() as cursor:
-            cursor.execute(const.CREATE_NEOWS_DATABASE)
+        with engine.connect() as connection:
+            connection.execute(sqlalchemy.text(const.CREATE_NEOWS_DATABASE))
             connection.commit()
         logger.info('Database created succesfully.')
-    except db.Error as e:
+    except sqlalchemy.exc.SQLAlchemyError as e:
         logger.error(f'Failed to create database: {e}')
-    finally:
-        connection.close()
 
-def database_exists(connection, db_name):
+def database_exists(engine: sqlalchemy.Engine, db_name: str):
     """Function check if database exists."""
     
     query = (
         """\
         SELECT SCHEMA_NAME FROM INFORMATION_SCHEMA.SCHEMATA\
-        WHERE SCHEMA_NAME = %s
+        WHERE SCHEMA_NAME = :db_name
         """
     )
-    with connection.cursor() as cursor:
-        cursor.execute(query, db_name)
-        return cursor.fetchone() is not None
+    with engine.connect() as connection:
+        result = connection.execute(sqlalchemy.text(query), {'db_name': db_name})
+        return result.fetchone() is not None
 
 def table_exists(engine: sqlalchemy.Engine, table_name:str ):
     """Function check if table exists."""
@@ -43,4 +41,24 @@ def table_exists(engine: sqlalchemy.Engine, table_name:str ):
         result = connection.execute(
             sqlalchemy.text(query), {'db_name': db_name, 'table_name': table_name}
         )
-        return result.fetchone() is not None
\ No newline at end of file
+        return result.fetchone() is not None
+
+def create_fanout_tables(engine: sqlalchemy.Engine):
+    """
+        Function creates `asteroids` and `asteroid_approaches` tables
+        of close approach fan-out when they are missing.
+    """
+    with engine.connect() as connection:
+        connection.execute(sqlalchemy.text(const.CREATE_ASTEROIDS_TABLE))
+        connection.execute(sqlalchemy.text(const.CREATE_ASTEROID_APPROACHES_TABLE))
+        connection.commit()
+    logger.info('Tables `asteroids` and `asteroid_approaches` are ready.')
+
+def create_orbits_table(engine: sqlalchemy.Engine):
+    """
+        Function creates `asteroid_orbits` table of lookup enrichment when it is missing.
+    """
+    with engine.connect() as connection:
+        connection.execute(sqlalchemy.text(const.CREATE_ASTEROID_ORBITS_TABLE))
+        connection.commit()
+    logger.info('Table `asteroid_orbits` is ready.')
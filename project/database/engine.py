@@ -0,0 +1,35 @@
+from threading import Lock
+
+import sqlalchemy
+
+from project.utils import get_mysql_engine
+
+_engines: dict[str, sqlalchemy.Engine] = {}
+_lock = Lock()
+
+def get_engine(host: str, user: str, password: str, port: int,
+               database: str | None = None, **engine_options) -> sqlalchemy.Engine:
+    """
+        Function returns engine shared by whole process for given connection
+        parameters, created with its pool on first call.
+        
+        :param database: database name, None for server level engine.
+        :param engine_options: `create_engine` options as `pool_size`,
+                               `max_overflow`, `pool_pre_ping`, `pool_recycle`.
+    """
+    key = repr((host, user, port, database, sorted(engine_options.items())))
+    
+    with _lock:
+        if key not in _engines:
+            _engines[key] = get_mysql_engine(host, user, password, port, database,
+                                             **engine_options)
+        return _engines[key]
+
+def dispose_engines() -> None:
+    """
+        Function closes pooled connections of all registered engines.
+    """
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
@@ -0,0 +1,306 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Sequence
+
+import sqlalchemy
+import tempfile
+import time
+import csv
+import os
+
+import constants.queries as const
+from project.metrics import metrics
+from project.parser.parser import ASTEROID_COLUMNS
+from project.utils import LOAD_BATCH_SIZE, batched, logger
+
+class LoadReport:
+    """
+        Summary of a single load, rows and batches committed and time spent.
+    """
+    def __init__(self, strategy: str, table: str):
+        self.strategy = strategy
+        self.table = table
+        self.rows = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.merged = None
+    
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+    
+    def __repr__(self):
+        return (f"<LoadReport(strategy={self.strategy}, "
+                f"table={self.table}, "
+                f"rows={self.rows}, "
+                f"batches={self.batches}, "
+                f"seconds={self.seconds:.3f}, "
+                f"rows_per_second={self.rows_per_second:.0f}"
+                + (f", merged={self.merged}" if self.merged is not None else "")
+                + ")>")
+
+class BulkLoader(ABC):
+    """
+        Loads stream of row tuples into table in batches, committing each batch.
+    """
+    strategy = None
+    
+    def __init__(self, table: str = 'asteroids_details',
+                 columns: Sequence[str] = ASTEROID_COLUMNS,
+                 batch_size: int = LOAD_BATCH_SIZE):
+        self.table = table
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+    
+    def load(self, connection: sqlalchemy.Connection, rows: Iterable[tuple],
+             commit: bool = True, table: str | None = None) -> LoadReport:
+        """
+            Load rows through given connection.
+            
+            :param commit: commit after every batch, otherwise caller owns transaction.
+            :param table: load into other table than configured one.
+        """
+        table = table or self.table
+        report = LoadReport(self.strategy, table)
+        started = time.perf_counter()
+        
+        for batch in batched(rows, self.batch_size):
+            with metrics.stage('load'):
+                self.load_batch(connection, table, batch)
+                if commit:
+                    connection.commit()
+            metrics.inc('rows_loaded_total', len(batch), table=table)
+            report.rows += len(batch)
+            report.batches += 1
+        
+        report.seconds = time.perf_counter() - started
+        logger.info(f'Loaded {report.rows} rows into `{table}` '
+                    f'with {self.strategy}: {report.rows_per_second:.0f} rows/s')
+        return report
+    
+    @abstractmethod
+    def load_batch(self, connection: sqlalchemy.Connection, table: str, batch: list[tuple]):
+        pass
+
+class ExecutemanyLoader(BulkLoader):
+    """
+        Multi-row INSERT through DBAPI cursor `executemany`,
+        which pymysql rewrites into `INSERT ... VALUES (...), (...)` statements.
+    """
+    strategy = 'executemany'
+    
+    def load_batch(self, connection, table, batch):
+        placeholder = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+        statement = (f'INSERT INTO {table} ({", ".join(self.columns)}) '
+                     f'VALUES ({", ".join([placeholder] * len(self.columns))})')
+        connection.exec_driver_sql(statement, batch)
+
+class MappingsLoader(BulkLoader):
+    """
+        SQLAlchemy executemany of dict mappings, as `bulk_insert_mappings` does.
+    """
+    strategy = 'mappings'
+    
+    def load_batch(self, connection, table, batch):
+        statement = sqlalchemy.text(
+            f'INSERT INTO {table} ({", ".join(self.columns)}) '
+            f'VALUES ({", ".join(":" + column for column in self.columns)})'
+        )
+        connection.execute(statement, [dict(zip(self.columns, row)) for row in batch])
+
+class LoadDataLoader(BulkLoader):
+    """
+        MySQL `LOAD DATA LOCAL INFILE` from CSV built in memory.
+        
+        pymysql reads local infile by name only, so the buffer is spooled
+        to a temporary file. Engine needs `connect_args={'local_infile': True}`.
+    """
+    strategy = 'infile'
+    
+    @staticmethod
+    def to_csv_value(value):
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return int(value)
+        return value
+    
+    def load_batch(self, connection, table, batch):
+        if connection.dialect.name != 'mysql':
+            raise NotImplementedError(f'{self.strategy} strategy is supported only by MySQL.')
+        
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as csv_file:
+            writer = csv.writer(csv_file, lineterminator='\n')
+            to_csv_value = self.to_csv_value
+            writer.writerows([to_csv_value(value) for value in row] for row in batch)
+        
+        try:
+            connection.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                "LINES TERMINATED BY '\\n' "
+                f"({', '.join(self.columns)})",
+                (csv_file.name,)
+            )
+        finally:
+            os.remove(csv_file.name)
+
+LOADERS = {
+    loader.strategy: loader
+    for loader in (ExecutemanyLoader, MappingsLoader, LoadDataLoader)
+}
+
+def get_loader(strategy: str = 'executemany', **kwargs) -> BulkLoader:
+    """
+        Function returns loader for a given strategy name.
+    """
+    if strategy not in LOADERS:
+        raise ValueError(f'Unknown load strategy `{strategy}`. Choose one of {list(LOADERS)}.')
+    
+    return LOADERS[strategy](**kwargs)
+
+def load_staged(connection: sqlalchemy.Connection, loader: BulkLoader,
+                rows: Iterable[tuple], commit: bool = True) -> LoadReport:
+    """
+        Function loads rows into temporary staging table and upserts them
+        into `asteroids_details` by (asteroid_id, close_approach_date),
+        so reloading the same window never duplicates rows.
+        
+        The whole window is merged in single transaction.
+        
+        :param commit: commit the merge, otherwise caller owns transaction.
+    """
+    if connection.dialect.name not in const.MERGE_STAGED_ASTEROIDS:
+        raise NotImplementedError(f'Staged load is not supported by {connection.dialect.name}.')
+    
+    dialect = connection.dialect.name
+    started = time.perf_counter()
+    connection.exec_driver_sql(const.DROP_ASTEROIDS_STAGING_TABLE[dialect])
+    connection.exec_driver_sql(const.CREATE_ASTEROIDS_STAGING_TABLE)
+    try:
+        report = loader.load(connection, rows, commit=False, table='asteroids_details_temp')
+        with metrics.stage('merge'):
+            result = connection.exec_driver_sql(const.MERGE_STAGED_ASTEROIDS[dialect])
+            report.merged = result.rowcount
+            connection.exec_driver_sql(const.DROP_ASTEROIDS_STAGING_TABLE[dialect])
+            if commit:
+                connection.commit()
+        metrics.inc('rows_merged_total', report.merged)
+    except Exception:
+        connection.rollback()
+        connection.exec_driver_sql(const.DROP_ASTEROIDS_STAGING_TABLE[dialect])
+        raise
+    
+    report.seconds = time.perf_counter() - started
+    logger.info(f'Merged {report.rows} staged rows into `asteroids_details` '
+                f'({report.merged} affected) in {report.seconds:.3f}s')
+    return report
+
+class FanoutReport(LoadReport):
+    """
+        Summary of fan-out load, `rows` are approach rows and `asteroids`
+        rows newly added to asteroid dimension.
+    """
+    def __init__(self, strategy: str, table: str):
+        super().__init__(strategy, table)
+        self.asteroids = 0
+    
+    def __repr__(self):
+        return (f"<FanoutReport(strategy={self.strategy}, "
+                f"table={self.table}, "
+                f"rows={self.rows}, "
+                f"asteroids={self.asteroids}, "
+                f"batches={self.batches}, "
+                f"seconds={self.seconds:.3f}, "
+                f"rows_per_second={self.rows_per_second:.0f})>")
+
+class FanoutLoader:
+    """
+        Loads (asteroid, approaches) pairs parsed by `AsteroidFanoutParser`
+        into `asteroids` and `asteroid_approaches`, both in the same batches.
+        
+        Asteroid rows are sent only for ids missing from id cache, which is
+        read from database on first load and kept across windows after.
+    """
+    strategy = 'fanout'
+    table = 'asteroid_approaches'
+    
+    def __init__(self, batch_size: int = LOAD_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.known_ids: set[int] | None = None
+    
+    def warm(self, connection: sqlalchemy.Connection):
+        self.known_ids = {asteroid_id for asteroid_id, in
+                          connection.exec_driver_sql(const.SELECT_ASTEROID_IDS)}
+    
+    def load(self, connection: sqlalchemy.Connection,
+             records: Iterable[tuple[tuple, list[tuple]]],
+             commit: bool = True) -> FanoutReport:
+        """
+            Load parsed records in batches of `batch_size` asteroids.
+            
+            :param commit: commit after every batch, otherwise caller owns transaction.
+        """
+        dialect = connection.dialect.name
+        if dialect not in const.UPSERT_ASTEROID_APPROACHES:
+            raise NotImplementedError(f'Fan-out load is not supported by {dialect}.')
+        
+        if self.known_ids is None:
+            self.warm(connection)
+        known_ids = self.known_ids
+        
+        report = FanoutReport(self.strategy, self.table)
+        started = time.perf_counter()
+        
+        for batch in batched(records, self.batch_size):
+            asteroids, approaches, new_ids = [], [], set()
+            for asteroid, asteroid_approaches in batch:
+                asteroid_id = int(asteroid[0])
+                if asteroid_id not in known_ids and asteroid_id not in new_ids:
+                    new_ids.add(asteroid_id)
+                    asteroids.append(asteroid)
+                approaches.extend(asteroid_approaches)
+            
+            with metrics.stage('load'):
+                if asteroids:
+                    connection.exec_driver_sql(const.INSERT_ASTEROIDS[dialect], asteroids)
+                if approaches:
+                    connection.exec_driver_sql(const.UPSERT_ASTEROID_APPROACHES[dialect], approaches)
+                if commit:
+                    connection.commit()
+            
+            # Ids are cached only once their rows are sent
+            known_ids |= new_ids
+            metrics.inc('rows_loaded_total', len(asteroids), table='asteroids')
+            metrics.inc('rows_loaded_total', len(approaches), table=self.table)
+            report.asteroids += len(asteroids)
+            report.rows += len(approaches)
+            report.batches += 1
+        
+        report.seconds = time.perf_counter() - started
+        logger.info(f'Loaded {report.rows} approaches and {report.asteroids} new asteroids '
+                    f'in {report.seconds:.3f}s')
+        return report
+
+def load_orbits(connection: sqlalchemy.Connection, rows: Iterable[tuple],
+                batch_size: int = LOAD_BATCH_SIZE) -> LoadReport:
+    """
+        Function upserts rows parsed by `AsteroidOrbitParser` into `asteroid_orbits`,
+        committing every batch.
+    """
+    dialect = connection.dialect.name
+    if dialect not in const.UPSERT_ASTEROID_ORBITS:
+        raise NotImplementedError(f'Orbit load is not supported by {dialect}.')
+    
+    report = LoadReport('upsert', 'asteroid_orbits')
+    started = time.perf_counter()
+    
+    for batch in batched(rows, batch_size):
+        with metrics.stage('load'):
+            connection.exec_driver_sql(const.UPSERT_ASTEROID_ORBITS[dialect], batch)
+            connection.commit()
+        metrics.inc('rows_loaded_total', len(batch), table=report.table)
+        report.rows += len(batch)
+        report.batches += 1
+    
+    report.seconds = time.perf_counter() - started
+    return report
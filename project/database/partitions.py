@@ -0,0 +1,208 @@
+from datetime import datetime, timedelta
+
+import sqlalchemy
+
+import constants.queries as const
+from project.utils import logger
+
+PARTITION_FIRST_MONTH = '2015-01'
+PARTITION_MONTHS_AHEAD = 24
+
+ASTEROIDS_TABLE = 'asteroids_details'
+# Left behind by rebuild interrupted after swapping tables
+ASTEROIDS_OLD_TABLE = 'asteroids_details_old'
+
+def month_start(date: datetime | str) -> datetime:
+    if isinstance(date, str):
+        date = datetime.strptime(date[:7], '%Y-%m')
+    return date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def next_month(date: datetime) -> datetime:
+    return (month_start(date) + timedelta(days=32)).replace(day=1)
+
+def partition_name(month: datetime) -> str:
+    return month.strftime('p%Y%m')
+
+def month_partitions(first_month: datetime, last_month: datetime) -> list[str]:
+    """
+        Function returns partition definitions of every month between given ones.
+    """
+    partitions = []
+    month = month_start(first_month)
+    while month <= last_month:
+        partitions.append(const.ASTEROIDS_MONTH_PARTITION.format(
+            name=partition_name(month), bound=next_month(month).strftime('%Y-%m-%d')))
+        month = next_month(month)
+    return partitions
+
+def asteroids_table_ddl(dialect: str, first_month: str = PARTITION_FIRST_MONTH,
+                        months_ahead: int = PARTITION_MONTHS_AHEAD,
+                        table: str = ASTEROIDS_TABLE) -> str:
+    """
+        Function returns `asteroids_details` definition for a given dialect,
+        on MySQL range partitioned by approach month from `first_month`
+        until `months_ahead` months from now, created as `table`.
+    """
+    ddl = const.CREATE_ASTEROIDS_OBSERVATIONS_TABLE[dialect].replace(ASTEROIDS_TABLE, table, 1)
+    if dialect != 'mysql':
+        return ddl
+    
+    first = month_start(first_month)
+    last = month_start(datetime.now())
+    for _ in range(months_ahead):
+        last = next_month(last)
+    
+    partitions = ([const.ASTEROIDS_MONTH_PARTITION.format(name='p_before',
+                                                          bound=first.strftime('%Y-%m-%d'))]
+                  + month_partitions(first, last)
+                  + [const.ASTEROIDS_FUTURE_PARTITION])
+    return (ddl.rstrip() + ' '
+            + const.PARTITION_ASTEROIDS_BY_MONTH.format(partitions=', '.join(partitions)))
+
+def create_asteroids_details(connection: sqlalchemy.Connection,
+                             first_month: str = PARTITION_FIRST_MONTH,
+                             months_ahead: int = PARTITION_MONTHS_AHEAD):
+    """
+        Function creates partitioned and indexed `asteroids_details`, caller commits.
+    """
+    dialect = connection.dialect.name
+    connection.exec_driver_sql(asteroids_table_ddl(dialect, first_month, months_ahead))
+    if dialect != 'mysql':
+        for query in const.CREATE_ASTEROIDS_DETAILS_INDEXES:
+            connection.exec_driver_sql(query)
+
+def get_partitions(engine: sqlalchemy.Engine) -> list[str]:
+    """
+        Function returns partition names of `asteroids_details` in order,
+        empty list when table is not partitioned.
+    """
+    if engine.dialect.name != 'mysql':
+        return []
+    
+    with engine.connect() as connection:
+        return [name for name, _ in
+                connection.execute(sqlalchemy.text(const.SELECT_ASTEROIDS_PARTITIONS))]
+
+def ensure_partitions(engine: sqlalchemy.Engine, until: datetime | str) -> list[str]:
+    """
+        Function splits monthly partitions off `p_future` up to month of `until`.
+        
+        :return: names of added partitions.
+    """
+    partitions = get_partitions(engine)
+    months = [name for name in partitions if name[1:].isdigit()]
+    if not months or 'p_future' not in partitions:
+        return []
+    
+    first = next_month(datetime.strptime(months[-1], 'p%Y%m'))
+    added = month_partitions(first, month_start(until))
+    if not added:
+        return []
+    
+    with engine.connect() as connection:
+        connection.exec_driver_sql(const.SPLIT_ASTEROIDS_FUTURE_PARTITION.format(
+            partitions=', '.join(added + [const.ASTEROIDS_FUTURE_PARTITION])))
+    
+    names = [definition.split()[1] for definition in added]
+    logger.info(f'Added partitions {names} to `asteroids_details`.')
+    return names
+
+def partition_asteroids_table(engine: sqlalchemy.Engine,
+                              first_month: str = PARTITION_FIRST_MONTH,
+                              months_ahead: int = PARTITION_MONTHS_AHEAD):
+    """
+        Function rebuilds `asteroids_details` created before partitioning
+        into partitioned and indexed table, deduplicating its rows.
+        
+        Rows are copied into `asteroids_details_new` first and tables are
+        swapped by single atomic rename, so `asteroids_details` keeps its
+        rows whenever rebuild fails. Table of failed earlier attempt is dropped.
+    """
+    with engine.connect() as connection:
+        connection.exec_driver_sql(const.DROP_ASTEROIDS_NEW)
+        connection.exec_driver_sql(asteroids_table_ddl(connection.dialect.name, first_month,
+                                                       months_ahead, 'asteroids_details_new'))
+        connection.exec_driver_sql(const.COPY_ASTEROIDS_TO_NEW)
+        connection.commit()
+        connection.exec_driver_sql(const.SWAP_ASTEROIDS_NEW)
+        connection.exec_driver_sql(const.DROP_ASTEROIDS_OLD)
+        connection.commit()
+    logger.info('Table `asteroids_details` rebuilt as partitioned table.')
+
+def restore_asteroids_old(engine: sqlalchemy.Engine) -> int:
+    """
+        Function moves rows of `asteroids_details_old`, left by rebuild
+        interrupted before dropping it, back into `asteroids_details`
+        and drops it. Rows already in `asteroids_details` are kept.
+        
+        :return: number of restored rows.
+    """
+    with engine.connect() as connection:
+        restored = connection.exec_driver_sql(const.RESTORE_ASTEROIDS_FROM_OLD).rowcount
+        connection.exec_driver_sql(const.DROP_ASTEROIDS_OLD)
+        connection.commit()
+    logger.warning(f'Restored {restored} rows of leftover `{ASTEROIDS_OLD_TABLE}` '
+                   f'into `asteroids_details` and dropped it.')
+    return restored
+
+def clear_date_range(engine: sqlalchemy.Engine, date_from: str, date_to: str) -> list[str]:
+    """
+        Function removes rows approaching between given dates (inclusive).
+        
+        Months covered whole are emptied by truncating their partitions,
+        the rest is deleted from partitions pruned by date.
+        
+        :return: names of truncated partitions.
+    """
+    start = datetime.strptime(date_from, '%Y-%m-%d')
+    end = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+    partitions = set(get_partitions(engine))
+    
+    truncated, deleted = [], []
+    month = month_start(start)
+    while month < end:
+        if month >= start and next_month(month) <= end and partition_name(month) in partitions:
+            truncated.append(partition_name(month))
+        else:
+            deleted.append((max(month, start), min(next_month(month), end)))
+        month = next_month(month)
+    
+    with engine.connect() as connection:
+        if truncated:
+            connection.exec_driver_sql(const.TRUNCATE_ASTEROIDS_PARTITIONS.format(
+                partitions=', '.join(truncated)))
+        for range_start, range_end in deleted:
+            connection.execute(sqlalchemy.text(const.DELETE_ASTEROIDS_DATE_RANGE),
+                               {'date_from': range_start.strftime('%Y-%m-%d'),
+                                'date_to': range_end.strftime('%Y-%m-%d')})
+        connection.commit()
+    
+    logger.info(f'Cleared `asteroids_details` from {date_from} to {date_to}, '
+                f'truncated partitions: {truncated}')
+    return truncated
+
+def drop_partitions_before(engine: sqlalchemy.Engine, date: str) -> list[str]:
+    """
+        Function purges rows approaching before given date, dropping
+        partitions of whole months and deleting the rest.
+        
+        :return: names of dropped partitions.
+    """
+    before = datetime.strptime(date, '%Y-%m-%d')
+    partitions = get_partitions(engine)
+    months = [datetime.strptime(name, 'p%Y%m') for name in partitions if name[1:].isdigit()]
+    dropped = [partition_name(month) for month in months if next_month(month) <= before]
+    # `p_before` holds everything older than the first month, until first purge drops it
+    if 'p_before' in partitions and months and months[0] <= before:
+        dropped.insert(0, 'p_before')
+    
+    with engine.connect() as connection:
+        if dropped:
+            connection.exec_driver_sql(const.DROP_ASTEROIDS_PARTITIONS.format(
+                partitions=', '.join(dropped)))
+        connection.execute(sqlalchemy.text(const.DELETE_ASTEROIDS_DATE_RANGE),
+                           {'date_from': '0001-01-01', 'date_to': date})
+        connection.commit()
+    
+    logger.info(f'Purged `asteroids_details` before {date}, dropped partitions: {dropped}')
+    return dropped
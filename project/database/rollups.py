@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+import sqlalchemy
+
+import constants.queries as const
+from project.database.loader import BulkLoader, LoadReport, load_staged
+from project.metrics import metrics
+from project.parser.parser import ASTEROID_COLUMNS
+from project.utils import logger
+
+CLOSE_APPROACH_INDEX = ASTEROID_COLUMNS.index('close_approach_date')
+
+def create_rollup_table(engine: sqlalchemy.Engine):
+    """
+        Function creates `asteroids_daily` table when it is missing.
+    """
+    with engine.connect() as connection:
+        connection.execute(sqlalchemy.text(const.CREATE_ASTEROIDS_DAILY_TABLE))
+        connection.commit()
+    logger.info('Table `asteroids_daily` is ready.')
+
+def ensure_rollup_table(connection: sqlalchemy.Connection):
+    """
+        Function creates `asteroids_daily` through given connection when it is
+        missing, so databases created before rollup can load with it enabled.
+        Commits, call it before anything else of transaction.
+    """
+    connection.execute(sqlalchemy.text(const.CREATE_ASTEROIDS_DAILY_TABLE))
+    connection.commit()
+
+def _bounds(date_from: str, date_to: str) -> dict:
+    end = datetime.strptime(date_to[:10], '%Y-%m-%d') + timedelta(days=1)
+    return {'date_from': date_from[:10], 'date_to': end.strftime('%Y-%m-%d')}
+
+def refresh_daily_rollup(connection: sqlalchemy.Connection, date_from: str, date_to: str):
+    """
+        Function recomputes daily aggregates of days between given dates (inclusive)
+        from their rows only, caller commits.
+        
+        Days are recomputed rather than incremented, as staged loads upsert
+        and reloading a window would otherwise count its rows twice.
+    """
+    bounds = _bounds(date_from, date_to)
+    with metrics.stage('rollup'):
+        connection.execute(sqlalchemy.text(const.DELETE_ASTEROIDS_DAILY_RANGE), bounds)
+        connection.execute(sqlalchemy.text(const.INSERT_ASTEROIDS_DAILY_RANGE), bounds)
+
+def rebuild_daily_rollup(engine: sqlalchemy.Engine, date_from: str, date_to: str):
+    """
+        Function rebuilds daily aggregates of given range in single transaction.
+    """
+    with engine.connect() as connection:
+        refresh_daily_rollup(connection, date_from, date_to)
+        connection.commit()
+    logger.info(f'Rebuilt `asteroids_daily` from {date_from} to {date_to}.')
+
+def read_rollup(engine: sqlalchemy.Engine, date_from: str, date_to: str,
+                period: str = 'day') -> list[tuple]:
+    """
+        Function returns (day, approaches, hazardous, min_miss_distance_km,
+        max_diameter_km) of every day or week between given dates.
+    """
+    if period == 'day':
+        query = const.SELECT_ASTEROIDS_DAILY
+    else:
+        query = const.SELECT_ASTEROIDS_WEEKLY[engine.dialect.name]
+    
+    with engine.connect() as connection:
+        return connection.execute(sqlalchemy.text(query), _bounds(date_from, date_to)).fetchall()
+
+class TouchedDays:
+    """
+        Passes rows through and remembers first and last approach date seen,
+        so only those days of rollup are recomputed after load.
+    """
+    def __init__(self):
+        self.first = None
+        self.last = None
+    
+    def track(self, rows: Iterable[tuple]) -> Iterator[tuple]:
+        for row in rows:
+            day = str(row[CLOSE_APPROACH_INDEX])[:10]
+            if self.first is None or day < self.first:
+                self.first = day
+            if self.last is None or day > self.last:
+                self.last = day
+            yield row
+    
+    def __bool__(self):
+        return self.first is not None
+    
+    def __repr__(self):
+        return f"<TouchedDays(first={self.first}, last={self.last})>"
+
+def load_with_rollup(connection: sqlalchemy.Connection, loader: BulkLoader,
+                     rows: Iterable[tuple], staged: bool = True,
+                     rollup: bool = True) -> LoadReport:
+    """
+        Function loads rows, by staged upsert or directly, and recomputes daily
+        rollup of days they approach in the same transaction, so rows are never
+        committed without their rollup.
+    """
+    touched = TouchedDays()
+    if rollup:
+        rows = touched.track(rows)
+    
+    if staged:
+        report = load_staged(connection, loader, rows, commit=not rollup)
+    else:
+        report = loader.load(connection, rows, commit=not rollup)
+    
+    if rollup:
+        if touched:
+            refresh_daily_rollup(connection, touched.first, touched.last)
+        connection.commit()
+    return report
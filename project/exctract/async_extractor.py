@@ -0,0 +1,259 @@
+from datetime import datetime
+from typing import Union
+
+import asyncio
+import json
+import time
+
+from project.utils import (
+    add_days_to_date,
+    create_filename,
+    save_to_json,
+    check_and_set_date_format,
+    split_date_range
+)
+from project.exctract.extractors import Extractor, NeoWsExtractor, WindowResult
+from project.exctract.scheduler import RETRY_STATUSES, RequestScheduler
+from project.exctract.cache import FeedCache
+from project.metrics import metrics
+
+try:
+    import aiohttp
+    # Failures of single window, reported instead of raised
+    WINDOW_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ValueError)
+except ImportError:
+    aiohttp = None
+    WINDOW_ERRORS = (asyncio.TimeoutError, ValueError)
+
+class AsyncRequestScheduler(RequestScheduler):
+    """
+        `RequestScheduler` awaiting its pace and backoff instead of sleeping,
+        so throttled requests never block event loop.
+    """
+    async def get(self, url: str, **kwargs) -> tuple['aiohttp.ClientResponse', bytes]:
+        """
+            Send GET request, retrying 429/5xx responses and connection errors.
+            
+            :return: last received response, released already, with its body,
+                     caller decides about its status.
+        """
+        for attempt in range(self.max_retries + 1):
+            with metrics.timer('throttle_seconds'):
+                while wait := self.bucket.take():
+                    await asyncio.sleep(wait)
+            with self._lock:
+                self.requests += 1
+            
+            started = time.perf_counter()
+            try:
+                async with self.session.get(url, **kwargs) as response:
+                    body = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                metrics.inc('requests_total', status=type(e).__name__)
+                if attempt == self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                metrics.inc('requests_total', status=response.status)
+                metrics.observe('request_seconds', time.perf_counter() - started)
+                self.update_quota(response.headers)
+                if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response, body
+                retry_after = response.headers.get('Retry-After')
+            
+            with self._lock:
+                self.retries += 1
+            metrics.inc('retries_total')
+            await asyncio.sleep(self.backoff(attempt, retry_after))
+
+class AsyncNeoWsExtractor(Extractor):
+    """
+        Feed extractor for asyncio applications, every window is a coroutine
+        sharing single pooled `aiohttp` session, so many windows run
+        concurrently on one loop without thread per request.
+        
+        Session is opened by `async with` or `open()`. Cache and json files
+        are read and written from default executor, as they touch disk.
+    """
+    url = NeoWsExtractor.url
+    window_days = NeoWsExtractor.window_days
+    
+    def __init__(self, apikey: str,
+                 proxy: str | None = None,
+                 headers: dict | None = None,
+                 url: str | None = None,
+                 max_connections: int = 10,
+                 requests_per_second: float = 10,
+                 max_retries: int = 5,
+                 cache: FeedCache | None = None,
+                 timeout: float = 30):
+        if aiohttp is None:
+            raise ImportError('Async extraction requires `aiohttp` package.')
+        
+        self._api_key = apikey
+        if url is not None:
+            self.url = url
+        self.proxy = proxy
+        self.headers = headers
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.scheduler = AsyncRequestScheduler(None,
+                                               requests_per_second=requests_per_second,
+                                               burst=max_connections,
+                                               max_retries=max_retries,
+                                               timeout=timeout)
+        self.cache = cache
+    
+    @property
+    def quota_remaining(self) -> int | None:
+        """
+            Requests left for api_key as last reported by API, None if unknown.
+        """
+        return self.scheduler.quota_remaining
+    
+    async def open(self):
+        if self.scheduler.session is None:
+            self.scheduler.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+    
+    async def close(self):
+        if self.scheduler.session is not None:
+            await self.scheduler.session.close()
+            self.scheduler.session = None
+    
+    async def __aenter__(self):
+        return await self.open()
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def request(self, start_date: str, end_date: str | None = None,
+                      headers: dict | None = None) -> tuple['aiohttp.ClientResponse', bytes]:
+        if self._api_key is None:
+            raise ValueError('Set API_KEY to have access to NASA datasets.')
+        if self.scheduler.session is None:
+            raise RuntimeError('Open extractor session with `async with` or `open()` first.')
+        
+        params = dict(api_key=self._api_key, start_date=start_date)
+        # aiohttp refuses None query values
+        if end_date is not None:
+            params['end_date'] = end_date
+        
+        return await self.scheduler.get(self.url, params=params, headers=headers,
+                                        proxy=self.proxy)
+    
+    async def fetch(self, start_date: str, end_date: str | None = None) -> bytes:
+        """
+            Download single feed window and return raw json body.
+            Raises ClientResponseError when request still fails after retries.
+        """
+        response, body = await self.request(start_date, end_date)
+        response.raise_for_status()
+        
+        return body
+    
+    async def cache_window(self, start_date: str, end_date: str) -> str:
+        """
+            Make sure window is in cache, see `NeoWsExtractor.cache_window`.
+            
+            :return: path of compressed blob.
+        """
+        entry = await asyncio.to_thread(self.cache.lookup, self.url, start_date, end_date)
+        if entry is not None:
+            return entry.path
+        
+        entry = await asyncio.to_thread(self.cache.get, self.url, start_date, end_date)
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else None
+        response, body = await self.request(start_date, end_date, headers)
+        
+        if response.status == 304 and entry is not None:
+            return (await asyncio.to_thread(self.cache.touch, entry)).path
+        
+        response.raise_for_status()
+        entry = await asyncio.to_thread(self.cache.put, self.url, start_date, end_date,
+                                        body, response.headers.get('ETag'))
+        return entry.path
+    
+    async def download(self, start_date: str, end_date: str) -> bytes:
+        """
+            Return raw json body of window, through cache when it is enabled.
+        """
+        if self.cache is None:
+            return await self.fetch(start_date, end_date)
+        
+        await self.cache_window(start_date, end_date)
+        
+        def read() -> bytes:
+            entry = self.cache.get(self.url, start_date, end_date)
+            with self.cache.open(entry) as blob:
+                return blob.read().encode()
+        
+        return await asyncio.to_thread(read)
+    
+    async def save_window(self, start_date: str, end_date: str | None = None) -> tuple[bool, str]:
+        """
+            Fetch window into cache when enabled, otherwise into json file.
+        """
+        if self.cache is not None:
+            return True, await self.cache_window(start_date,
+                                                 end_date or add_days_to_date(start_date))
+        
+        body = await self.fetch(start_date, end_date)
+        return await asyncio.to_thread(save_to_json, create_filename(start_date, end_date),
+                                       json.loads(body))
+    
+    async def extract(self,
+                      start_date: Union[datetime, str],
+                      end_date: Union[datetime, str] | None = None):
+        start_date = check_and_set_date_format(start_date)
+        end_date = check_and_set_date_format(end_date) if end_date else None
+        
+        with metrics.stage('fetch'):
+            isSaved, info = await self.save_window(start_date, end_date)
+        
+        if isSaved:
+            return f'Extracted. You will find data in {info}'
+        
+        return f'Not able to save data to json. Error: {info}'
+    
+    async def extract_window(self, start_date: str, end_date: str) -> WindowResult:
+        """
+            Extract single window and save it, never raises.
+        """
+        started = time.perf_counter()
+        try:
+            isSaved, info = await self.save_window(start_date, end_date)
+        except WINDOW_ERRORS as e:
+            isSaved, info = False, str(e)
+        
+        elapsed = time.perf_counter() - started
+        metrics.observe('stage_seconds', elapsed, stage='fetch')
+        metrics.inc('windows_total', state='fetched' if isSaved else 'failed')
+        return WindowResult(start_date, end_date, isSaved, info, elapsed)
+    
+    async def extract_range(self,
+                            start_date: Union[datetime, str],
+                            end_date: Union[datetime, str]) -> list[WindowResult]:
+        """
+            Split date range into feed windows and extract them concurrently.
+            
+            :return: list of window results in chronological order.
+        """
+        windows = split_date_range(check_and_set_date_format(start_date),
+                                   check_and_set_date_format(end_date),
+                                   self.window_days)
+        
+        return await self.extract_windows(windows)
+    
+    async def extract_windows(self, windows: list[tuple[str, str]]) -> list[WindowResult]:
+        """
+            Extract given (start_date, end_date) windows concurrently,
+            connections are bounded by `max_connections`.
+            
+            :return: list of window results in order of given windows.
+        """
+        return list(await asyncio.gather(*(self.extract_window(*window)
+                                           for window in windows)))
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import IO
+
+import hashlib
+import json
+import gzip
+import time
+import io
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from project.metrics import metrics
+
+CACHE_PATH = os.path.abspath('./data/feed_cache')
+
+class CacheEntry:
+    def __init__(self, key: str, endpoint: str, start_date: str, end_date: str,
+                 path: str, fetched_at: float, etag: str | None, size: int):
+        self.key = key
+        self.endpoint = endpoint
+        self.start_date = start_date
+        self.end_date = end_date
+        self.path = path
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.size = size
+    
+    def as_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return (f"<CacheEntry(start_date={self.start_date}, "
+                f"end_date={self.end_date}, "
+                f"path={self.path}, "
+                f"etag={self.etag}, "
+                f"size={self.size})>")
+
+class FeedCache:
+    """
+        Compressed cache of raw API responses keyed by (endpoint, start_date, end_date).
+        
+        Blobs are named by hash of their key, small json index keeps fetch time
+        and ETag of every blob. Windows ending within `settle_days` from today
+        are still updated by NASA and expire after `ttl` seconds, older windows
+        never expire.
+    """
+    index_name = 'index.json'
+    
+    def __init__(self, directory: str = CACHE_PATH,
+                 ttl: float = 6 * 3600,
+                 settle_days: int = 7,
+                 compression: str | None = None):
+        self.directory = os.path.abspath(directory)
+        self.ttl = ttl
+        self.settle_days = settle_days
+        self.compression = compression or ('zstd' if zstandard is not None else 'gzip')
+        
+        if self.compression == 'zstd' and zstandard is None:
+            raise ImportError('zstd compression requires `zstandard` package.')
+        if self.compression not in ('zstd', 'gzip'):
+            raise ValueError(f'Unknown compression `{self.compression}`. Choose zstd or gzip.')
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._index = self._read_index()
+    
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, self.index_name)
+    
+    def _read_index(self) -> dict[str, dict]:
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, mode='r') as index_file:
+            return json.load(index_file)
+    
+    def _write_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = f'{self.index_path}.tmp'
+        with open(temporary_path, mode='w') as index_file:
+            json.dump(self._index, index_file)
+        os.replace(temporary_path, self.index_path)
+    
+    @staticmethod
+    def key(endpoint: str, start_date: str, end_date: str) -> str:
+        return hashlib.sha256(f'{endpoint}|{start_date}|{end_date}'.encode()).hexdigest()
+    
+    def get(self, endpoint: str, start_date: str, end_date: str) -> CacheEntry | None:
+        """
+            Return entry of cached window, None when window was never cached.
+        """
+        with self._lock:
+            entry = self._index.get(self.key(endpoint, start_date, end_date))
+        
+        if entry is None or not os.path.exists(entry['path']):
+            return None
+        return CacheEntry(**entry)
+    
+    def entries(self) -> list[CacheEntry]:
+        """
+            Return entries of every cached window whose blob exists, in window order.
+        """
+        with self._lock:
+            entries = list(self._index.values())
+        
+        return sorted((CacheEntry(**entry) for entry in entries if os.path.exists(entry['path'])),
+                      key=lambda entry: (entry.start_date, entry.end_date))
+    
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        settled = (datetime.strptime(entry.end_date, '%Y-%m-%d')
+                   < datetime.now() - timedelta(days=self.settle_days))
+        return settled or time.time() - entry.fetched_at < self.ttl
+    
+    def lookup(self, endpoint: str, start_date: str, end_date: str) -> CacheEntry | None:
+        """
+            Return fresh entry of window and count hit or miss.
+        """
+        entry = self.get(endpoint, start_date, end_date)
+        fresh = entry is not None and self.is_fresh(entry)
+        
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.inc('cache_lookups_total', result='hit' if fresh else 'miss')
+        return entry if fresh else None
+    
+    def compress(self, content: bytes) -> bytes:
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=10).compress(content)
+        return gzip.compress(content, compresslevel=6)
+    
+    def put(self, endpoint: str, start_date: str, end_date: str,
+            content: bytes, etag: str | None = None) -> CacheEntry:
+        """
+            Store raw json response body compressed and register it in index.
+        """
+        key = self.key(endpoint, start_date, end_date)
+        path = os.path.join(self.directory, f'{key}.json.{"zst" if self.compression == "zstd" else "gz"}')
+        blob = self.compress(content)
+        
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f'{path}.tmp', mode='wb') as blob_file:
+            blob_file.write(blob)
+        os.replace(f'{path}.tmp', path)
+        
+        entry = CacheEntry(key, endpoint, start_date, end_date, path,
+                           time.time(), etag, len(blob))
+        with self._lock:
+            self._index[key] = entry.as_dict()
+            self._write_index()
+        return entry
+    
+    def touch(self, entry: CacheEntry) -> CacheEntry:
+        """
+            Mark entry as fetched now, when server confirmed it is not modified.
+        """
+        entry.fetched_at = time.time()
+        with self._lock:
+            self._index[entry.key] = entry.as_dict()
+            self._write_index()
+        return entry
+    
+    def open(self, entry: CacheEntry) -> IO[str]:
+        """
+            Open cached blob as decompressed text stream.
+        """
+        if entry.path.endswith('.zst'):
+            if zstandard is None:
+                raise ImportError('Reading zstd cache requires `zstandard` package.')
+            reader = zstandard.ZstdDecompressor().stream_reader(open(entry.path, mode='rb'),
+                                                                closefd=True)
+            return io.TextIOWrapper(reader, encoding='utf-8')
+        return gzip.open(entry.path, mode='rt', encoding='utf-8')
@@ -0,0 +1,279 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Iterable, Iterator
+
+import requests
+import sqlite3
+import json
+import time
+import zlib
+import os
+
+from project.exctract.extractors import Extractor, SessionFactory
+from project.exctract.scheduler import RequestScheduler
+from project.metrics import metrics
+from project.utils import logger
+
+LOOKUP_CACHE_PATH = os.path.abspath('./data/lookup_cache.sqlite3')
+
+class LookupCache:
+    """
+        Two tier cache of asteroid lookups, bounded in-memory LRU in front of
+        local SQLite file with compressed json of every looked up asteroid.
+        
+        Entries older than `ttl` seconds are misses and are evicted from both
+        tiers by `evict_expired`, which pipeline calls after every enrichment,
+        as orbit determinations of young asteroids keep improving.
+        Disk tier is disabled when `path` is None.
+    """
+    def __init__(self, path: str | None = LOOKUP_CACHE_PATH,
+                 max_entries: int = 10000, ttl: float = 30 * 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = Lock()
+        self._connection = None
+        
+        if path is not None:
+            if path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            with self._connection:
+                self._connection.execute(
+                    """\
+                    CREATE TABLE IF NOT EXISTS lookups (\
+                    asteroid_id TEXT NOT NULL PRIMARY KEY,\
+                    fetched_at REAL NOT NULL,\
+                    body BLOB NOT NULL\
+                    )
+                    """
+                )
+                # Keeps eviction of expired entries a range delete
+                self._connection.execute(
+                    'CREATE INDEX IF NOT EXISTS ix_lookups_fetched_at ON lookups (fetched_at)')
+    
+    def is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+    
+    def _remember(self, asteroid_id: str, fetched_at: float, record: dict):
+        self._memory[asteroid_id] = (fetched_at, record)
+        self._memory.move_to_end(asteroid_id)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def get(self, asteroid_id: str) -> dict | None:
+        """
+            Return fresh record of asteroid from memory, then from disk, and count
+            hit or miss. Disk hits are promoted to memory.
+        """
+        asteroid_id = str(asteroid_id)
+        with self._lock:
+            cached = self._memory.get(asteroid_id)
+            if cached is not None and self.is_fresh(cached[0]):
+                self._memory.move_to_end(asteroid_id)
+                self.memory_hits += 1
+                metrics.inc('lookup_cache_total', result='memory')
+                return cached[1]
+            if cached is not None:
+                del self._memory[asteroid_id]
+            
+            stored = None
+            if self._connection is not None:
+                stored = self._connection.execute(
+                    'SELECT fetched_at, body FROM lookups WHERE asteroid_id = ?',
+                    (asteroid_id,)).fetchone()
+            if stored is not None and self.is_fresh(stored[0]):
+                record = json.loads(zlib.decompress(stored[1]))
+                self._remember(asteroid_id, stored[0], record)
+                self.disk_hits += 1
+                metrics.inc('lookup_cache_total', result='disk')
+                return record
+            
+            self.misses += 1
+        metrics.inc('lookup_cache_total', result='miss')
+        return None
+    
+    def put(self, asteroid_id: str, record: dict, fetched_at: float | None = None):
+        asteroid_id = str(asteroid_id)
+        fetched_at = fetched_at or time.time()
+        with self._lock:
+            self._remember(asteroid_id, fetched_at, record)
+            if self._connection is not None:
+                with self._connection:
+                    self._connection.execute(
+                        'INSERT OR REPLACE INTO lookups VALUES (?, ?, ?)',
+                        (asteroid_id, fetched_at, zlib.compress(json.dumps(record).encode())))
+    
+    def evict_expired(self) -> int:
+        """
+            Remove expired entries from both tiers.
+            
+            :return: number of entries removed from disk tier.
+        """
+        deadline = time.time() - self.ttl
+        with self._lock:
+            for asteroid_id in [key for key, (fetched_at, _) in self._memory.items()
+                                if fetched_at < deadline]:
+                del self._memory[asteroid_id]
+            
+            removed = 0
+            if self._connection is not None:
+                with self._connection:
+                    removed = self._connection.execute(
+                        'DELETE FROM lookups WHERE fetched_at < ?', (deadline,)).rowcount
+            self.evicted += removed
+        
+        if removed:
+            logger.info(f'Evicted {removed} expired asteroid lookups.')
+        return removed
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+    
+    def stats(self) -> dict:
+        return {'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'in_memory': len(self._memory),
+                'evicted': self.evicted}
+    
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+    
+    def __repr__(self):
+        return (f"<LookupCache(memory_hits={self.memory_hits}, "
+                f"disk_hits={self.disk_hits}, "
+                f"misses={self.misses}, "
+                f"hit_rate={self.hit_rate:.1%})>")
+
+class AsteroidIds:
+    """
+        Passes rows through and collects asteroid ids they reference,
+        in order of first appearance.
+    """
+    def __init__(self, key: Callable[[tuple], object] = lambda row: row[0]):
+        self.key = key
+        self.ids: dict[str, None] = {}
+    
+    def track(self, rows: Iterable[tuple]) -> Iterator[tuple]:
+        key, ids = self.key, self.ids
+        for row in rows:
+            ids[str(key(row))] = None
+            yield row
+    
+    def __len__(self):
+        return len(self.ids)
+
+class NeoWsLookupExtractor(Extractor):
+    """
+        Looks up full asteroid records, with orbital data missing from feed,
+        through `/neo/rest/v1/neo/{id}`.
+        
+        Ids are deduplicated, repeats are served from `LookupCache` and only
+        misses go to API, concurrently through pooled session paced by its
+        own `RequestScheduler`, just like feed extraction.
+    """
+    url = 'https://api.nasa.gov/neo/rest/v1/neo/'
+    
+    def __init__(self, apikey: str,
+                 proxy: dict = None,
+                 headers: dict = None,
+                 url: str | None = None,
+                 max_workers: int = 4,
+                 requests_per_second: float = 10,
+                 max_retries: int = 5,
+                 cache: LookupCache | None = None):
+        self._api_key = apikey
+        if url is not None:
+            self.url = url
+        self.max_workers = max_workers
+        self.session = SessionFactory(proxy, headers, pool_maxsize=max_workers).get_session()
+        self.scheduler = RequestScheduler(self.session,
+                                          requests_per_second=requests_per_second,
+                                          burst=max_workers,
+                                          max_retries=max_retries)
+        self.cache = cache if cache is not None else LookupCache(path=None)
+        self.fetched = 0
+        self.failed = 0
+    
+    def request(self, asteroid_id: str) -> requests.Response:
+        if self._api_key is None:
+            raise ValueError('Set API_KEY to have access to NASA datasets.')
+        
+        return self.scheduler.get(f'{self.url}{asteroid_id}', params={'api_key': self._api_key})
+    
+    def fetch(self, asteroid_id: str) -> dict:
+        """
+            Download record of single asteroid, bypassing cache.
+            Raises HTTPError when request still fails after retries.
+        """
+        result = self.request(asteroid_id)
+        result.raise_for_status()
+        
+        return result.json()
+    
+    def lookup(self, asteroid_id: str) -> dict:
+        """
+            Return record of single asteroid, from cache when it is there.
+        """
+        record = self.cache.get(asteroid_id)
+        if record is None:
+            record = self.fetch(asteroid_id)
+            self.cache.put(asteroid_id, record)
+            self.fetched += 1
+        return record
+    
+    def enrich(self, asteroid_ids: Iterable, max_workers: int | None = None) -> dict[str, dict]:
+        """
+            Look up every distinct asteroid of given ids, fetching cache
+            misses concurrently. Failed lookups are logged and left out.
+            
+            :return: records keyed by asteroid id, in order of given ids.
+        """
+        records, missing = {}, []
+        for asteroid_id in dict.fromkeys(str(asteroid_id) for asteroid_id in asteroid_ids):
+            record = self.cache.get(asteroid_id)
+            if record is None:
+                missing.append(asteroid_id)
+            records[asteroid_id] = record
+        
+        if missing:
+            with metrics.stage('lookup'), \
+                    ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+                futures = [(asteroid_id, executor.submit(self.fetch, asteroid_id))
+                           for asteroid_id in missing]
+                for asteroid_id, future in futures:
+                    try:
+                        record = future.result()
+                    except (requests.exceptions.RequestException, ValueError) as e:
+                        logger.error(f'Failed to look up asteroid {asteroid_id}: {e}')
+                        metrics.inc('lookups_total', result='failed')
+                        self.failed += 1
+                        continue
+                    self.cache.put(asteroid_id, record)
+                    records[asteroid_id] = record
+                    self.fetched += 1
+                    metrics.inc('lookups_total', result='fetched')
+        
+        return {asteroid_id: record for asteroid_id, record in records.items()
+                if record is not None}
+    
+    def extract(self, asteroid_ids: Iterable) -> dict[str, dict]:
+        return self.enrich(asteroid_ids)
+    
+    def __repr__(self):
+        return (f"<NeoWsLookupExtractor(fetched={self.fetched}, "
+                f"failed={self.failed}, "
+                f"cache={self.cache})>")
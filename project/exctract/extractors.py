@@ -1,14 +1,21 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union
 from datetime import datetime
 
 from project.utils import (
+    add_days_to_date,
     create_filename,
     save_to_json,
-    check_and_set_date_format
+    check_and_set_date_format,
+    split_date_range
 )
+from project.exctract.scheduler import RequestScheduler
+from project.exctract.cache import FeedCache
+from project.metrics import metrics
 
 import requests
+import time
 import re
 
 class Extractor(ABC):
@@ -17,13 +24,20 @@ class Extractor(ABC):
         pass
 
 class SessionFactory:
-    def __init__(self, proxy: dict = None, headers: dict = None):
+    def __init__(self, proxy: dict = None, headers: dict = None,
+                 pool_maxsize: int = requests.adapters.DEFAULT_POOLSIZE):
         self._proxy = proxy
         self._headers = headers
+        self._pool_maxsize = pool_maxsize
         
     def get_session(self):
         new_session = requests.Session()
         
+        # Every worker of range extraction keeps its own connection alive
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self._pool_maxsize)
+        new_session.mount('https://', adapter)
+        new_session.mount('http://', adapter)
+        
         if self._proxy:
             new_session.proxies.update(self._proxy)
         
@@ -32,53 +46,196 @@ class SessionFactory:
         
         return new_session
 
+class WindowResult:
+    """
+        Result of extraction of a single feed window.
+    """
+    def __init__(self, start_date: str, end_date: str, ok: bool,
+                 info: str, elapsed: float):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.ok = ok
+        self.info = info
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (f"<WindowResult(start_date={self.start_date}, "
+                f"end_date={self.end_date}, "
+                f"ok={self.ok}, "
+                f"elapsed={self.elapsed:.3f}s, "
+                f"info={self.info})>")
+
 class NeoWsExtractor(Extractor):
     url = 'https://api.nasa.gov/neo/rest/v1/feed?'
+    window_days = 7
     
     def __init__(self, apikey:str,
                  proxy: dict = None,
-                 headers: dict = None):
+                 headers: dict = None,
+                 url: str | None = None,
+                 max_workers: int = 4,
+                 requests_per_second: float = 10,
+                 max_retries: int = 5,
+                 cache: FeedCache | None = None):
         
         self.initialize_apikey(apikey)
-        session_configs = SessionFactory(proxy, headers)
+        if url is not None:
+            self.url = url
+        self.max_workers = max_workers
+        session_configs = SessionFactory(proxy, headers, pool_maxsize=max_workers)
         self.session = session_configs.get_session()
+        self.scheduler = RequestScheduler(self.session,
+                                          requests_per_second=requests_per_second,
+                                          burst=max_workers,
+                                          max_retries=max_retries)
+        self.cache = cache
     
     def initialize_apikey(self, apikey: str) -> None:
         self._api_key = apikey
     
-    def extract(self,
-                start_date: Union[datetime, str],
-                end_date: Union[datetime, str] | None = None):
-        
+    @property
+    def quota_remaining(self) -> int | None:
+        """
+            Requests left for api_key as last reported by API, None if unknown.
+        """
+        return self.scheduler.quota_remaining
+    
+    def request(self, start_date: str, end_date: str | None = None,
+                headers: dict | None = None) -> requests.Response:
         if self._api_key is None:
             raise ValueError('Set API_KEY to have access to NASA datasets.')
         
-        start_date = check_and_set_date_format(start_date)
-        end_date = check_and_set_date_format(end_date) if end_date else None
-        
         params = dict(
             api_key=self._api_key,
             start_date=start_date,
             end_date=end_date
         )
         
-        result = self.session.get(self.url, params=params)
+        return self.scheduler.get(self.url, params=params, headers=headers)
+    
+    def fetch(self, start_date: str, end_date: str | None = None) -> dict:
+        """
+            Download single feed window and return decoded json.
+            Raises HTTPError when request still fails after retries.
+        """
+        result = self.request(start_date, end_date)
+        result.raise_for_status()
         
-        try:
-            result.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            return str(e)
+        return result.json()
+    
+    def cache_window(self, start_date: str, end_date: str) -> str:
+        """
+            Make sure window is in cache, network is skipped on fresh hit and
+            stale entries are revalidated by their ETag.
+            
+            :return: path of compressed blob.
+        """
+        entry = self.cache.lookup(self.url, start_date, end_date)
+        if entry is not None:
+            return entry.path
+        
+        entry = self.cache.get(self.url, start_date, end_date)
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else None
+        result = self.request(start_date, end_date, headers)
+        
+        if result.status_code == 304 and entry is not None:
+            return self.cache.touch(entry).path
+        
+        result.raise_for_status()
+        return self.cache.put(self.url, start_date, end_date,
+                              result.content, result.headers.get('ETag')).path
+    
+    def save_window(self, start_date: str, end_date: str | None = None) -> tuple[bool, str]:
+        """
+            Fetch window into cache when enabled, otherwise into json file.
+        """
+        if self.cache is not None:
+            return True, self.cache_window(start_date, end_date or add_days_to_date(start_date))
+        
+        data = self.fetch(start_date, end_date)
+        return save_to_json(create_filename(start_date, end_date), data)
+    
+    def open_window(self, start_date: str, end_date: str | None = None):
+        """
+            Return source of saved window for parser, opened cached blob
+            or name of json file in data folder.
+        """
+        if self.cache is None:
+            return create_filename(start_date, end_date)
         
-        data = result.json()
+        entry = self.cache.get(self.url, start_date, end_date or add_days_to_date(start_date))
+        if entry is None:
+            raise IOError(f'Window {start_date} - {end_date} is not cached.')
+        return self.cache.open(entry)
+    
+    def extract(self,
+                start_date: Union[datetime, str],
+                end_date: Union[datetime, str] | None = None):
+        
+        if self._api_key is None:
+            raise ValueError('Set API_KEY to have access to NASA datasets.')
+        
+        start_date = check_and_set_date_format(start_date)
+        end_date = check_and_set_date_format(end_date) if end_date else None
         
-        filename = create_filename(start_date, end_date)
-        isSaved, info = save_to_json(filename, data)
+        with metrics.stage('fetch'):
+            isSaved, info = self.save_window(start_date, end_date)
         
         if isSaved:
             return f'Extracted. You will find data in {info}'
         
         return f'Not able to save data to json. Error: {info}'
+    
+    def extract_window(self, start_date: str, end_date: str) -> WindowResult:
+        """
+            Extract single window and save it, never raises.
+        """
+        started = time.perf_counter()
+        try:
+            isSaved, info = self.save_window(start_date, end_date)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            isSaved, info = False, str(e)
+        
+        elapsed = time.perf_counter() - started
+        metrics.observe('stage_seconds', elapsed, stage='fetch')
+        metrics.inc('windows_total', state='fetched' if isSaved else 'failed')
+        return WindowResult(start_date, end_date, isSaved, info, elapsed)
+    
+    def extract_range(self,
+                      start_date: Union[datetime, str],
+                      end_date: Union[datetime, str],
+                      max_workers: int | None = None) -> list[WindowResult]:
+        """
+            Split date range into feed windows and extract them concurrently.
+            
+            :param max_workers: number of concurrent requests,
+                                defaults to value given in constructor.
+            
+            :return: list of window results in chronological order.
+        """
+        windows = split_date_range(check_and_set_date_format(start_date),
+                                   check_and_set_date_format(end_date),
+                                   self.window_days)
+        
+        return self.extract_windows(windows, max_workers)
+    
+    def extract_windows(self,
+                        windows: list[tuple[str, str]],
+                        max_workers: int | None = None) -> list[WindowResult]:
+        """
+            Extract given (start_date, end_date) windows concurrently.
+            
+            :return: list of window results in order of given windows.
+        """
+        if self._api_key is None:
+            raise ValueError('Set API_KEY to have access to NASA datasets.')
+        
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            futures = [executor.submit(self.extract_window, *window)
+                       for window in windows]
+        
+        return [future.result() for future in futures]
         
 
 if __name__ == '__main__':
-    print(create_filename('2024-10-27'))
\ No newline at end of file
+    print(create_filename('2024-10-27'))
@@ -0,0 +1,152 @@
+from threading import Lock
+
+import requests
+import random
+import time
+
+from project.metrics import metrics
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class TokenBucket:
+    """
+        Thread-safe token bucket, `rate` tokens per second up to `capacity`.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+    
+    @property
+    def rate(self) -> float:
+        return self._rate
+    
+    @rate.setter
+    def rate(self, value: float):
+        with self._lock:
+            self._refill()
+            self._rate = value
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+    
+    def take(self) -> float:
+        """
+            Take single token when available.
+            
+            :return: 0 when token was taken, otherwise seconds until next one.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self._rate
+    
+    def acquire(self):
+        """
+            Block until single token is available and take it.
+        """
+        while wait := self.take():
+            time.sleep(wait)
+
+class RequestScheduler:
+    """
+        Paces requests of shared session and retries throttled or failed ones.
+        
+        Quota is taken from `X-RateLimit-Limit`/`X-RateLimit-Remaining` headers
+        returned by api.nasa.gov. Once remaining quota drops to `reserve`,
+        pace is reduced to rate sustainable over the rolling hour window.
+    """
+    limit_header = 'X-RateLimit-Limit'
+    remaining_header = 'X-RateLimit-Remaining'
+    quota_window = 3600
+    
+    def __init__(self, session: requests.Session,
+                 requests_per_second: float = 10,
+                 burst: int = 10,
+                 max_retries: int = 5,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 60,
+                 reserve: int = 50,
+                 timeout: float = 30):
+        self.session = session
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.reserve = reserve
+        self.timeout = timeout
+        
+        self._requests_per_second = requests_per_second
+        self._lock = Lock()
+        self.quota_limit = None
+        self.quota_remaining = None
+        self.requests = 0
+        self.retries = 0
+    
+    def backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+            Seconds to wait before next attempt, full jitter exponential backoff
+            unless server asked for specific delay.
+        """
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    
+    def update_quota(self, headers) -> None:
+        limit = headers.get(self.limit_header)
+        remaining = headers.get(self.remaining_header)
+        if remaining is None:
+            return
+        
+        metrics.set('quota_remaining', int(remaining))
+        with self._lock:
+            self.quota_remaining = int(remaining)
+            if limit is not None:
+                self.quota_limit = int(limit)
+            
+            if self.quota_limit and self.quota_remaining <= self.reserve:
+                self.bucket.rate = min(self._requests_per_second,
+                                       self.quota_limit / self.quota_window)
+            else:
+                self.bucket.rate = self._requests_per_second
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+            Send GET request, retrying 429/5xx responses and connection errors.
+            
+            :return: last received response, caller decides about its status.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        
+        for attempt in range(self.max_retries + 1):
+            with metrics.timer('throttle_seconds'):
+                self.bucket.acquire()
+            with self._lock:
+                self.requests += 1
+            
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.inc('requests_total', status=type(e).__name__)
+                if attempt == self.max_retries:
+                    raise
+                retry_after = None
+            else:
+                metrics.inc('requests_total', status=response.status_code)
+                metrics.observe('request_seconds', time.perf_counter() - started)
+                self.update_quota(response.headers)
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+            
+            with self._lock:
+                self.retries += 1
+            metrics.inc('retries_total')
+            time.sleep(self.backoff(attempt, retry_after))
@@ -0,0 +1,168 @@
+from typing import Sequence
+
+import glob
+import time
+import os
+
+from project.parser.parser import ASTEROID_COLUMNS
+from project.utils import logger
+
+# Imported by `import_pyarrow` on first exporter, most runs never export
+pa = ds = None
+PARQUET_AVAILABLE = False
+
+EXPORT_PATH = os.path.abspath('./data/export')
+
+PARTITION_COLUMN = 'close_approach_date'
+
+def import_pyarrow():
+    """
+        Function imports pyarrow once, it is slow to import, so
+        only runs which export pay for it.
+    """
+    global pa, ds, PARQUET_AVAILABLE
+    if pa is not None:
+        return
+    
+    try:
+        import pyarrow.dataset as ds
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError('Columnar export requires `pyarrow` package.')
+    
+    try:
+        import pyarrow.parquet
+        PARQUET_AVAILABLE = True
+    except ImportError:
+        PARQUET_AVAILABLE = False
+
+class ExportReport:
+    """
+        Summary of single window export.
+    """
+    def __init__(self, format: str, directory: str):
+        self.format = format
+        self.directory = directory
+        self.rows = 0
+        self.files = []
+        self.bytes = 0
+        self.seconds = 0.0
+    
+    def __repr__(self):
+        return (f"<ExportReport(format={self.format}, "
+                f"rows={self.rows}, "
+                f"files={len(self.files)}, "
+                f"bytes={self.bytes}, "
+                f"seconds={self.seconds:.3f})>")
+
+class ColumnarExporter:
+    """
+        Writes parsed windows to columnar files partitioned by approach date,
+        `close_approach_date=yyyy-mm-dd/<window>-<i>.parquet`.
+        
+        Every window writes its own files, so exports append window by window
+        and exporting the same window again removes its files and writes them
+        anew, other windows are untouched. Parquet keeps min/max statistics of
+        every row group, which `scan` uses together with partition directories
+        to skip data. Arrow IPC is used when pyarrow is built without Parquet.
+        
+        :param format: `parquet` or `ipc`, defaults to parquet when available.
+        :param compression: codec of both formats, e.g. `zstd`, `lz4`.
+    """
+    def __init__(self, directory: str = EXPORT_PATH, format: str | None = None,
+                 compression: str = 'zstd', row_group_size: int = 64 * 1024):
+        import_pyarrow()
+        
+        self.directory = directory
+        self.format = format or ('parquet' if PARQUET_AVAILABLE else 'ipc')
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._file_format = ds.ParquetFileFormat() if self.format == 'parquet' else ds.IpcFileFormat()
+        self._partitioning = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.date32())]),
+                                             flavor='hive')
+    
+    def write_options(self):
+        if self.format == 'parquet':
+            return self._file_format.make_write_options(compression=self.compression,
+                                                        write_statistics=True)
+        return self._file_format.make_write_options(
+            compression=pa.Codec(self.compression) if self.compression else None)
+    
+    def to_table(self, rows: Sequence[tuple]):
+        """
+            Convert parsed rows ordered as `ASTEROID_COLUMNS` into arrow table.
+        """
+        # numpy is needed only by exports, as pyarrow is
+        from project.parser.columnar import to_columns
+        
+        columns = to_columns(rows)
+        table = pa.table({name: columns[name] for name in ASTEROID_COLUMNS})
+        # Sorted rows give narrow, useful row group statistics
+        return table.sort_by([(PARTITION_COLUMN, 'ascending'), ('miss_distance_km', 'ascending')])
+    
+    def remove_window(self, start_date: str, end_date: str) -> int:
+        """
+            Remove files of window from every partition, along with partitions left empty.
+            
+            :return: number of removed files.
+        """
+        paths = glob.glob(os.path.join(glob.escape(self.directory), f'{PARTITION_COLUMN}=*',
+                                       f'{glob.escape(f"{start_date}_{end_date}")}-*'))
+        for path in paths:
+            os.remove(path)
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                # Partition still holds files of other windows
+                pass
+        return len(paths)
+    
+    def export(self, rows: Sequence[tuple], start_date: str, end_date: str) -> ExportReport:
+        """
+            Write rows of single window into date partitions, replacing
+            files previously exported for the same window.
+        """
+        report = ExportReport(self.format, self.directory)
+        started = time.perf_counter()
+        # Days of window may differ from its last export, so only removal
+        # of its old files keeps partitions of dropped days from lingering
+        self.remove_window(start_date, end_date)
+        if not rows:
+            return report
+        
+        def visit(written):
+            report.files.append(written.path)
+            report.bytes += written.size or 0
+        
+        ds.write_dataset(self.to_table(rows), self.directory,
+                         format=self._file_format,
+                         file_options=self.write_options(),
+                         partitioning=self._partitioning,
+                         basename_template=f'{start_date}_{end_date}-{{i}}.{self.format}',
+                         max_rows_per_group=self.row_group_size,
+                         existing_data_behavior='overwrite_or_ignore',
+                         file_visitor=visit)
+        
+        report.rows = len(rows)
+        report.seconds = time.perf_counter() - started
+        logger.info(f'Exported {start_date} - {end_date}: {report}')
+        return report
+    
+    def dataset(self):
+        return ds.dataset(self.directory, format=self._file_format, partitioning=self._partitioning)
+    
+    def scan(self, date_from: str | None = None, date_to: str | None = None,
+             columns: list[str] | None = None, filter=None):
+        """
+            Read exported rows between given dates (inclusive) as arrow table.
+            Partitions outside the range are never opened and row groups are
+            skipped by their statistics when `filter` is given.
+        """
+        expression = filter
+        field = ds.field(PARTITION_COLUMN)
+        for bound in ((field >= pa.scalar(date_from).cast(pa.date32())) if date_from else None,
+                      (field <= pa.scalar(date_to).cast(pa.date32())) if date_to else None):
+            if bound is not None:
+                expression = bound if expression is None else expression & bound
+        
+        return self.dataset().to_table(columns=columns, filter=expression)
@@ -0,0 +1,262 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextlib import contextmanager, nullcontext
+from threading import Lock, Thread
+from bisect import bisect_left
+from datetime import datetime
+
+import json
+import time
+import os
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_NULL_TIMER = nullcontext()
+
+class Histogram:
+    """
+        Per-bucket counts of observed values with their sum,
+        converted to Prometheus cumulative buckets on export.
+    """
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def cumulative(self) -> list[tuple[str, int]]:
+        total, result = 0, []
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            result.append((str(bound), total))
+        return result
+    
+    def __repr__(self):
+        return f"<Histogram(count={self.count}, sum={self.sum:.3f})>"
+
+class Metrics:
+    """
+        Thread-safe registry of counters, gauges and histograms keyed by name
+        and labels.
+        
+        Disabled registry returns before taking its lock, so instrumented code
+        pays single attribute check per call.
+    """
+    def __init__(self, enabled: bool = False, prefix: str = 'neows'):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.started = time.time()
+        
+        self._lock = Lock()
+        self._counters: dict[tuple, float] = {}
+        self._gauges: dict[tuple, float] = {}
+        self._histograms: dict[tuple, Histogram] = {}
+    
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+    
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def set(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+    
+    @contextmanager
+    def _timer(self, name: str, labels: dict):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    def timer(self, name: str, **labels):
+        """
+            Context manager observing seconds spent in its block.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name, labels)
+    
+    def stage(self, stage: str):
+        """
+            Time block as one of pipeline stages.
+        """
+        return self.timer('stage_seconds', stage=stage)
+    
+    def collect(self) -> dict:
+        """
+            Copy of recorded values, e.g. to send from worker process
+            and `merge` into registry of parent.
+        """
+        with self._lock:
+            return {'counters': dict(self._counters),
+                    'gauges': dict(self._gauges),
+                    'histograms': {key: (list(histogram.counts), histogram.count, histogram.sum)
+                                   for key, histogram in self._histograms.items()}}
+    
+    def merge(self, collected: dict):
+        """
+            Add values collected by `collect` of another registry, gauges are replaced.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for key, value in collected['counters'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            self._gauges.update(collected['gauges'])
+            for key, (counts, count, total) in collected['histograms'].items():
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram()
+                histogram = self._histograms[key]
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.count += count
+                histogram.sum += total
+    
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+        self.started = time.time()
+    
+    def rows_per_second(self) -> dict[str, float]:
+        """
+            Loaded rows per second of time spent in load stage, per table.
+        """
+        with self._lock:
+            seconds = sum(histogram.sum for (name, labels), histogram in self._histograms.items()
+                          if name == 'stage_seconds' and dict(labels).get('stage') == 'load')
+            rows = {dict(labels).get('table'): value
+                    for (name, labels), value in self._counters.items()
+                    if name == 'rows_loaded_total'}
+        return {table: count / seconds if seconds else 0.0 for table, count in rows.items()}
+    
+    def summary(self) -> dict:
+        """
+            JSON serializable summary of the run.
+        """
+        def label(name: str, labels: tuple) -> str:
+            if not labels:
+                return name
+            return name + '{' + ','.join(f'{k}={v}' for k, v in labels) + '}'
+        
+        with self._lock:
+            counters = {label(*key): value for key, value in sorted(self._counters.items())}
+            gauges = {label(*key): value for key, value in sorted(self._gauges.items())}
+            histograms = {label(*key): {'count': histogram.count,
+                                        'sum': histogram.sum,
+                                        'mean': histogram.sum / histogram.count,
+                                        'buckets': dict(histogram.cumulative())}
+                          for key, histogram in sorted(self._histograms.items())}
+        
+        return {'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'seconds': time.time() - self.started,
+                'counters': counters,
+                'gauges': gauges,
+                'histograms': histograms,
+                'rows_per_second': self.rows_per_second()}
+    
+    def to_prometheus(self) -> str:
+        """
+            Render all metrics in Prometheus text exposition format.
+        """
+        def label(labels: tuple, extra: tuple = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+        
+        lines, typed = [], set()
+        
+        def declare(name: str, kind: str):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f'# TYPE {name} {kind}')
+        
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = f'{self.prefix}_{name}'
+                declare(metric, 'counter')
+                lines.append(f'{metric}{label(labels)} {value}')
+            
+            for (name, labels), value in sorted(self._gauges.items()):
+                metric = f'{self.prefix}_{name}'
+                declare(metric, 'gauge')
+                lines.append(f'{metric}{label(labels)} {value}')
+            
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                metric = f'{self.prefix}_{name}'
+                declare(metric, 'histogram')
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{metric}_bucket{label(labels, (("le", bound),))} {count}')
+                lines.append(f'{metric}_sum{label(labels)} {histogram.sum}')
+                lines.append(f'{metric}_count{label(labels)} {histogram.count}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path: str):
+        """
+            Write Prometheus text file when path ends with `.prom`,
+            JSON run summary otherwise.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        with open(path, 'w') as file:
+            if path.endswith('.prom'):
+                file.write(self.to_prometheus())
+            else:
+                json.dump(self.summary(), file, indent=2)
+    
+    def serve(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+            Serve Prometheus text on `/metrics` from daemon thread.
+        """
+        registry = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    
+    def __repr__(self):
+        return (f"<Metrics(enabled={self.enabled}, "
+                f"counters={len(self._counters)}, "
+                f"histograms={len(self._histograms)})>")
+
+metrics = Metrics()
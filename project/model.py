@@ -1,31 +1,95 @@
-from sqlalchemy import Column, Integer
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Double,
+    Index,
+    BigInteger,
+    Integer,
+    String,
+    UniqueConstraint
+)
 from sqlalchemy.orm import DeclarativeBase
-from project.utils import get_mysql_engine
-
-from config import settings
-engine = get_mysql_engine(**settings.database)
 
 class BaseModel(DeclarativeBase):
     __abstract__ = True
-    __table_args__ = {'autoload_with' : engine}
     
 class TargetData(BaseModel):
+    """
+        Declared statically after `CREATE_ASTEROIDS_OBSERVATIONS_TABLE`,
+        so importing the model never connects to database.
+    """
     __tablename__ = 'asteroids_details'
+    __table_args__ = (
+        UniqueConstraint('asteroid_id', 'close_approach_date', name='uq_asteroid_approach'),
+        Index('ix_asteroids_details_date', 'close_approach_date'),
+        Index('ix_asteroids_details_asteroid', 'asteroid_id'),
+        Index('ix_asteroids_details_hazardous', 'isHazardous', 'close_approach_date'),
+    )
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    asteroid_id = Column(Integer, nullable=False)
+    neo_reference_id = Column(Integer, nullable=False)
+    absolute_magnitude = Column(Double, nullable=False)
+    estimated_diameter_km_max = Column(Double, nullable=False)
+    estimated_diameter_km_min = Column(Double, nullable=False)
+    isHazardous = Column(Boolean, nullable=False)
+    close_approach_date = Column(DateTime, nullable=False)
+    miss_distance_km = Column(Double, nullable=False)
+    uploaded_date = Column(DateTime, nullable=False)
+    
     
-    id = Column(Integer, primary_key=True, autoincrement=True)
+class AsteroidDimension(BaseModel):
+    """
+        Declared after `CREATE_ASTEROIDS_TABLE`, one row per asteroid.
+    """
+    __tablename__ = 'asteroids'
     
+    asteroid_id = Column(Integer, primary_key=True, autoincrement=False)
+    neo_reference_id = Column(Integer, nullable=False)
+    name = Column(String(64), nullable=False)
+    absolute_magnitude = Column(Double, nullable=False)
+    estimated_diameter_km_max = Column(Double, nullable=False)
+    estimated_diameter_km_min = Column(Double, nullable=False)
+    isHazardous = Column(Boolean, nullable=False)
+    is_sentry_object = Column(Boolean, nullable=False)
+    uploaded_date = Column(DateTime, nullable=False)
+
+class AsteroidApproach(BaseModel):
+    """
+        Declared after `CREATE_ASTEROID_APPROACHES_TABLE`, every close approach of asteroid.
+    """
+    __tablename__ = 'asteroid_approaches'
+    __table_args__ = (
+        UniqueConstraint('asteroid_id', 'close_approach_date', 'orbiting_body', name='uq_approach'),
+    )
+    
+    asteroid_id = Column(Integer, nullable=False)
+    close_approach_date = Column(DateTime, nullable=False)
+    close_approach_epoch = Column(BigInteger)
+    relative_velocity_kps = Column(Double, nullable=False)
+    miss_distance_km = Column(Double, nullable=False)
+    orbiting_body = Column(String(16), nullable=False)
+    uploaded_date = Column(DateTime, nullable=False)
     
+    __mapper_args__ = {'primary_key': [asteroid_id, close_approach_date, orbiting_body]}
+    
+
 TableStaging = TargetData.__table__.to_metadata(
     BaseModel.metadata, name=f'{TargetData.__tablename__}_temp'
 )
 
 TableStaging._prefixes = ['TEMPORARY']
+# Staging table is only bulk loaded and merged, it has no indexes
+TableStaging.indexes.clear()
 
 class StageData(BaseModel):
     __table__ = TableStaging
+    __mapper_args__ = {'primary_key': [TableStaging.c.asteroid_id,
+                                       TableStaging.c.close_approach_date]}
     
     def __repr__(self):
         return f"{StageData.__table__.columns}"
     
     def as_dict(self):
-        return self.__dict__
\ No newline at end of file
+        return self.__dict__
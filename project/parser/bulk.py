@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from array import array
+from typing import Iterator
+
+from project.metrics import metrics
+from project.parser.validation import quarantine
+from project.utils import iter_file_rows, logger
+
+class PackedRows:
+    """
+        Rows of single feed file packed into typed arrays.
+        
+        Pickles into a few contiguous buffers instead of one object per value,
+        which keeps transfer from worker processes cheap. Packed in worker
+        process, it also carries records quarantined and metrics recorded there.
+    """
+    def __init__(self, source: str):
+        self.source = source
+        self.asteroid_id = array('q')
+        self.neo_reference_id = array('q')
+        self.absolute_magnitude = array('d')
+        self.estimated_diameter_km_max = array('d')
+        self.estimated_diameter_km_min = array('d')
+        self.isHazardous = bytearray()
+        self.close_approach_date = array('i')
+        self.miss_distance_km = array('d')
+        self.uploaded_date = None
+        self.rejected = 0
+        self.quarantined = 0
+        self.metrics = None
+    
+    def __len__(self):
+        return len(self.asteroid_id)
+    
+    def append(self, row: tuple) -> None:
+        (asteroid_id, neo_reference_id, absolute_magnitude, diameter_max, diameter_min,
+         is_hazardous, close_approach_date, miss_distance_km, uploaded_date) = row
+        
+        # Convert everything before appending, so broken row leaves no partial values
+        values = (int(asteroid_id), int(neo_reference_id), float(absolute_magnitude),
+                  float(diameter_max), float(diameter_min), bool(is_hazardous),
+                  date.fromisoformat(close_approach_date).toordinal(), float(miss_distance_km))
+        
+        self.asteroid_id.append(values[0])
+        self.neo_reference_id.append(values[1])
+        self.absolute_magnitude.append(values[2])
+        self.estimated_diameter_km_max.append(values[3])
+        self.estimated_diameter_km_min.append(values[4])
+        self.isHazardous.append(values[5])
+        self.close_approach_date.append(values[6])
+        self.miss_distance_km.append(values[7])
+        self.uploaded_date = uploaded_date
+    
+    def rows(self) -> Iterator[tuple]:
+        """
+            Iterate over rows ordered as `ASTEROID_COLUMNS`.
+        """
+        uploaded_date = self.uploaded_date
+        for (asteroid_id, neo_reference_id, absolute_magnitude, diameter_max, diameter_min,
+             is_hazardous, close_approach_date, miss_distance_km) in zip(
+                self.asteroid_id, self.neo_reference_id, self.absolute_magnitude,
+                self.estimated_diameter_km_max, self.estimated_diameter_km_min,
+                self.isHazardous, self.close_approach_date, self.miss_distance_km):
+            yield (asteroid_id, neo_reference_id, absolute_magnitude, diameter_max,
+                   diameter_min, bool(is_hazardous), date.fromordinal(close_approach_date),
+                   miss_distance_km, uploaded_date)
+
+def pack_file(path: str) -> PackedRows:
+    """
+        Function parses feed file into packed rows, runs in worker process.
+    """
+    packed = PackedRows(path)
+    for row in iter_file_rows(path):
+        try:
+            packed.append(row)
+        except (TypeError, ValueError) as e:
+            packed.rejected += 1
+            logger.error(f'Failed to convert record {row[0]} of `{path}`: {e}')
+    return packed
+
+def pack_file_in_worker(path: str, quarantine_path: str, collect_metrics: bool) -> PackedRows:
+    """
+        Function packs file in worker process, whose quarantine and metrics
+        are copies of parent ones, or are not configured at all under spawn.
+        Records are quarantined into file of parent and counts and metrics
+        of the file go back with its rows, see `merge_worker_state`.
+    """
+    quarantine.path = quarantine_path
+    quarantined = quarantine.count
+    # Worker is reused across files and forked worker inherits parent values
+    metrics.reset()
+    metrics.enabled = collect_metrics
+    
+    packed = pack_file(path)
+    packed.quarantined = quarantine.count - quarantined
+    if collect_metrics:
+        packed.metrics = metrics.collect()
+    return packed
+
+def merge_worker_state(packed: PackedRows):
+    """
+        Function adds quarantined records and metrics of file packed
+        in worker process to the ones of this process.
+    """
+    quarantine.add(packed.quarantined)
+    if packed.metrics is not None:
+        metrics.merge(packed.metrics)
+
+def iter_packed_files(paths: list[str], processes: int | None = None) -> Iterator[PackedRows]:
+    """
+        Function parses files across process pool and yields packed rows
+        of each file as soon as it is parsed.
+        
+        :param processes: number of worker processes, defaults to number of cores.
+    """
+    if processes == 1:
+        yield from map(pack_file, paths)
+        return
+    
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(pack_file_in_worker, path, quarantine.path, metrics.enabled)
+                   for path in paths]
+        for future in as_completed(futures):
+            packed = future.result()
+            merge_worker_state(packed)
+            yield packed
@@ -0,0 +1,74 @@
+from typing import Sequence
+
+from project.parser.parser import ASTEROID_COLUMNS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+COLUMN_TYPES = {
+    'asteroid_id': 'int64',
+    'neo_reference_id': 'int64',
+    'absolute_magnitude': 'float64',
+    'estimated_diameter_km_max': 'float64',
+    'estimated_diameter_km_min': 'float64',
+    'isHazardous': 'bool',
+    'close_approach_date': 'datetime64[D]',
+    'miss_distance_km': 'float64',
+    'uploaded_date': 'datetime64[us]'
+}
+
+class ColumnBatch:
+    """
+        Typed column arrays of a batch of asteroid rows, written by
+        columnar exporter. Loads keep plain rows, which database
+        drivers take without conversion.
+    """
+    def __init__(self, columns: dict):
+        self.columns = columns
+    
+    def __len__(self):
+        return len(self.columns['asteroid_id'])
+    
+    def __getitem__(self, key):
+        return self.columns[key]
+    
+    @property
+    def diameter_midpoint_km(self):
+        return (self['estimated_diameter_km_max'] + self['estimated_diameter_km_min']) / 2
+    
+    @property
+    def hazard_ratio(self) -> float:
+        return float(self['isHazardous'].mean()) if len(self) else 0.0
+    
+    def hazard_ratio_by_day(self):
+        """
+            Share of hazardous asteroids per approach day.
+            
+            :return: tuple of (days, ratios) arrays.
+        """
+        days, inverse = np.unique(self['close_approach_date'], return_inverse=True)
+        hazardous = np.bincount(inverse, weights=self['isHazardous'])
+        return days, hazardous / np.bincount(inverse)
+
+def to_columns(rows: Sequence[tuple]) -> ColumnBatch:
+    """
+        Function converts parsed asteroid rows into typed column arrays.
+        String numbers and dates are converted with single vectorized cast per column.
+    """
+    if np is None:
+        raise ImportError('Columnar transform requires `numpy` package.')
+    
+    if not rows:
+        return ColumnBatch({name: np.empty(0, dtype=dtype) for name, dtype in COLUMN_TYPES.items()})
+    
+    columns = {}
+    for name, values in zip(ASTEROID_COLUMNS, zip(*rows)):
+        dtype = COLUMN_TYPES[name]
+        if dtype.startswith('datetime64'):
+            columns[name] = np.array(values, dtype=dtype)
+        else:
+            columns[name] = np.array(values).astype(dtype)
+    
+    return ColumnBatch(columns)
@@ -1,8 +1,88 @@
 from abc import ABC, abstractmethod
-from project.model import StageData
+from typing import Iterable
 
 from datetime import datetime
 
+from project.parser.validation import (
+    FieldSpec,
+    Quarantine,
+    RecordValidator,
+    to_bool,
+    to_date,
+    to_float,
+    to_id
+)
+
+ASTEROID_COLUMNS = (
+    'asteroid_id',
+    'neo_reference_id',
+    'absolute_magnitude',
+    'estimated_diameter_km_max',
+    'estimated_diameter_km_min',
+    'isHazardous',
+    'close_approach_date',
+    'miss_distance_km',
+    'uploaded_date'
+)
+
+# Fields of `ASTEROID_COLUMNS` but upload time, as read from feed record
+ASTEROID_FIELDS = (
+    FieldSpec('asteroid_id', ('id',), to_id),
+    FieldSpec('neo_reference_id', ('neo_reference_id',), to_id),
+    FieldSpec('absolute_magnitude', ('absolute_magnitude_h',), to_float),
+    FieldSpec('estimated_diameter_km_max',
+              ('estimated_diameter', 'kilometers', 'estimated_diameter_max'), to_float),
+    FieldSpec('estimated_diameter_km_min',
+              ('estimated_diameter', 'kilometers', 'estimated_diameter_min'), to_float),
+    FieldSpec('isHazardous', ('is_potentially_hazardous_asteroid',), to_bool),
+    FieldSpec('close_approach_date', ('close_approach_data', 0, 'close_approach_date'), to_date),
+    FieldSpec('miss_distance_km', ('close_approach_data', 0, 'miss_distance', 'kilometers'),
+              to_float)
+)
+
+ASTEROID_DIMENSION_COLUMNS = (
+    'asteroid_id',
+    'neo_reference_id',
+    'name',
+    'absolute_magnitude',
+    'estimated_diameter_km_max',
+    'estimated_diameter_km_min',
+    'isHazardous',
+    'is_sentry_object',
+    'uploaded_date'
+)
+
+APPROACH_COLUMNS = (
+    'asteroid_id',
+    'close_approach_date',
+    'close_approach_epoch',
+    'relative_velocity_kps',
+    'miss_distance_km',
+    'orbiting_body',
+    'uploaded_date'
+)
+
+ORBIT_COLUMNS = (
+    'asteroid_id',
+    'orbit_id',
+    'orbit_class_type',
+    'orbit_determination_date',
+    'first_observation_date',
+    'last_observation_date',
+    'observations_used',
+    'orbit_uncertainty',
+    'minimum_orbit_intersection',
+    'eccentricity',
+    'semi_major_axis',
+    'inclination',
+    'ascending_node_longitude',
+    'perihelion_distance',
+    'aphelion_distance',
+    'orbital_period',
+    'mean_anomaly',
+    'uploaded_date'
+)
+
 class Parser(ABC):
     def __init__(self, records):
         self.check_and_set_records(records)
@@ -15,7 +95,7 @@ class Parser(ABC):
         
     def check_and_set_records(self, records):
         if hasattr(records, '__iter__') and not isinstance(records, dict):
-            self._records = records
+            self._records = iter(records)
         elif isinstance(records, dict):
             self._records = iter([records])
         elif isinstance(records, (list, tuple)):
@@ -45,8 +125,15 @@ class Parser(ABC):
 
 class AsteroidParser(Parser):
     
+    def __init__(self, records):
+        # ORM declarations are needed only by this parser, keep them off import path
+        from project.model import StageData
+        
+        self._model = StageData
+        super().__init__(records)
+    
     def parse(self, record):
-        data = StageData()
+        data = self._model()
         
         data.asteroid_id = record['id']
         data.neo_reference_id = record['neo_reference_id']
@@ -59,6 +146,114 @@ class AsteroidParser(Parser):
         data.uploaded_date = datetime.now()  # You can set this to the current date or any other value if needed
         return data.as_dict()
 
+class AsteroidRowParser(Parser):
+    """
+        Parser building plain tuples ordered as `ASTEROID_COLUMNS`,
+        without any ORM instrumentation.
+        
+        Records are validated and coerced by compiled `ASTEROID_FIELDS`,
+        rejected ones are sent to quarantine and parsed as None.
+    """
+    def __init__(self, records=(), uploaded_date: datetime | None = None,
+                 quarantine: Quarantine | None = None):
+        super().__init__(records)
+        self.uploaded_date = uploaded_date or datetime.now()
+        self.validator = RecordValidator(ASTEROID_FIELDS, quarantine)
+        self._uploaded = (self.uploaded_date,)
+    
+    def __next__(self):
+        while (row := self.parse(next(self._records))) is None:
+            pass
+        return row
+    
+    def parse(self, record) -> tuple | None:
+        values = self.validator(record)
+        return None if values is None else values + self._uploaded
+    
+    def parse_many(self, record_set: Iterable[dict]) -> list[tuple]:
+        """
+            Parse whole record set (e.g. single date of feed) in one call,
+            leaving out rejected records.
+        """
+        parse = self.parse
+        return [row for row in map(parse, record_set) if row is not None]
+
+class AsteroidFanoutParser(Parser):
+    """
+        Parser splitting asteroid record into dimension row ordered as
+        `ASTEROID_DIMENSION_COLUMNS` and one row ordered as `APPROACH_COLUMNS`
+        for every entry of its `close_approach_data`.
+    """
+    def __init__(self, records=(), uploaded_date: datetime | None = None):
+        super().__init__(records)
+        self.uploaded_date = uploaded_date or datetime.now()
+    
+    def parse(self, record) -> tuple[tuple, list[tuple]]:
+        asteroid_id = record['id']
+        diameter = record['estimated_diameter']['kilometers']
+        uploaded_date = self.uploaded_date
+        
+        asteroid = (
+            asteroid_id,
+            record['neo_reference_id'],
+            record['name'],
+            record['absolute_magnitude_h'],
+            diameter['estimated_diameter_max'],
+            diameter['estimated_diameter_min'],
+            record['is_potentially_hazardous_asteroid'],
+            record.get('is_sentry_object', False),
+            uploaded_date
+        )
+        approaches = [
+            (
+                asteroid_id,
+                approach['close_approach_date'],
+                approach.get('epoch_date_close_approach'),
+                approach['relative_velocity']['kilometers_per_second'],
+                approach['miss_distance']['kilometers'],
+                approach['orbiting_body'],
+                uploaded_date
+            )
+            for approach in record['close_approach_data']
+        ]
+        return asteroid, approaches
+
+class AsteroidOrbitParser(Parser):
+    """
+        Parser building rows ordered as `ORBIT_COLUMNS` from `orbital_data`
+        of asteroid lookup records.
+    """
+    def __init__(self, records=(), uploaded_date: datetime | None = None):
+        super().__init__(records)
+        self.uploaded_date = uploaded_date or datetime.now()
+    
+    def parse(self, record) -> tuple:
+        orbit = record['orbital_data']
+        
+        return (
+            record['id'],
+            orbit['orbit_id'],
+            orbit.get('orbit_class', {}).get('orbit_class_type'),
+            orbit['orbit_determination_date'],
+            orbit['first_observation_date'],
+            orbit['last_observation_date'],
+            orbit.get('observations_used'),
+            orbit.get('orbit_uncertainty'),
+            orbit.get('minimum_orbit_intersection'),
+            orbit['eccentricity'],
+            orbit['semi_major_axis'],
+            orbit['inclination'],
+            orbit['ascending_node_longitude'],
+            orbit['perihelion_distance'],
+            orbit['aphelion_distance'],
+            orbit['orbital_period'],
+            orbit['mean_anomaly'],
+            self.uploaded_date
+        )
+
+def row_to_mapping(row: tuple) -> dict:
+    return dict(zip(ASTEROID_COLUMNS, row))
+
 class Asteroid:
     def __init__(self, asteroid_id, neo_reference_id, absolute_magnitude,
                  estimated_diameter_km_max, estimated_diameter_km_min,
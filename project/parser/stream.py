@@ -0,0 +1,136 @@
+from typing import IO, Iterator, Union
+
+import json
+import os
+import re
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+class JsonStream:
+    """
+        Incremental reader of JSON document from a text file object.
+        
+        Only the current chunk and a value being decoded are kept in memory,
+        single values are decoded by the C-accelerated `json` decoder.
+    """
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 16):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+    
+    def _fill(self) -> bool:
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+    
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+    
+    def peek(self) -> str:
+        """
+            Return next non-whitespace character without consuming it.
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise self._error('Unexpected end of JSON document')
+    
+    def take(self, *expected: str) -> str:
+        """
+            Consume next structural character, which has to be one of `expected`.
+        """
+        char = self.peek()
+        if char not in expected:
+            raise self._error(f'Expected one of {expected!r}, got {char!r}')
+        self._pos += 1
+        return char
+    
+    def value(self):
+        """
+            Decode and consume next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # Number or literal at the end of chunk may be cut in half
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+    
+    def members(self) -> Iterator[str]:
+        """
+            Iterate over keys of object, caller has to consume each member value.
+        """
+        self.take('{')
+        if self.peek() == '}':
+            self.take('}')
+            return
+        
+        while True:
+            key = self.value()
+            self.take(':')
+            yield key
+            if self.take(',', '}') == '}':
+                return
+    
+    def items(self) -> Iterator:
+        """
+            Iterate over decoded items of array.
+        """
+        self.take('[')
+        if self.peek() == ']':
+            self.take(']')
+            return
+        
+        while True:
+            yield self.value()
+            if self.take(',', ']') == ']':
+                return
+
+def iter_near_earth_objects(fp: IO[str], chunk_size: int = 1 << 16) -> Iterator[tuple[str, dict]]:
+    """
+        Function walks `near_earth_objects` of NeoWs feed document and yields
+        (date, asteroid record) pairs one at a time. Other members are skipped.
+    """
+    stream = JsonStream(fp, chunk_size)
+    
+    for key in stream.members():
+        if key != 'near_earth_objects':
+            stream.value()
+            continue
+        
+        for date in stream.members():
+            for record in stream.items():
+                yield date, record
+
+def iter_feed_records(source: Union[str, os.PathLike, IO[str]],
+                      chunk_size: int = 1 << 16) -> Iterator[tuple[str, dict]]:
+    """
+        Function streams (date, asteroid record) pairs from feed json file.
+        
+        :param source: path to json file or already opened text file object.
+    """
+    if hasattr(source, 'read'):
+        yield from iter_near_earth_objects(source, chunk_size)
+        return
+    
+    if not os.path.exists(source):
+        raise IOError(f'Given path does not exists {source}.')
+    
+    with open(source, mode='r') as json_file:
+        yield from iter_near_earth_objects(json_file, chunk_size)
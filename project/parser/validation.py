@@ -0,0 +1,214 @@
+from datetime import date
+from functools import lru_cache
+from threading import Lock
+from typing import Callable, Iterable
+
+import math
+import json
+import os
+
+from project.metrics import metrics
+from project.utils import logger
+
+QUARANTINE_PATH = os.path.abspath('./data/quarantine.jsonl')
+
+# Every error a broken record can raise from compiled accessors and coercers
+RECORD_ERRORS = (KeyError, IndexError, TypeError, ValueError, AttributeError)
+
+_BOOLEANS = {True: True, False: False, 'true': True, 'false': False}
+
+def to_id(value) -> int:
+    """
+        Function coerces numeric id, sent by NeoWs as string, into int.
+    """
+    if value.__class__ is int:
+        return value
+    if value.__class__ is str:
+        return int(value)
+    raise TypeError(f'id expected, got {type(value).__name__}')
+
+def to_float(value) -> float:
+    """
+        Function coerces number or numeric string into finite float.
+    """
+    if value.__class__ is bool:
+        raise TypeError('number expected, got bool')
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f'finite number expected, got {value}')
+    return value
+
+def to_bool(value) -> bool:
+    result = _BOOLEANS.get(value)
+    if result is None:
+        raise ValueError(f'boolean expected, got {value!r}')
+    return result
+
+def to_date(value) -> str:
+    """
+        Function checks `yyyy-mm-dd` date string and returns it unchanged.
+    """
+    if len(value) != 10:
+        raise ValueError(f'yyyy-mm-dd date expected, got {value!r}')
+    date.fromisoformat(value)
+    return value
+
+class FieldSpec:
+    """
+        Single output field, read by `path` of keys and list indexes
+        from nested record and converted by `coerce`.
+        
+        Optional fields read missing last key or null value as `default`.
+    """
+    def __init__(self, name: str, path: tuple, coerce: Callable = None,
+                 required: bool = True, default=None):
+        self.name = name
+        self.path = path
+        self.coerce = coerce
+        self.required = required
+        self.default = default
+    
+    def read(self, record):
+        value = record
+        for key in self.path[:-1]:
+            value = value[key]
+        if self.required:
+            value = value[self.path[-1]]
+        else:
+            value = value.get(self.path[-1])
+            if value is None:
+                return self.default
+        return self.coerce(value) if self.coerce is not None else value
+    
+    def __repr__(self):
+        return (f"<FieldSpec(name={self.name}, "
+                f"path={self.path}, "
+                f"required={self.required})>")
+
+@lru_cache(maxsize=None)
+def compile_fields(fields: tuple[FieldSpec, ...]) -> Callable[[dict], tuple]:
+    """
+        Function compiles field specs into single function returning tuple
+        of coerced fields, compiled once per spec.
+        
+        Lookups shared by several fields, e.g. `record['close_approach_data'][0]`,
+        are made once and bound to locals, so valid record costs only plain
+        subscripts and coercer calls. Broken record raises one of `RECORD_ERRORS`.
+    """
+    namespace, lines, values, nodes = {}, [], [], {(): 'record'}
+    
+    def node(path: tuple) -> str:
+        if path not in nodes:
+            parent = node(path[:-1])
+            nodes[path] = f'n{len(nodes)}'
+            lines.append(f'    {nodes[path]} = {parent}[{path[-1]!r}]')
+        return nodes[path]
+    
+    for i, field in enumerate(fields):
+        parent = node(field.path[:-1])
+        if field.required:
+            value = f'{parent}[{field.path[-1]!r}]'
+        else:
+            lines.append(f'    v{i} = {parent}.get({field.path[-1]!r})')
+            namespace[f'd{i}'] = field.default
+            value = f'v{i}'
+        if field.coerce is not None:
+            namespace[f'c{i}'] = field.coerce
+            value = f'c{i}({value})'
+        if not field.required:
+            value = f'(d{i} if v{i} is None else {value})'
+        values.append(value)
+    
+    source = '\n'.join(['def convert(record):', *lines,
+                        f'    return ({", ".join(values)},)'])
+    exec(compile(source, f'<fields {", ".join(field.name for field in fields)}>', 'exec'),
+         namespace)
+    return namespace['convert']
+
+class Quarantine:
+    """
+        Append only JSONL file of rejected records, one compact
+        `{"id": ..., "reason": ...}` line per record.
+        
+        File is opened on first reject and every line is written by single
+        write, so threads and worker processes may share it.
+    """
+    def __init__(self, path: str = QUARANTINE_PATH):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._lock = Lock()
+    
+    def write(self, record_id, reason: str):
+        line = json.dumps({'id': record_id, 'reason': reason}, separators=(',', ':'))
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+                logger.warning(f'Rejected records are quarantined in {self.path}')
+            self._file.write(line + '\n')
+            self.count += 1
+        metrics.inc('parse_failures_total')
+    
+    def add(self, count: int):
+        """
+            Count records quarantined into the same file by worker process.
+        """
+        with self._lock:
+            self.count += count
+    
+    def reject(self, record, reason: str):
+        self.write(record.get('id') if isinstance(record, dict) else None, reason)
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def __repr__(self):
+        return (f"<Quarantine(path={self.path}, "
+                f"count={self.count})>")
+
+# Process wide quarantine, path is configured by `main`
+quarantine = Quarantine()
+
+class RecordValidator:
+    """
+        Validates and coerces records by compiled field specs.
+        
+        Valid record costs one call of compiled function. Rejected record is
+        explained field by field only then, sent to quarantine and parsed as
+        None, so broken records never reach, nor abort, bulk inserts.
+    """
+    def __init__(self, fields: Iterable[FieldSpec], quarantine: Quarantine | None = None):
+        self.fields = tuple(fields)
+        self.columns = tuple(field.name for field in self.fields)
+        self.quarantine = quarantine
+        self.rejected = 0
+        self._convert = compile_fields(self.fields)
+    
+    def explain(self, record) -> str:
+        """
+            Return reason of first field failing to validate.
+        """
+        for field in self.fields:
+            try:
+                field.read(record)
+            except KeyError as e:
+                return f'{field.name}: missing {e}'
+            except RECORD_ERRORS as e:
+                return f'{field.name}: {type(e).__name__}: {e}'
+        return 'valid'
+    
+    def __call__(self, record) -> tuple | None:
+        try:
+            return self._convert(record)
+        except RECORD_ERRORS:
+            self.rejected += 1
+            (self.quarantine or quarantine).reject(record, self.explain(record))
+            return None
+    
+    def __repr__(self):
+        return (f"<RecordValidator(columns={self.columns}, "
+                f"rejected={self.rejected})>")
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from threading import Lock
+
+import sqlite3
+import os
+
+from project.utils import split_date_range
+
+LEDGER_PATH = os.path.abspath('./data/ledger.sqlite3')
+
+FETCHED = 'fetched'
+PARSED = 'parsed'
+LOADED = 'loaded'
+FAILED = 'failed'
+
+class RunLedger:
+    """
+        Persistent record of state of every processed window, kept in local SQLite file.
+        
+        Backfills consult it to skip windows which are already loaded.
+    """
+    def __init__(self, path: str = LEDGER_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """\
+                CREATE TABLE IF NOT EXISTS windows (\
+                start_date TEXT NOT NULL,\
+                end_date TEXT NOT NULL,\
+                state TEXT NOT NULL,\
+                rows INTEGER,\
+                duration REAL,\
+                error TEXT,\
+                updated_at TEXT NOT NULL,\
+                PRIMARY KEY (start_date, end_date)\
+                )
+                """
+            )
+    
+    def record(self, start_date: str, end_date: str, state: str,
+               rows: int | None = None, duration: float | None = None,
+               error: str | None = None) -> None:
+        """
+            Set current state of window, row count is kept from earlier states
+            when not given.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                """\
+                INSERT INTO windows VALUES (?, ?, ?, ?, ?, ?, ?)\
+                ON CONFLICT (start_date, end_date) DO UPDATE SET\
+                state = excluded.state,\
+                rows = COALESCE(excluded.rows, windows.rows),\
+                duration = excluded.duration,\
+                error = excluded.error,\
+                updated_at = excluded.updated_at
+                """,
+                (start_date, end_date, state, rows, duration, error,
+                 datetime.now().isoformat(timespec='seconds'))
+            )
+    
+    def windows(self, date_from: str, date_to: str) -> list[tuple]:
+        """
+            Return (start_date, end_date, state, rows, duration, error, updated_at)
+            of windows overlapping given dates.
+        """
+        with self._lock:
+            return self._connection.execute(
+                """\
+                SELECT * FROM windows\
+                WHERE end_date >= ? AND start_date <= ?\
+                ORDER BY start_date
+                """,
+                (date_from, date_to)
+            ).fetchall()
+    
+    def gaps(self, date_from: str, date_to: str, days: int = 7) -> list[tuple[str, str]]:
+        """
+            Return windows of at most `days` days covering every date between
+            given dates which is not part of any loaded window.
+        """
+        fmt = '%Y-%m-%d'
+        loaded = set()
+        for start_date, end_date, state, *_ in self.windows(date_from, date_to):
+            if state != LOADED:
+                continue
+            day = datetime.strptime(start_date, fmt)
+            while day <= datetime.strptime(end_date, fmt):
+                loaded.add(day.strftime(fmt))
+                day += timedelta(days=1)
+        
+        gaps, run_start, previous = [], None, None
+        for day, _ in split_date_range(date_from, date_to, 1):
+            if day in loaded:
+                if run_start is not None:
+                    gaps.extend(split_date_range(run_start, previous, days))
+                    run_start = None
+            elif run_start is None:
+                run_start = day
+            previous = day
+        
+        if run_start is not None:
+            gaps.extend(split_date_range(run_start, previous, days))
+        return gaps
+    
+    def forget(self, date_from: str, date_to: str) -> int:
+        """
+            Remove windows overlapping given dates, so they are backfilled again.
+        """
+        with self._lock, self._connection:
+            return self._connection.execute(
+                """\
+                DELETE FROM windows WHERE end_date >= ? AND start_date <= ?
+                """,
+                (date_from, date_to)
+            ).rowcount
+    
+    def close(self) -> None:
+        self._connection.close()
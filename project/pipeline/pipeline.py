@@ -1,14 +1,103 @@
-from project.exctract.extractors import NeoWsExtractor
+from project.exctract.extractors import NeoWsExtractor, WindowResult
+from project.exctract.cache import FeedCache
+from project.exctract.enrichment import AsteroidIds, NeoWsLookupExtractor
+from project.database.loader import (
+    BulkLoader,
+    FanoutLoader,
+    LoadReport,
+    get_loader,
+    load_orbits)
+from project.database.partitions import clear_date_range
+from project.database.rollups import (
+    ensure_rollup_table,
+    load_with_rollup,
+    rebuild_daily_rollup)
+from project.export.exporter import ColumnarExporter
+from project.pipeline.ledger import RunLedger, FETCHED, LOADED, FAILED
+from project.metrics import metrics
+from project.parser.parser import AsteroidFanoutParser, AsteroidOrbitParser
 from project.utils import (
+    FEED_FILE_WINDOW,
     add_days_to_date,
-    process_file)
+    logger,
+    iter_file_rows,
+    split_date_range)
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 import sqlalchemy
-from typing import Optional, Callable
+import asyncio
+import time
+import io
+import os
+from typing import Optional, Iterable
 
 class Pipeline:
-    def __init__(self, api_key: str):
-        self.extractor = NeoWsExtractor(api_key)
+    def __init__(self, api_key: str, max_workers: int = 4,
+                 loader: Optional[BulkLoader] = None, staged: bool = True,
+                 cache: Optional[FeedCache] = None, ledger: Optional[RunLedger] = None,
+                 fanout: bool = False, rollup: bool = False,
+                 exporter: Optional[ColumnarExporter] = None, load_database: bool = True,
+                 enricher: Optional[NeoWsLookupExtractor] = None):
+        if fanout and exporter is not None:
+            raise ValueError('Columnar export writes `asteroids_details` rows, not fan-out.')
+        if not (load_database or exporter):
+            raise ValueError('Pipeline without database load needs exporter.')
+        if enricher is not None and not load_database:
+            raise ValueError('Enrichment loads `asteroid_orbits`, it needs database load.')
+        
+        self.api_key = api_key
+        self.extractor = NeoWsExtractor(api_key, max_workers=max_workers, cache=cache)
+        self.loader = loader or get_loader()
+        self.staged = staged
+        self.ledger = ledger
+        # Keeps asteroid id cache of fan-out across windows
+        self.fanout_loader = FanoutLoader(self.loader.batch_size) if fanout else None
+        self.rollup = rollup
+        self._rollup_ready = False
+        self.exporter = exporter
+        self.load_database = load_database
+        self.enricher = enricher
+    
+    def record(self, start_date: str, end_date: str, state: str, **kwargs):
+        """
+            Note state of window in run ledger, when pipeline has one.
+        """
+        if self.ledger is not None:
+            self.ledger.record(start_date, end_date, state, **kwargs)
+    
+    def plan(self, start_date: str, end_date: str, resume: bool = False) -> list[tuple[str, str]]:
+        """
+            Split range into windows, leaving out already loaded days when resuming.
+        """
+        if resume and self.ledger is not None:
+            windows = self.ledger.gaps(start_date, end_date, self.extractor.window_days)
+            print(f"Resuming {start_date} - {end_date}: {len(windows)} windows left")
+            return windows
+        return split_date_range(start_date, end_date, self.extractor.window_days)
+    
+    def load(self, connection: sqlalchemy.Connection, rows: Iterable[tuple],
+             staged: Optional[bool] = None) -> LoadReport:
+        """
+            Load rows, by idempotent staged upsert unless staging is disabled,
+            and recompute daily rollup of days they approach when enabled.
+            
+            :param staged: overrides `staged` of pipeline, e.g. for callers
+                           which update existing rows.
+        """
+        self.prepare_rollup(connection)
+        return load_with_rollup(connection, self.loader, rows,
+                                self.staged if staged is None else staged, self.rollup)
+    
+    def prepare_rollup(self, connection: sqlalchemy.Connection):
+        """
+            Create rollup table once per pipeline when rollup is enabled,
+            commits, so call it before anything else of transaction.
+        """
+        if self.rollup and not self._rollup_ready:
+            ensure_rollup_table(connection)
+            self._rollup_ready = True
     
     def extract(self, start_date: str, end_date: Optional[str] = None):
         try:
@@ -18,31 +107,320 @@ class Pipeline:
         except Exception as error:
             print(f"Error during data extraction: {error}")
             raise
+    
+    def extract_range(self, start_date: str, end_date: str,
+                      max_workers: Optional[int] = None,
+                      windows: Optional[list[tuple[str, str]]] = None) -> list[WindowResult]:
+        print(f"Starting range extraction from {start_date} to {end_date}")
+        if windows is None:
+            windows = self.plan(start_date, end_date)
+        results = self.extractor.extract_windows(windows, max_workers)
         
-    def transform_and_load(self, session_factory: Callable , start_date: str, end_date: Optional[str] = None):
-        try:
-            from project.model import TargetData
-        except ImportError:
-            return
-
+        for result in results:
+            self.record(result.start_date, result.end_date,
+                        FETCHED if result.ok else FAILED,
+                        duration=result.elapsed,
+                        error=None if result.ok else result.info)
+        
+        failed = [result for result in results if not result.ok]
+        for result in failed:
+            print(f"Error during extraction of {result.start_date} - {result.end_date}: {result.info}")
+        print(f"Range extraction complete: {len(results) - len(failed)}/{len(results)} windows")
+        if self.extractor.quota_remaining is not None:
+            print(f"Remaining api_key quota: {self.extractor.quota_remaining}")
+        
+        return results
+    
+    def export(self, rows: list[tuple], start_date: str, end_date: str):
+        """
+            Write parsed rows of window to columnar files, when pipeline has exporter.
+        """
+        if self.exporter is None:
+            return None
+        with metrics.stage('export'):
+            report = self.exporter.export(rows, start_date, end_date)
+        metrics.inc('rows_exported_total', report.rows)
+        print(f'Data exported successfully: {report}')
+        return report
+    
+    def transform_and_load(self, engine: Optional[sqlalchemy.Engine], start_date: str,
+                           end_date: Optional[str] = None) -> Optional[LoadReport]:
+        """
+            Parse fetched window and load it into database, writing it
+            to columnar files first when pipeline has exporter.
+        """
         if end_date is None:
             end_date = add_days_to_date(start_date)
         
-        file_path = '_'.join(['NeoWs_json', start_date, end_date]) + '.json'
-        records = process_file(file_path)
-
-        if records:
+        started = time.perf_counter()
+        source = self.extractor.open_window(start_date, end_date)
+        return self.load_window(engine, start_date, end_date, source, started)
+    
+    def load_window(self, engine: Optional[sqlalchemy.Engine], start_date: str, end_date: str,
+                    source, started: Optional[float] = None) -> Optional[LoadReport]:
+        """
+            Parse window from source accepted by `iter_file_rows`, file name
+            or opened file, and load it. Source is closed afterwards.
+            
+            :param started: `perf_counter` time window processing began at.
+        """
+        if started is None:
+            started = time.perf_counter()
+        
+        try:
+            if self.exporter is not None:
+                # Export needs whole window, so parsing no longer overlaps inserting
+                rows = list(iter_file_rows(source))
+                report = self.export(rows, start_date, end_date)
+                if not self.load_database:
+                    self.record(start_date, end_date, LOADED, rows=report.rows,
+                                duration=time.perf_counter() - started)
+                    return report
+            
+            with engine.connect() as connection:
+                # Rows are parsed lazily, so parsing overlaps inserting
+                if self.fanout_loader is not None:
+                    ids = AsteroidIds(key=lambda record: record[0][0])
+                    records = iter_file_rows(source, AsteroidFanoutParser())
+                    if self.enricher is not None:
+                        records = ids.track(records)
+                    report = self.fanout_loader.load(connection, records)
+                else:
+                    ids = AsteroidIds()
+                    if self.exporter is None:
+                        rows = iter_file_rows(source)
+                    if self.enricher is not None:
+                        rows = ids.track(rows)
+                    report = self.load(connection, rows)
+                print(f'Data inserted successfully: {report}')
+                
+                if self.enricher is not None:
+                    self.enrich(connection, ids.ids)
+                self.record(start_date, end_date, LOADED, rows=report.rows,
+                            duration=time.perf_counter() - started)
+                metrics.observe('window_seconds', time.perf_counter() - started)
+                metrics.set('rows_per_second', report.rows_per_second, table=report.table)
+                return report
+        except (sqlalchemy.exc.SQLAlchemyError, OSError) as error:
+            print(f'Error during data insertion: {error}')
+            self.record(start_date, end_date, FAILED,
+                        duration=time.perf_counter() - started, error=str(error))
+            metrics.inc('windows_total', state='failed')
+        finally:
+            if hasattr(source, 'close'):
+                source.close()
+    
+    def enrich(self, connection: sqlalchemy.Connection,
+               asteroid_ids: Iterable) -> Optional[LoadReport]:
+        """
+            Look up orbital data of given asteroids through enricher
+            and upsert it into `asteroid_orbits`.
+        """
+        if self.enricher is None:
+            return None
+        
+        records = self.enricher.enrich(asteroid_ids)
+        parser = AsteroidOrbitParser()
+        rows = []
+        for asteroid_id, record in records.items():
             try:
-                with session_factory() as s:
-                    s.bulk_insert_mappings(TargetData, records)
-                    s.commit()
-                    print('Data inserted successfully')
-            except sqlalchemy.exc.SQLAlchemyError as error:
-                print(f'Error during data insertion: {error}')
-                s.rollback()
-            finally:
-                s.close()
-    
-    def do_pipeline(self, session_factory, start_date: str, end_date: Optional[str] = None):
+                rows.append(parser.parse(record))
+            except (KeyError, TypeError) as e:
+                logger.error(f'Failed to parse orbit of asteroid {asteroid_id}: {e}')
+        
+        report = load_orbits(connection, rows, self.loader.batch_size)
+        # Expired lookups are misses already, they must not pile up on disk either
+        self.enricher.cache.evict_expired()
+        print(f'Orbits enriched successfully: {report}, {self.enricher.cache}')
+        return report
+    
+    def reprocess(self, engine: sqlalchemy.Engine, paths: list[str],
+                  processes: Optional[int] = None) -> list[LoadReport]:
+        """
+            Parse saved feed files across process pool and load them
+            through single loader as they are parsed. Asteroids of all
+            files are enriched once at the end when pipeline has enricher.
+        """
+        from project.parser.bulk import iter_packed_files
+        
+        if self.fanout_loader is not None:
+            raise ValueError('Reprocessing packs `asteroids_details` rows, run fan-out without it.')
+        
+        reports = []
+        ids = AsteroidIds()
+        with engine.connect() if self.load_database else nullcontext() as connection:
+            for packed in iter_packed_files(paths, processes):
+                name = os.path.basename(packed.source)
+                rows = packed.rows()
+                if self.exporter is not None:
+                    # Files named after their window replace its exported files
+                    dates = FEED_FILE_WINDOW.search(name)
+                    rows = list(rows)
+                    report = self.export(rows, *(dates.groups() if dates else (name, 'file')))
+                
+                if connection is not None:
+                    if self.enricher is not None:
+                        rows = ids.track(rows)
+                    report = self.load(connection, rows)
+                reports.append(report)
+                print(f'Reprocessed {name}: {report}')
+            
+            if self.enricher is not None:
+                self.enrich(connection, ids.ids)
+        
+        return reports
+    
+    def do_pipeline(self, engine: sqlalchemy.Engine, start_date: str, end_date: Optional[str] = None):
         self.extract(start_date, end_date)
-        self.transform_and_load(session_factory, start_date, end_date)
\ No newline at end of file
+        self.transform_and_load(engine, start_date, end_date)
+    
+    def do_range_pipeline(self, engine: sqlalchemy.Engine, start_date: str, end_date: str,
+                          max_workers: Optional[int] = None,
+                          resume: bool = False) -> list[WindowResult]:
+        """
+            Extract whole range concurrently, then load every fetched window.
+            Windows already loaded by earlier runs are skipped when resuming.
+        """
+        windows = self.plan(start_date, end_date, resume)
+        results = self.extract_range(start_date, end_date, max_workers, windows)
+        
+        for result in results:
+            if result.ok:
+                self.transform_and_load(engine, result.start_date, result.end_date)
+        
+        return results
+    
+    async def run(self, engine: Optional[sqlalchemy.Engine], start_date: str,
+                  end_date: Optional[str] = None, resume: bool = False,
+                  extractor=None, max_windows: Optional[int] = None,
+                  load_workers: int = 2) -> list[WindowResult]:
+        """
+            Async `do_range_pipeline` for asyncio applications.
+            
+            Windows are downloaded concurrently on running loop, parsing and
+            loading, which block on pymysql, go to executor of `load_workers`
+            threads. At most `max_windows` windows are in flight at once,
+            bounding raw bodies held in memory.
+            
+            :param extractor: opened `AsyncNeoWsExtractor` to share with caller,
+                              one configured like sync extractor by default.
+            
+            :return: list of window results in chronological order.
+        """
+        from project.exctract.async_extractor import AsyncNeoWsExtractor, WINDOW_ERRORS
+        
+        if end_date is None:
+            end_date = add_days_to_date(start_date)
+        # Ledger and cache are read and written by blocking calls, never on the loop
+        windows = await asyncio.to_thread(self.plan, start_date, end_date, resume)
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(max_windows or 2 * self.extractor.max_workers)
+        
+        async def process(extractor, executor, window_start: str, window_end: str) -> WindowResult:
+            async with in_flight:
+                started = time.perf_counter()
+                try:
+                    body = await extractor.download(window_start, window_end)
+                except WINDOW_ERRORS as error:
+                    elapsed = time.perf_counter() - started
+                    await asyncio.to_thread(self.record, window_start, window_end, FAILED,
+                                            duration=elapsed, error=str(error))
+                    metrics.inc('windows_total', state='failed')
+                    return WindowResult(window_start, window_end, False, str(error), elapsed)
+                
+                elapsed = time.perf_counter() - started
+                metrics.observe('stage_seconds', elapsed, stage='fetch')
+                metrics.inc('windows_total', state='fetched')
+                await asyncio.to_thread(self.record, window_start, window_end, FETCHED,
+                                        duration=elapsed)
+                
+                source = io.TextIOWrapper(io.BytesIO(body), encoding='utf-8')
+                report = await loop.run_in_executor(executor, self.load_window, engine,
+                                                    window_start, window_end, source, started)
+                return WindowResult(window_start, window_end, report is not None,
+                                    str(report) if report is not None else 'Load failed',
+                                    time.perf_counter() - started)
+        
+        owned = extractor is None
+        if owned:
+            extractor = await AsyncNeoWsExtractor(self.api_key, url=self.extractor.url,
+                                                  max_connections=self.extractor.max_workers,
+                                                  cache=self.extractor.cache).open()
+        executor = ThreadPoolExecutor(max_workers=load_workers)
+        try:
+            results = await asyncio.gather(*(process(extractor, executor, *window)
+                                             for window in windows))
+        except BaseException:
+            # Waiting for loads in flight would block the loop of cancelled run
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        else:
+            executor.shutdown()
+        finally:
+            if owned:
+                await extractor.close()
+        
+        failed = [result for result in results if not result.ok]
+        print(f"Async pipeline complete: {len(results) - len(failed)}/{len(results)} windows")
+        return list(results)
+    
+    def sync(self, engine: sqlalchemy.Engine, interval: float = 3600,
+             days_back: int = 7, days_ahead: int = 7, polls: Optional[int] = None,
+             store=None):
+        """
+            Keep recent and upcoming days in sync, pushing only changed rows,
+            see `SyncDaemon`. Runs until interrupted or for `polls` polls.
+        """
+        from project.pipeline.sync import SyncDaemon
+        
+        daemon = SyncDaemon(self, engine, store, interval, days_back, days_ahead)
+        print(f"Syncing {days_back} days back and {days_ahead} days ahead every {interval}s")
+        daemon.run(polls)
+        return daemon
+    
+    def reload(self, engine: sqlalchemy.Engine, start_date: str, end_date: str,
+               max_workers: Optional[int] = None) -> list[WindowResult]:
+        """
+            Empty range, truncating whole month partitions, and load it again.
+        """
+        truncated = clear_date_range(engine, start_date, end_date)
+        print(f"Cleared {start_date} - {end_date}, truncated partitions: {truncated or 'none'}")
+        if self.ledger is not None:
+            self.ledger.forget(start_date, end_date)
+        if self.rollup:
+            rebuild_daily_rollup(engine, start_date, end_date)
+        
+        return self.do_range_pipeline(engine, start_date, end_date, max_workers)
+    
+    def do_streaming_pipeline(self, engine: sqlalchemy.Engine, start_date: str, end_date: str,
+                              parse_workers: int = 2, queue_size: int = 8,
+                              resume: bool = False):
+        """
+            Run extract, parse and load of the range concurrently through bounded queues.
+            Raw windows touch disk only when cache is enabled.
+        """
+        from project.pipeline.streaming import StreamingPipeline
+        
+        if not self.load_database:
+            raise ValueError('Streaming pipeline always loads database, run export only without it.')
+        if self.enricher is not None:
+            raise ValueError('Streaming pipeline does not enrich windows, run enrichment without it.')
+        if self.fanout_loader is not None:
+            raise ValueError('Streaming pipeline loads `asteroids_details`, run fan-out without it.')
+        
+        streaming = StreamingPipeline(self.extractor, self.loader,
+                                      fetch_workers=self.extractor.max_workers,
+                                      parse_workers=parse_workers,
+                                      queue_size=queue_size,
+                                      staged=self.staged,
+                                      ledger=self.ledger,
+                                      rollup=self.rollup,
+                                      exporter=self.exporter)
+        report = streaming.run(engine, start_date, end_date,
+                               self.plan(start_date, end_date, resume))
+        
+        for result in report.failed:
+            print(f"Error during extraction of {result.start_date} - {result.end_date}: {result.info}")
+        print(f"Streaming pipeline complete: {report}")
+        
+        return report
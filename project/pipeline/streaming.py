@@ -0,0 +1,259 @@
+from queue import Queue, Empty, Full
+from threading import Thread, Event, Lock
+from typing import Optional
+
+import requests
+import sqlalchemy
+import json
+import time
+
+from project.database.loader import BulkLoader
+from project.database.rollups import ensure_rollup_table, load_with_rollup
+from project.exctract.extractors import NeoWsExtractor, WindowResult
+from project.export.exporter import ColumnarExporter
+from project.pipeline.ledger import RunLedger, FETCHED, PARSED, LOADED, FAILED
+from project.metrics import metrics
+from project.parser.parser import AsteroidRowParser
+from project.utils import logger, split_date_range
+
+_DONE = object()
+
+class StreamReport:
+    """
+        Summary of streaming run, `stage_seconds` are busy times summed
+        over all workers of every stage.
+    """
+    def __init__(self):
+        self.windows: list[WindowResult] = []
+        self.rows = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.stage_seconds = {'fetch': 0.0, 'parse': 0.0, 'load': 0.0}
+    
+    @property
+    def failed(self) -> list[WindowResult]:
+        return [window for window in self.windows if not window.ok]
+    
+    def __repr__(self):
+        stages = ', '.join(f'{stage}={seconds:.3f}s' for stage, seconds in self.stage_seconds.items())
+        return (f"<StreamReport(windows={len(self.windows)}, "
+                f"failed={len(self.failed)}, "
+                f"rows={self.rows}, "
+                f"batches={self.batches}, "
+                f"seconds={self.seconds:.3f}, "
+                f"{stages})>")
+
+class StreamingPipeline:
+    """
+        Extract, parse and load stages connected by bounded queues.
+        
+        Fetch workers push raw windows to parse workers, which push parsed rows
+        to single loader batching them across windows. Full queues block their
+        producers, so the whole run goes at the pace of the slowest stage.
+    """
+    def __init__(self, extractor: NeoWsExtractor, loader: BulkLoader,
+                 fetch_workers: int = 4, parse_workers: int = 2,
+                 queue_size: int = 8, staged: bool = True,
+                 ledger: Optional[RunLedger] = None, rollup: bool = False,
+                 exporter: Optional[ColumnarExporter] = None):
+        self.extractor = extractor
+        self.loader = loader
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.staged = staged
+        self.ledger = ledger
+        self.rollup = rollup
+        self.exporter = exporter
+        
+        self._stop = Event()
+        self._lock = Lock()
+    
+    def _put(self, queue: Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+    
+    def _get(self, queue: Queue):
+        while not self._stop.is_set():
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                continue
+        return _DONE
+    
+    def _add_time(self, report: StreamReport, stage: str, started: float):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            report.stage_seconds[stage] = report.stage_seconds.get(stage, 0.0) + elapsed
+        # Loader observes its own batches
+        if stage != 'load':
+            metrics.observe('stage_seconds', elapsed, stage=stage)
+    
+    def _add_window(self, report: StreamReport, window: WindowResult):
+        with self._lock:
+            report.windows.append(window)
+        if not window.ok:
+            self._record(window.start_date, window.end_date, FAILED,
+                         duration=window.elapsed, error=window.info)
+    
+    def _record(self, start_date: str, end_date: str, state: str, **kwargs):
+        if self.ledger is not None:
+            self.ledger.record(start_date, end_date, state, **kwargs)
+    
+    def download(self, start_date: str, end_date: str):
+        """
+            Return raw json body of window, through cache when it is enabled.
+        """
+        if self.extractor.cache is not None:
+            self.extractor.cache_window(start_date, end_date)
+            with self.extractor.open_window(start_date, end_date) as blob:
+                return blob.read()
+        
+        result = self.extractor.request(start_date, end_date)
+        result.raise_for_status()
+        return result.content
+    
+    def _fetch(self, windows: Queue, raw: Queue, report: StreamReport):
+        while not self._stop.is_set():
+            try:
+                start_date, end_date = windows.get_nowait()
+            except Empty:
+                return
+            
+            started = time.perf_counter()
+            try:
+                body = self.download(start_date, end_date)
+            except (requests.exceptions.RequestException, ValueError, IOError) as e:
+                self._add_window(report, WindowResult(start_date, end_date, False, str(e),
+                                                      time.perf_counter() - started))
+                continue
+            self._add_time(report, 'fetch', started)
+            self._record(start_date, end_date, FETCHED,
+                         duration=time.perf_counter() - started)
+            
+            if not self._put(raw, (start_date, end_date, started, body)):
+                return
+    
+    def parse(self, body) -> list[tuple]:
+        parser = AsteroidRowParser()
+        rows = []
+        with metrics.timer('decode_seconds'):
+            feed = json.loads(body)
+        # Broken records are quarantined by parser and left out
+        for record_set in feed.get('near_earth_objects', {}).values():
+            rows.extend(parser.parse_many(record_set))
+        metrics.inc('records_total', len(rows))
+        return rows
+    
+    def _parse(self, raw: Queue, parsed: Queue, report: StreamReport):
+        while (item := self._get(raw)) is not _DONE:
+            start_date, end_date, fetched, body = item
+            
+            started = time.perf_counter()
+            try:
+                rows = self.parse(body)
+            except json.JSONDecodeError as e:
+                self._add_window(report, WindowResult(start_date, end_date, False, str(e),
+                                                      time.perf_counter() - fetched))
+                continue
+            self._add_time(report, 'parse', started)
+            
+            if self.exporter is not None:
+                # Parse workers export their own windows, off the loader thread
+                started = time.perf_counter()
+                try:
+                    self.exporter.export(rows, start_date, end_date)
+                except OSError as e:
+                    self._add_window(report, WindowResult(start_date, end_date, False, str(e),
+                                                          time.perf_counter() - fetched))
+                    continue
+                self._add_time(report, 'export', started)
+                metrics.inc('rows_exported_total', len(rows))
+            
+            self._record(start_date, end_date, PARSED, rows=len(rows),
+                         duration=time.perf_counter() - fetched)
+            
+            if not self._put(parsed, (start_date, end_date, fetched, rows)):
+                return
+    
+    def _close(self, threads: list[Thread], queue: Queue, count: int):
+        for thread in threads:
+            thread.join()
+        for _ in range(count):
+            self._put(queue, _DONE)
+    
+    def _flush(self, connection: sqlalchemy.Connection, batch: list[tuple],
+               pending: list[tuple], report: StreamReport):
+        started = time.perf_counter()
+        load_with_rollup(connection, self.loader, batch, self.staged, self.rollup)
+        self._add_time(report, 'load', started)
+        
+        report.rows += len(batch)
+        report.batches += 1
+        for start_date, end_date, fetched, count in pending:
+            elapsed = time.perf_counter() - fetched
+            self._add_window(report, WindowResult(start_date, end_date, True,
+                                                  f'Loaded into `{self.loader.table}`',
+                                                  elapsed))
+            self._record(start_date, end_date, LOADED, rows=count, duration=elapsed)
+    
+    def run(self, engine: sqlalchemy.Engine, start_date: str, end_date: str,
+            windows: Optional[list[tuple[str, str]]] = None) -> StreamReport:
+        """
+            Extract, parse and load all windows of the range concurrently.
+            Failed windows are reported, database errors stop the whole run.
+            
+            :param windows: (start_date, end_date) windows to process instead
+                            of splitting whole range.
+        """
+        report = StreamReport()
+        started = time.perf_counter()
+        self._stop.clear()
+        
+        if windows is None:
+            windows = split_date_range(start_date, end_date, self.extractor.window_days)
+        queued = Queue()
+        for window in windows:
+            queued.put(window)
+        raw = Queue(maxsize=self.queue_size)
+        parsed = Queue(maxsize=self.queue_size)
+        
+        fetchers = [Thread(target=self._fetch, args=(queued, raw, report), daemon=True)
+                    for _ in range(self.fetch_workers)]
+        parsers = [Thread(target=self._parse, args=(raw, parsed, report), daemon=True)
+                   for _ in range(self.parse_workers)]
+        closers = [Thread(target=self._close, args=(fetchers, raw, len(parsers)), daemon=True),
+                   Thread(target=self._close, args=(parsers, parsed, 1), daemon=True)]
+        for thread in fetchers + parsers + closers:
+            thread.start()
+        
+        batch, pending = [], []
+        try:
+            with engine.connect() as connection:
+                if self.rollup:
+                    ensure_rollup_table(connection)
+                while (item := self._get(parsed)) is not _DONE:
+                    window_start, window_end, fetched, rows = item
+                    batch.extend(rows)
+                    pending.append((window_start, window_end, fetched, len(rows)))
+                    
+                    if len(batch) >= self.loader.batch_size:
+                        self._flush(connection, batch, pending, report)
+                        batch, pending = [], []
+                
+                if pending:
+                    self._flush(connection, batch, pending, report)
+        finally:
+            self._stop.set()
+            for thread in fetchers + parsers + closers:
+                thread.join()
+        
+        report.windows.sort(key=lambda window: window.start_date)
+        report.seconds = time.perf_counter() - started
+        logger.info(f'Streaming pipeline finished: {report}')
+        return report
@@ -0,0 +1,258 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Event, Lock
+from typing import Optional
+
+import requests
+import sqlalchemy
+import hashlib
+import sqlite3
+import time
+import io
+import os
+
+import constants.queries as const
+from project.database.rollups import refresh_daily_rollup
+from project.metrics import metrics
+from project.parser.parser import ASTEROID_COLUMNS
+from project.pipeline.ledger import LOADED, FAILED
+from project.utils import iter_file_rows, logger, split_date_range
+
+SYNC_STATE_PATH = os.path.abspath('./data/sync.sqlite3')
+
+ASTEROID_ID_INDEX = ASTEROID_COLUMNS.index('asteroid_id')
+CLOSE_APPROACH_INDEX = ASTEROID_COLUMNS.index('close_approach_date')
+
+def row_key(row: tuple) -> tuple[str, str]:
+    return str(row[ASTEROID_ID_INDEX]), str(row[CLOSE_APPROACH_INDEX])[:10]
+
+def fingerprint(row: tuple) -> str:
+    """
+        Function returns hash of everything parsed from asteroid record except
+        upload time, so only changes which reach the database are noticed.
+    """
+    values = row[:ASTEROID_COLUMNS.index('uploaded_date')]
+    return hashlib.blake2b(repr(values).encode(), digest_size=16).hexdigest()
+
+class FingerprintStore:
+    """
+        Fingerprints of rows last pushed by sync daemon, kept in local SQLite
+        file keyed like `asteroids_details`, so restarted daemon picks up
+        where it stopped.
+    """
+    def __init__(self, path: str = SYNC_STATE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """\
+                CREATE TABLE IF NOT EXISTS fingerprints (\
+                asteroid_id TEXT NOT NULL,\
+                close_approach_date TEXT NOT NULL,\
+                fingerprint TEXT NOT NULL,\
+                PRIMARY KEY (close_approach_date, asteroid_id)\
+                )
+                """
+            )
+    
+    def between(self, date_from: str, date_to: str) -> dict[tuple[str, str], str]:
+        """
+            Return fingerprints of rows approaching between given dates (inclusive).
+        """
+        with self._lock:
+            return {(asteroid_id, date): value for asteroid_id, date, value in
+                    self._connection.execute(
+                        'SELECT asteroid_id, close_approach_date, fingerprint FROM fingerprints '
+                        'WHERE close_approach_date BETWEEN ? AND ?', (date_from, date_to))}
+    
+    def apply(self, upserted: list[tuple[tuple[str, str], str]], deleted: list[tuple[str, str]]):
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?)',
+                                         [(*key, value) for key, value in upserted])
+            self._connection.executemany('DELETE FROM fingerprints '
+                                         'WHERE asteroid_id = ? AND close_approach_date = ?',
+                                         deleted)
+    
+    def close(self):
+        self._connection.close()
+
+class SyncReport:
+    """
+        Summary of single poll, rows of failed windows are not counted.
+    """
+    def __init__(self, start_date: str, end_date: str):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.windows = 0
+        self.failed: list[tuple[str, str]] = []
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+        self.seconds = 0.0
+    
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+    
+    def __repr__(self):
+        return (f"<SyncReport(range={self.start_date}..{self.end_date}, "
+                f"windows={self.windows}, "
+                f"failed={len(self.failed)}, "
+                f"inserted={self.inserted}, "
+                f"updated={self.updated}, "
+                f"deleted={self.deleted}, "
+                f"unchanged={self.unchanged}, "
+                f"seconds={self.seconds:.3f})>")
+
+class SyncDaemon:
+    """
+        Keeps sliding range of recent and upcoming days of `asteroids_details`
+        in sync with NeoWs, polling it every `interval` seconds.
+        
+        Every polled row is fingerprinted and compared with fingerprint pushed
+        before. Only inserted and changed rows are upserted, whatever `staged`
+        of pipeline is, and rows which disappeared from feed are deleted, so
+        writes follow churn rather than range size. Days of failed windows
+        are left untouched, their rows are never taken for deleted.
+    """
+    def __init__(self, pipeline, engine: sqlalchemy.Engine,
+                 store: Optional[FingerprintStore] = None,
+                 interval: float = 3600, days_back: int = 7, days_ahead: int = 7):
+        if pipeline.fanout_loader is not None or not pipeline.load_database:
+            raise ValueError('Sync keeps `asteroids_details` only, '
+                             'fan-out and export-only pipelines are not supported.')
+        
+        self.pipeline = pipeline
+        self.engine = engine
+        self.store = store or FingerprintStore()
+        self.interval = interval
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        self.polls = 0
+        
+        self._stop = Event()
+    
+    def sliding_range(self, today: Optional[datetime] = None) -> tuple[str, str]:
+        today = today or datetime.now()
+        return ((today - timedelta(days=self.days_back)).strftime('%Y-%m-%d'),
+                (today + timedelta(days=self.days_ahead)).strftime('%Y-%m-%d'))
+    
+    def fetch(self, start_date: str, end_date: str) -> list[tuple]:
+        """
+            Download and parse window without saving it, polled windows
+            are compared and thrown away.
+        """
+        result = self.pipeline.extractor.request(start_date, end_date)
+        result.raise_for_status()
+        return list(iter_file_rows(io.StringIO(result.text)))
+    
+    def push(self, rows: list[tuple], deleted: list[tuple[str, str]]):
+        """
+            Delete disappeared rows and upsert changed ones in single transaction,
+            recomputing daily rollup of every touched day.
+        """
+        with self.engine.connect() as connection:
+            # Creating missing rollup table commits, it must not split the transaction
+            self.pipeline.prepare_rollup(connection)
+            if deleted:
+                connection.execute(sqlalchemy.text(const.DELETE_ASTEROIDS_BY_KEY),
+                                   [{'asteroid_id': asteroid_id, 'close_approach_date': date}
+                                    for asteroid_id, date in deleted])
+            if rows:
+                # Changed rows update existing ones, only upsert handles them,
+                # failed upsert rolls deletes back as well
+                self.pipeline.load(connection, rows, staged=True)
+            if deleted and self.pipeline.rollup:
+                days = sorted(date for _, date in deleted)
+                refresh_daily_rollup(connection, days[0], days[-1])
+            connection.commit()
+            
+            if rows and self.pipeline.enricher is not None:
+                self.pipeline.enrich(connection, (row[ASTEROID_ID_INDEX] for row in rows))
+    
+    def poll(self, today: Optional[datetime] = None) -> SyncReport:
+        """
+            Fetch whole sliding range once and push its differences.
+        """
+        start_date, end_date = self.sliding_range(today)
+        report = SyncReport(start_date, end_date)
+        started = time.perf_counter()
+        extractor = self.pipeline.extractor
+        
+        windows = split_date_range(start_date, end_date, extractor.window_days)
+        with ThreadPoolExecutor(max_workers=extractor.max_workers) as executor:
+            futures = [(window, executor.submit(self.fetch, *window)) for window in windows]
+        
+        changed, fingerprints, deleted, loaded = [], [], [], []
+        for (window_start, window_end), future in futures:
+            report.windows += 1
+            try:
+                rows = future.result()
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f'Sync of {window_start} - {window_end} failed: {e}')
+                report.failed.append((window_start, window_end))
+                self.pipeline.record(window_start, window_end, FAILED, error=str(e))
+                continue
+            
+            known = self.store.between(window_start, window_end)
+            seen = set()
+            for row in rows:
+                key = row_key(row)
+                seen.add(key)
+                value = fingerprint(row)
+                previous = known.get(key)
+                if previous == value:
+                    report.unchanged += 1
+                    continue
+                if previous is None:
+                    report.inserted += 1
+                else:
+                    report.updated += 1
+                changed.append(row)
+                fingerprints.append((key, value))
+            
+            removed = [key for key in known if key not in seen]
+            report.deleted += len(removed)
+            deleted.extend(removed)
+            loaded.append((window_start, window_end, len(rows)))
+        
+        # Fingerprints follow only what reached the database
+        self.push(changed, deleted)
+        self.store.apply(fingerprints, deleted)
+        for window_start, window_end, count in loaded:
+            self.pipeline.record(window_start, window_end, LOADED, rows=count)
+        
+        self.polls += 1
+        report.seconds = time.perf_counter() - started
+        for change in ('inserted', 'updated', 'deleted', 'unchanged'):
+            metrics.inc('sync_rows_total', getattr(report, change), change=change)
+        metrics.inc('sync_polls_total')
+        logger.info(f'Sync poll finished: {report}')
+        return report
+    
+    def run(self, polls: Optional[int] = None):
+        """
+            Poll every `interval` seconds until `stop` is called,
+            or `polls` times when given. Database errors skip single poll.
+        """
+        self._stop.clear()
+        done = 0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                print(f'Sync poll complete: {self.poll()}')
+            except sqlalchemy.exc.SQLAlchemyError as e:
+                logger.error(f'Sync poll failed: {e}')
+            
+            done += 1
+            if polls is not None and done >= polls:
+                break
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+    
+    def stop(self):
+        self._stop.set()
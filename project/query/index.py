@@ -0,0 +1,329 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from array import array
+from heapq import nsmallest
+from typing import Iterable, Iterator
+
+import struct
+import mmap
+import json
+import time
+import os
+
+from project.exctract.cache import FeedCache
+from project.parser.parser import ASTEROID_COLUMNS
+from project.utils import iter_file_rows, logger
+
+INDEX_PATH = os.path.abspath('./data/approach_index.bin')
+
+INDEX_COLUMNS = (
+    'asteroid_id',
+    'close_approach_date',
+    'miss_distance_km',
+    'estimated_diameter_km_max',
+    'isHazardous'
+)
+
+_MAGIC = b'NEOIDX02'
+# Magic, number of approaches and length of json list of sources following header
+_HEADER = struct.Struct('<8sQQ')
+# Sections of index file after sources in order, all of `count` items but hazard bitmap
+_SECTIONS = (
+    ('dates', 'i'),
+    ('asteroid_ids', 'q'),
+    ('miss_distances', 'd'),
+    ('diameters', 'd'),
+    ('by_distance', 'i'),
+    ('sorted_distances', 'd')
+)
+
+_ID, _DATE, _DIAMETER, _HAZARDOUS, _DISTANCE = (
+    ASTEROID_COLUMNS.index(column) for column in
+    ('asteroid_id', 'close_approach_date', 'estimated_diameter_km_max',
+     'isHazardous', 'miss_distance_km')
+)
+
+def _ordinal(value) -> int:
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(str(value)[:10]).toordinal()
+
+def _aligned(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def describe_sources(paths: Iterable[str]) -> list[list]:
+    """
+        Function returns `[path, mtime_ns, size]` of every given file sorted
+        by path, index built from files equal to its sources is up to date.
+    """
+    sources = []
+    for path in sorted(paths):
+        stat = os.stat(path)
+        sources.append([path, stat.st_mtime_ns, stat.st_size])
+    return sources
+
+class ApproachIndex:
+    """
+        In-memory index of close approaches for operational lookups,
+        without scanning `asteroids_details` or parsing feed files again.
+        
+        Approaches are kept in typed arrays sorted by approach date, with
+        secondary index of positions sorted by miss distance and bitmap of
+        hazardous ones. Date and distance bounds are found by bisection,
+        so queries cost O(log n) plus the approaches they return.
+        
+        Index saved by `save` is loaded by `load` through `mmap`, arrays are
+        then views of the file and nothing is parsed or copied. Files index
+        was built from are kept in its header, see `describe_sources`.
+    """
+    def __init__(self, dates, asteroid_ids, miss_distances, diameters, hazardous,
+                 by_distance, sorted_distances, source: str | None = None,
+                 sources: list[list] | None = None):
+        self.dates = dates
+        self.asteroid_ids = asteroid_ids
+        self.miss_distances = miss_distances
+        self.diameters = diameters
+        self.hazardous = hazardous
+        self.by_distance = by_distance
+        self.sorted_distances = sorted_distances
+        self.source = source
+        self.sources = sources or []
+        self._mmap = None
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'ApproachIndex':
+        """
+            Build index from parsed rows ordered as `ASTEROID_COLUMNS`,
+            later row of the same asteroid and approach date wins.
+        """
+        approaches = {}
+        for row in rows:
+            day = _ordinal(row[_DATE])
+            asteroid_id = int(row[_ID])
+            approaches[day, asteroid_id] = (float(row[_DISTANCE]), float(row[_DIAMETER]),
+                                            bool(row[_HAZARDOUS]))
+        
+        keys = sorted(approaches)
+        count = len(keys)
+        dates = array('i', (day for day, _ in keys))
+        asteroid_ids = array('q', (asteroid_id for _, asteroid_id in keys))
+        miss_distances = array('d', (approaches[key][0] for key in keys))
+        diameters = array('d', (approaches[key][1] for key in keys))
+        
+        hazardous = bytearray((count + 7) // 8)
+        for position, key in enumerate(keys):
+            if approaches[key][2]:
+                hazardous[position >> 3] |= 1 << (position & 7)
+        
+        by_distance = array('i', sorted(range(count), key=miss_distances.__getitem__))
+        sorted_distances = array('d', (miss_distances[position] for position in by_distance))
+        return cls(dates, asteroid_ids, miss_distances, diameters, hazardous,
+                   by_distance, sorted_distances)
+    
+    @classmethod
+    def from_files(cls, paths: Iterable[str], cache: FeedCache | None = None) -> 'ApproachIndex':
+        """
+            Build index from saved feed files, e.g. found by `find_feed_files`,
+            and from windows of feed cache when given. Sources are read from
+            the least recently written, so the latest row of approach wins.
+        """
+        started = time.perf_counter()
+        sources = {path: None for path in paths}
+        if cache is not None:
+            sources.update((entry.path, entry) for entry in cache.entries())
+        described = describe_sources(sources)
+        
+        def rows() -> Iterator[tuple]:
+            for path, _, _ in sorted(described, key=lambda source: source[1]):
+                entry = sources[path]
+                if entry is None:
+                    yield from iter_file_rows(path)
+                else:
+                    with cache.open(entry) as blob:
+                        yield from iter_file_rows(blob)
+        
+        index = cls.from_rows(rows())
+        index.sources = described
+        logger.info(f'Indexed {len(index)} approaches of {len(described)} files '
+                    f'in {time.perf_counter() - started:.2f}s')
+        return index
+    
+    def save(self, path: str = INDEX_PATH) -> int:
+        """
+            Write index into single file, replacing previous one at once.
+            
+            :return: size of file in bytes.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary = f'{path}.tmp'
+        sources = json.dumps(self.sources).encode()
+        with open(temporary, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, len(self), len(sources)))
+            file.write(sources)
+            for name, _ in _SECTIONS:
+                file.write(b'\0' * (_aligned(file.tell()) - file.tell()))
+                file.write(memoryview(getattr(self, name)).cast('B'))
+            file.write(b'\0' * (_aligned(file.tell()) - file.tell()))
+            file.write(self.hazardous)
+            size = file.tell()
+        os.replace(temporary, path)
+        return size
+    
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> 'ApproachIndex':
+        """
+            Map index file saved by `save` into memory, read only.
+        """
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, count, length = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC:
+            mapped.close()
+            raise ValueError(f'`{path}` is not an approach index.')
+        
+        offset = _HEADER.size + length
+        sources = json.loads(mapped[_HEADER.size:offset])
+        view, sections = memoryview(mapped), {}
+        for name, typecode in _SECTIONS:
+            offset = _aligned(offset)
+            size = count * struct.calcsize(typecode)
+            sections[name] = view[offset:offset + size].cast(typecode)
+            offset += size
+        offset = _aligned(offset)
+        sections['hazardous'] = view[offset:offset + (count + 7) // 8]
+        
+        index = cls(**sections, source=path, sources=sources)
+        index._mmap = mapped
+        return index
+    
+    @staticmethod
+    def read_sources(path: str = INDEX_PATH) -> list[list] | None:
+        """
+            Return sources stored in header of index file, None when
+            file is missing or is not an index of current format.
+        """
+        try:
+            with open(path, 'rb') as file:
+                magic, _, length = _HEADER.unpack(file.read(_HEADER.size))
+                if magic != _MAGIC:
+                    return None
+                return json.loads(file.read(length))
+        except (OSError, struct.error, ValueError):
+            return None
+    
+    def close(self):
+        """
+            Release memory mapped file of loaded index.
+        """
+        if self._mmap is not None:
+            for name in ('hazardous', *(name for name, _ in _SECTIONS)):
+                getattr(self, name).release()
+            self._mmap.close()
+            self._mmap = None
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    def is_hazardous(self, position: int) -> bool:
+        return bool(self.hazardous[position >> 3] >> (position & 7) & 1)
+    
+    def row(self, position: int) -> tuple:
+        """
+            Return approach at position ordered as `INDEX_COLUMNS`.
+        """
+        return (self.asteroid_ids[position],
+                date.fromordinal(self.dates[position]).isoformat(),
+                self.miss_distances[position],
+                self.diameters[position],
+                self.is_hazardous(position))
+    
+    def date_range(self, date_from: str | None = None,
+                   date_to: str | None = None) -> range:
+        """
+            Return positions of approaches between given dates (inclusive).
+        """
+        low = bisect_left(self.dates, _ordinal(date_from)) if date_from else 0
+        high = bisect_right(self.dates, _ordinal(date_to)) if date_to else len(self)
+        return range(low, max(low, high))
+    
+    def _matches(self, hazardous: bool | None):
+        if hazardous is None:
+            return lambda position: True
+        return lambda position: self.is_hazardous(position) == hazardous
+    
+    def between(self, date_from: str | None = None, date_to: str | None = None,
+                hazardous: bool | None = None) -> list[tuple]:
+        """
+            Return approaches between given dates in date order,
+            only hazardous or harmless ones when `hazardous` is set.
+        """
+        matches = self._matches(hazardous)
+        return [self.row(position) for position in self.date_range(date_from, date_to)
+                if matches(position)]
+    
+    def within(self, max_distance_km: float, date_from: str | None = None,
+               date_to: str | None = None, hazardous: bool | None = None) -> list[tuple]:
+        """
+            Return approaches passing within given miss distance between given
+            dates, closest first. Scans whichever of date range and distance
+            range holds fewer approaches.
+        """
+        dates = self.date_range(date_from, date_to)
+        closer = bisect_right(self.sorted_distances, max_distance_km)
+        matches = self._matches(hazardous)
+        
+        if closer <= len(dates):
+            positions = (position for position in self.by_distance[:closer]
+                         if dates.start <= position < dates.stop and matches(position))
+        else:
+            distances = self.miss_distances
+            positions = sorted((position for position in dates
+                                if distances[position] <= max_distance_km and matches(position)),
+                               key=distances.__getitem__)
+        return [self.row(position) for position in positions]
+    
+    def closest(self, k: int, date_from: str | None = None, date_to: str | None = None,
+                hazardous: bool | None = None) -> list[tuple]:
+        """
+            Return `k` closest approaches between given dates, closest first.
+            
+            Wide ranges walk distance index until `k` approaches match,
+            narrow ones select from their date range.
+        """
+        dates = self.date_range(date_from, date_to)
+        matches = self._matches(hazardous)
+        
+        if len(dates) * 4 >= len(self):
+            found = []
+            for position in self.by_distance:
+                if dates.start <= position < dates.stop and matches(position):
+                    found.append(position)
+                    if len(found) == k:
+                        break
+        else:
+            found = nsmallest(k, (position for position in dates if matches(position)),
+                              key=self.miss_distances.__getitem__)
+        return [self.row(position) for position in found]
+    
+    def hazardous_count(self, date_from: str | None = None, date_to: str | None = None) -> int:
+        """
+            Count hazardous approaches between given dates from bitmap.
+        """
+        dates = self.date_range(date_from, date_to)
+        low, high = dates.start, dates.stop
+        if low >= high:
+            return 0
+        
+        bits = int.from_bytes(self.hazardous[low >> 3:(high + 7) >> 3], 'little')
+        bits >>= low & 7
+        return (bits & ((1 << (high - low)) - 1)).bit_count()
+    
+    def __repr__(self):
+        first = date.fromordinal(self.dates[0]).isoformat() if len(self) else None
+        last = date.fromordinal(self.dates[-1]).isoformat() if len(self) else None
+        return (f"<ApproachIndex(approaches={len(self)}, "
+                f"range={first}..{last}, "
+                f"hazardous={self.hazardous_count()}, "
+                f"sources={len(self.sources)}, "
+                f"source={self.source})>")
@@ -1,27 +1,35 @@
 from sqlalchemy import create_engine, Engine, MetaData
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Iterable, Iterator, Union
+from itertools import islice
 
 import requests
 import logging
 import json
+import glob
 import os
+import time
 import re
 
 JSON_FILE_PATH = os.path.abspath('./data/json_files')
+LOAD_BATCH_SIZE = 5000
+FEED_FILE_WINDOW = re.compile(r'NeoWs_json_(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})')
 
 logging.basicConfig(filename = 'sample.log', level=logging.INFO,
                     format='%(asctime)s %(levelname)s - %(message)s',
-                    datefmt='%H:%M:%S')
+                    datefmt='%Y-%m-%d %H:%M:%S')
 
 logger = logging.getLogger(__name__)
 
-def get_mysql_engine(host: str, user: str, password: str, port: int, database: str) -> Engine:
+def get_mysql_engine(host: str, user: str, password: str, port: int, database: str | None = None,
+                     **engine_options) -> Engine:
     """
         Function returns mysql engine with a given parameters to uri.
+        Without database engine connects to server only.
+        Remaining keyword arguments are passed to `create_engine`.
     """
-    connection_uri = f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}'
-    return create_engine(connection_uri)
+    connection_uri = f'mysql+pymysql://{user}:{password}@{host}:{port}/{database or ""}'
+    return create_engine(connection_uri, **engine_options)
     
 def create_filename(start_date: str, end_date: str | None = None) -> str:
     """
@@ -80,6 +88,29 @@ def read_json_file(filepath: str):
 def get_available_files():
     for _, _, files in os.walk(JSON_FILE_PATH):
         print(*files)
+
+def find_feed_files(pattern: str = 'NeoWs_json_*.json',
+                    date_from: str | None = None,
+                    date_to: str | None = None) -> list[str]:
+    """
+        Function returns sorted paths of feed files in data folder matching
+        glob pattern, whose window overlaps given dates.
+    """
+    paths = []
+    
+    for path in glob.glob(os.path.join(JSON_FILE_PATH, pattern)):
+        dates = FEED_FILE_WINDOW.search(os.path.basename(path))
+        if dates is None:
+            # Window of file is unknown, it can match only unfiltered search
+            if date_from or date_to:
+                continue
+        else:
+            start_date, end_date = dates.groups()
+            if (date_from and end_date < date_from) or (date_to and start_date > date_to):
+                continue
+        paths.append(path)
+    
+    return sorted(paths)
     
 def extract_data_from_json(filename: str):
     """
@@ -106,32 +137,98 @@ def add_days_to_date(date: str, days: int = 7):
     
     return (formatted_date + timedelta(days=days)).strftime(fmt)
 
-def process_file(filename: str) -> list[list]:
+def split_date_range(start_date: str, end_date: str, days: int = 7) -> list[tuple[str, str]]:
     """
-        Functions proccess the file with a given name located in data folder.
+        Function splits date range into windows of at most `days` days
+        (both ends included), as served by single NeoWs feed call.
+    """
+    fmt = '%Y-%m-%d'
+    start = datetime.strptime(start_date, fmt)
+    end = datetime.strptime(end_date, fmt)
+    
+    if end < start:
+        raise ValueError(f'End date {end_date} is before start date {start_date}.')
+    
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=days - 1), end)
+        windows.append((start.strftime(fmt), window_end.strftime(fmt)))
+        start = window_end + timedelta(days=1)
+    
+    return windows
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+        Function groups items of iterable into lists of at most `size` items.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def iter_file_rows(filename, parser=None) -> Iterator[tuple]:
+    """
+        Functions streams asteroid rows from the file with a given name
+        located in data folder.
         
-        :param filename: name of json file.
+        :param filename: name of json file or opened text stream of feed.
+        :param parser: parser of single record, `AsteroidRowParser` by default.
         
-        :return: nested list with astroid details per date.
+        :return: generator of tuples ordered as `ASTEROID_COLUMNS`,
+                 or of whatever given parser returns.
     """
-    from project.parser.parser import AsteroidParser
+    from project.parser.parser import AsteroidRowParser
+    from project.parser.stream import iter_feed_records
+    from project.parser.validation import RECORD_ERRORS, quarantine
+    from project.metrics import metrics
 
-    dates, record_sets = extract_data_from_json(filename)
-    if not (dates or record_sets):
-        logger.warning(f'No data found in file `{filename}`')
-        return []
+    filepath = filename if hasattr(filename, 'read') else os.path.join(JSON_FILE_PATH, filename)
+    parse = (parser or AsteroidRowParser()).parse
+    count = 0
+    # Time spent suspended at `yield` belongs to consumer, e.g. loader
+    timed = metrics.enabled
+    busy, resumed = 0.0, time.perf_counter()
 
-    aggregated_records = []
-    parser = AsteroidParser([])
-
-    for record_set in record_sets:
-        for record in record_set:
+    try:
+        for _, record in iter_feed_records(filepath):
             try:
-                parser.records = record
-                parsed_records = [parsed_record for parsed_record in parser]
-                aggregated_records.extend(parsed_records)
-            except Exception as e:
-                logger.error(f'Failed to parse record {record}: {e}')
-                continue 
-
-    return aggregated_records
\ No newline at end of file
+                row = parse(record)
+            except RECORD_ERRORS as e:
+                # Only parsers without validation raise, e.g. fan-out parser
+                quarantine.reject(record, f'{type(e).__name__}: {e}')
+                continue
+            if row is None:
+                continue
+            count += 1
+            if timed:
+                busy += time.perf_counter() - resumed
+                resumed = None
+                yield row
+                resumed = time.perf_counter()
+            else:
+                yield row
+    except json.JSONDecodeError as e:
+        print(f"Error decoding JSON: {e}")
+        metrics.inc('decode_failures_total')
+    finally:
+        if timed:
+            metrics.inc('records_total', count)
+            if resumed is not None:
+                busy += time.perf_counter() - resumed
+            metrics.observe('stage_seconds', busy, stage='parse')
+
+    if not count:
+        logger.warning(f'No data found in file `{getattr(filename, "name", filename)}`')
+
+def process_file(filename: str) -> Iterator[dict]:
+    """
+        Functions proccess the file with a given name located in data folder.
+        Records are streamed from the file and parsed one at a time,
+        broken ones are quarantined and left out.
+        
+        :param filename: name of json file.
+        
+        :return: generator of asteroid details mappings.
+    """
+    from project.parser.parser import row_to_mapping
+
+    return map(row_to_mapping, iter_file_rows(filename))
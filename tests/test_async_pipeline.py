@@ -0,0 +1,105 @@
+"""
+    Async `Pipeline.run` against local stub API and SQLite stand-in database.
+    
+    Run from repository root: `python -m unittest tests.test_async_pipeline`.
+"""
+import contextlib
+import unittest
+import tempfile
+import threading
+import asyncio
+import time
+import io
+import os
+
+import project.utils
+from project import Pipeline
+from project.database.loader import get_loader
+from project.exctract.async_extractor import AsyncNeoWsExtractor
+from project.pipeline.ledger import LOADED, RunLedger
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import LatencyLoader, count_rows, create_sqlite_engine
+
+START_DATE, END_DATE = '2023-01-01', '2023-01-28'
+DAYS, PER_DAY = 28, 20
+
+class AsyncPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        json_file_path = project.utils.JSON_FILE_PATH
+        project.utils.JSON_FILE_PATH = self.directory.name
+        self.addCleanup(setattr, project.utils, 'JSON_FILE_PATH', json_file_path)
+        self.engine = create_sqlite_engine(os.path.join(self.directory.name, 'neows.sqlite3'))
+        self.addCleanup(self.engine.dispose)
+    
+    def run_pipeline(self, stub: StubNeoWsServer, pipeline: Pipeline) -> tuple[list, int]:
+        async def run():
+            async with AsyncNeoWsExtractor('DEMO_KEY', url=stub.feed_url,
+                                           max_connections=4, max_retries=8) as extractor:
+                extractor.scheduler.backoff_base = 0.01
+                results = await pipeline.run(self.engine, START_DATE, END_DATE,
+                                             extractor=extractor, max_windows=2)
+                return results, extractor.scheduler.retries
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(run())
+    
+    def test_loads_every_window(self):
+        ledger = RunLedger(os.path.join(self.directory.name, 'ledger.sqlite3'))
+        self.addCleanup(ledger.close)
+        pipeline = Pipeline('DEMO_KEY', rollup=True, ledger=ledger)
+        with StubNeoWsServer(per_day=PER_DAY) as stub:
+            results, retries = self.run_pipeline(stub, pipeline)
+        
+        self.assertEqual([(result.start_date, result.end_date) for result in results],
+                         project.utils.split_date_range(START_DATE, END_DATE))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(retries, 0)
+        self.assertEqual(count_rows(self.engine), DAYS * PER_DAY)
+        self.assertEqual(count_rows(self.engine, 'asteroids_daily'), DAYS)
+        self.assertEqual([(start_date, end_date, state, rows) for
+                          start_date, end_date, state, rows, *_ in ledger.windows(START_DATE, END_DATE)],
+                         [(result.start_date, result.end_date, LOADED, 7 * PER_DAY)
+                          for result in results])
+    
+    def test_retries_unavailable_api(self):
+        pipeline = Pipeline('DEMO_KEY')
+        with StubNeoWsServer(per_day=PER_DAY, error_rate=0.3) as stub:
+            results, retries = self.run_pipeline(stub, pipeline)
+        
+        self.assertTrue(all(result.ok for result in results), results)
+        self.assertGreater(retries, 0)
+        self.assertEqual(stub.requests, len(results) + retries)
+        self.assertEqual(count_rows(self.engine), DAYS * PER_DAY)
+    
+    def test_cancel_does_not_wait_for_loads(self):
+        latency = 2.0
+        pipeline = Pipeline('DEMO_KEY', loader=LatencyLoader(get_loader('executemany'), latency))
+        
+        async def cancel_run(stub: StubNeoWsServer) -> float:
+            task = asyncio.create_task(pipeline.run(self.engine, START_DATE, START_DATE))
+            # Wait until the window is downloaded and its load is blocked
+            while stub.requests == 0:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.2)
+            
+            started = time.perf_counter()
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+            return time.perf_counter() - started
+        
+        with StubNeoWsServer(per_day=PER_DAY) as stub, \
+                contextlib.redirect_stdout(io.StringIO()):
+            pipeline.extractor.url = stub.feed_url
+            elapsed = asyncio.run(cancel_run(stub))
+            # Load left running by cancelled run finishes before database is removed
+            for thread in threading.enumerate():
+                if thread.name.startswith('ThreadPoolExecutor'):
+                    thread.join()
+        
+        self.assertLess(elapsed, latency / 2)
+
+if __name__ == '__main__':
+    unittest.main()
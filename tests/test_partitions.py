@@ -0,0 +1,82 @@
+"""
+    Partition maintenance of `asteroids_details` against fake MySQL
+    connection, which keeps partition names and refuses to drop missing ones.
+    
+    Run from repository root: `python -m unittest tests.test_partitions`.
+"""
+import unittest
+
+import sqlalchemy
+
+import constants.queries as const
+from project.database.partitions import drop_partitions_before
+
+class FakePartitionedEngine:
+    """
+        Stands in for MySQL engine of partitioned `asteroids_details`.
+    """
+    class dialect:
+        name = 'mysql'
+    
+    def __init__(self, partitions: list[str]):
+        self.partitions = list(partitions)
+        self.deleted: list[dict] = []
+    
+    def connect(self):
+        return FakeConnection(self)
+
+class FakeConnection:
+    def __init__(self, engine: FakePartitionedEngine):
+        self.engine = engine
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        pass
+    
+    def execute(self, statement, parameters=None):
+        if str(statement) == const.SELECT_ASTEROIDS_PARTITIONS:
+            return [(name, None) for name in self.engine.partitions]
+        if str(statement) == const.DELETE_ASTEROIDS_DATE_RANGE:
+            self.engine.deleted.append(parameters)
+            return None
+        raise AssertionError(f'Unexpected statement {statement}')
+    
+    def exec_driver_sql(self, statement: str):
+        prefix = const.DROP_ASTEROIDS_PARTITIONS.format(partitions='')
+        if not statement.startswith(prefix):
+            raise AssertionError(f'Unexpected statement {statement}')
+        names = statement[len(prefix):].split(', ')
+        if any(name not in self.engine.partitions for name in names):
+            raise sqlalchemy.exc.OperationalError(statement, None,
+                                                  Exception('Error in list of partitions to DROP'))
+        self.engine.partitions = [name for name in self.engine.partitions if name not in names]
+    
+    def commit(self):
+        pass
+
+class DropPartitionsBeforeTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = FakePartitionedEngine(['p_before', 'p202301', 'p202302', 'p202303',
+                                             'p202304', 'p_future'])
+    
+    def test_drops_whole_months_and_deletes_the_rest(self):
+        dropped = drop_partitions_before(self.engine, '2023-02-15')
+        
+        self.assertEqual(dropped, ['p_before', 'p202301'])
+        self.assertEqual(self.engine.partitions, ['p202302', 'p202303', 'p202304', 'p_future'])
+        self.assertEqual(self.engine.deleted, [{'date_from': '0001-01-01',
+                                                'date_to': '2023-02-15'}])
+    
+    def test_purging_again_skips_dropped_partitions(self):
+        drop_partitions_before(self.engine, '2023-02-15')
+        
+        self.assertEqual(drop_partitions_before(self.engine, '2023-02-15'), [])
+        self.assertEqual(drop_partitions_before(self.engine, '2023-04-01'),
+                         ['p202302', 'p202303'])
+        self.assertEqual(self.engine.partitions, ['p202304', 'p_future'])
+        self.assertEqual(len(self.engine.deleted), 3)
+
+if __name__ == '__main__':
+    unittest.main()
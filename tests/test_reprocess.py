@@ -0,0 +1,74 @@
+"""
+    Feed files parsed across worker processes by `iter_packed_files`,
+    with quarantine and metrics of workers merged into this process.
+    
+    Run from repository root: `python -m unittest tests.test_reprocess`.
+"""
+import unittest
+import tempfile
+import json
+import os
+
+from project.metrics import metrics
+from project.parser.bulk import iter_packed_files
+from project.parser.validation import quarantine
+from project.utils import create_filename, split_date_range
+from benchmarks.synthetic import make_feed
+
+START_DATE, END_DATE = '2023-01-01', '2023-01-28'
+PER_DAY = 10
+
+class PackedFilesTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        
+        self.paths, self.broken, self.valid = [], 0, 0
+        for start_date, end_date in split_date_range(START_DATE, END_DATE):
+            feed = make_feed(start_date, end_date, PER_DAY)
+            for records in feed['near_earth_objects'].values():
+                # First record of every day is missing its approach data
+                records[0]['close_approach_data'] = []
+                self.broken += 1
+                self.valid += len(records) - 1
+            path = os.path.join(directory.name, create_filename(start_date, end_date))
+            with open(path, 'w') as file:
+                json.dump(feed, file)
+            self.paths.append(path)
+        
+        state = quarantine.path, quarantine.count, metrics.enabled
+        self.addCleanup(self.restore, *state)
+        quarantine.close()
+        quarantine.path = os.path.join(directory.name, 'quarantine.jsonl')
+        quarantine.count = 0
+        metrics.reset()
+        metrics.enabled = True
+    
+    @staticmethod
+    def restore(path: str, count: int, enabled: bool):
+        quarantine.close()
+        quarantine.path, quarantine.count = path, count
+        metrics.reset()
+        metrics.enabled = enabled
+    
+    def test_merges_quarantine_and_metrics_of_workers(self):
+        packed = list(iter_packed_files(self.paths, processes=2))
+        
+        self.assertEqual(sum(len(rows) for rows in packed), self.valid)
+        self.assertEqual(quarantine.count, self.broken)
+        with open(quarantine.path) as file:
+            self.assertEqual(len(file.readlines()), self.broken)
+        
+        counters = metrics.summary()['counters']
+        self.assertEqual(counters['records_total'], self.valid)
+        self.assertEqual(counters.get('parse_failures_total'), self.broken)
+    
+    def test_single_process_counts_the_same(self):
+        packed = list(iter_packed_files(self.paths, processes=1))
+        
+        self.assertEqual(sum(len(rows) for rows in packed), self.valid)
+        self.assertEqual(quarantine.count, self.broken)
+        self.assertEqual(metrics.summary()['counters']['records_total'], self.valid)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+    Sync daemon polling local stub API into SQLite stand-in database,
+    before and after stub changed part of its asteroids.
+    
+    Run from repository root: `python -m unittest tests.test_sync`.
+"""
+from datetime import datetime
+import contextlib
+import unittest
+import tempfile
+import io
+import os
+
+import project.utils
+from project import Pipeline
+from project.pipeline.sync import FingerprintStore, SyncDaemon
+from benchmarks.stub_api import StubNeoWsServer
+from benchmarks.stub_db import count_rows, create_sqlite_engine
+
+TODAY = datetime(2023, 6, 15)
+DAYS_BACK = DAYS_AHEAD = 10
+PER_DAY = 20
+
+TABLE = ('SELECT asteroid_id, close_approach_date, miss_distance_km '
+         'FROM asteroids_details ORDER BY asteroid_id, close_approach_date')
+ROLLUP = ('SELECT day, approaches, hazardous, min_miss_distance_km, max_diameter_km '
+          'FROM asteroids_daily ORDER BY day')
+
+def table(engine, query: str = TABLE) -> list:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(query).fetchall()
+
+class SyncDaemonTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        json_file_path = project.utils.JSON_FILE_PATH
+        project.utils.JSON_FILE_PATH = self.directory
+        self.addCleanup(setattr, project.utils, 'JSON_FILE_PATH', json_file_path)
+        
+        self.stub = StubNeoWsServer(per_day=PER_DAY).__enter__()
+        self.addCleanup(self.stub.__exit__, None, None, None)
+        self.engine = create_sqlite_engine(os.path.join(self.directory, 'sync.sqlite3'))
+        self.addCleanup(self.engine.dispose)
+        
+        self.pipeline = Pipeline('DEMO_KEY', rollup=True)
+        self.pipeline.extractor.url = self.stub.feed_url
+        store = FingerprintStore(os.path.join(self.directory, 'fingerprints.sqlite3'))
+        self.addCleanup(store.close)
+        self.daemon = SyncDaemon(self.pipeline, self.engine, store,
+                                 days_back=DAYS_BACK, days_ahead=DAYS_AHEAD)
+    
+    def poll(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.daemon.poll(TODAY)
+    
+    def test_pushes_only_changes_of_mutated_feed(self):
+        days = DAYS_BACK + DAYS_AHEAD + 1
+        
+        initial = self.poll()
+        self.assertEqual((initial.inserted, initial.updated, initial.deleted, initial.unchanged),
+                         (days * PER_DAY, 0, 0, 0))
+        self.assertEqual(initial.failed, [])
+        self.assertEqual(count_rows(self.engine), days * PER_DAY)
+        
+        unchanged = self.poll()
+        self.assertEqual((unchanged.changed, unchanged.unchanged), (0, days * PER_DAY))
+        
+        changes = self.stub.mutate(0.1)
+        mutated = self.poll()
+        self.assertEqual((mutated.inserted, mutated.updated, mutated.deleted),
+                         (changes['added'], changes['updated'], changes['removed']))
+        self.assertEqual(count_rows(self.engine),
+                         days * PER_DAY + changes['added'] - changes['removed'])
+        
+        # Synced table and rollup match full load of the mutated feed
+        reloaded = create_sqlite_engine(os.path.join(self.directory, 'reload.sqlite3'))
+        self.addCleanup(reloaded.dispose)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.pipeline.do_range_pipeline(reloaded, *self.daemon.sliding_range(TODAY))
+        self.assertEqual(table(self.engine), table(reloaded))
+        self.assertEqual(table(self.engine, ROLLUP), table(reloaded, ROLLUP))
+
+if __name__ == '__main__':
+    unittest.main()